@@ -1,15 +1,62 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+import asyncio
+import datetime
+import json
+import time
+from contextlib import asynccontextmanager
+from sqlite3 import OperationalError
+from typing import Annotated, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse
+)
+from pydantic import BaseModel, BeforeValidator, PlainSerializer
 
 
 # IMPORTACIÓN DE LA LÓGICA DE NEGOCIO
 
 try:
     from src.inscripcion_actividad import (
+        ErrorCarrito,
         inscribir_actividad,
-        mostrar_cupos_para_fecha_hora_actividad
+        inscribir_carrito,
+        mostrar_cupos_para_fecha_hora_actividad,
+        mostrar_grilla_cupos
+    )
+    from src.cancelaciones import cancelar_inscripciones, cancelar_turno
+    from src.eventos import canal_cupos
+    from src.lista_espera import (
+        anotar_en_lista_espera,
+        cancelar_lista_espera,
+        consultar_lista_espera
+    )
+    from src.reportes import reporte_demanda_tallas, reporte_ocupacion
+    from src.reservas import (
+        BarrenderoReservas,
+        cargar_vencimientos,
+        confirmar_reserva,
+        liberar_reserva,
+        reservar_cupos
+    )
+    from data import metricas
+    from data.cache_cupos import cache_cupos, versiones_cupos
+    from data.catalogo import recargar_catalogo
+    from data.fechas import (
+        fecha_a_api,
+        horario_a_api,
+        parsear_fecha,
+        parsear_horario
     )
+    from data.repositorio import AlmacenamientoNoSoportado
+    from api.ejecutor_db import (
+        EjecutorSaturado,
+        ejecutar_escritura,
+        ejecutar_lectura
+    )
+    from api.idempotencia import registro_idempotencia
 except ImportError:
     print(
         r"¡ADVERTENCIA! No se pudo importar 'inscripcion_actividad'. "
@@ -19,6 +66,21 @@ except ImportError:
 
 # --- MODELOS PYDANTIC ---
 
+# La fecha (DD-MM-YYYY) y el horario (HH:MM) se parsean una sola vez al
+# validar la solicitud; si no son válidos la respuesta es un 422. Al
+# serializar a JSON vuelven al formato de la API.
+FechaApi = Annotated[
+    datetime.date,
+    BeforeValidator(parsear_fecha),
+    PlainSerializer(fecha_a_api, return_type=str, when_used="json")
+]
+
+HorarioApi = Annotated[
+    datetime.time,
+    BeforeValidator(parsear_horario),
+    PlainSerializer(horario_a_api, return_type=str, when_used="json")
+]
+
 
 class PersonaInscripcion(BaseModel):
     """
@@ -34,8 +96,8 @@ class PersonaInscripcion(BaseModel):
 class InscripcionRequest(BaseModel):
     # Define la estructura del cuerpo completo de la solicitud POST.
     actividad: str
-    fecha_actividad: str  # Formato DD-MM-YYYY
-    horario_actividad: str  # Formato HH:MM
+    fecha_actividad: FechaApi
+    horario_actividad: HorarioApi
     personas: List[PersonaInscripcion]
     acepta_terminos_condiciones: bool
 
@@ -43,29 +105,123 @@ class InscripcionRequest(BaseModel):
 class CuposActividad(BaseModel):
     # Define la estructura del cuerpo completo de la solicitud POST.
     actividad: str
-    fecha_actividad: str  # Formato DD-MM-YYYY
-    horario_actividad: str  # Formato HH:MM
+    fecha_actividad: FechaApi
+    horario_actividad: HorarioApi
 
 # --- SERVIDOR FASTAPI Y ENDPOINT ---
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Las tablas de referencia se cargan una vez al iniciar el servidor
+    await ejecutar_lectura(recargar_catalogo)
+    # Las reservas temporales pendientes vuelven al heap de vencimientos
+    await ejecutar_escritura(cargar_vencimientos)
+    barrendero = BarrenderoReservas()
+    barrendero.iniciar()
+    yield
+    barrendero.detener()
+
+
 app = FastAPI(
     title="Servidor de Inscripciones",
-    description="API para gestionar inscripciones."
+    description="API para gestionar inscripciones.",
+    lifespan=lifespan
 )
 
 
+class MedicionSolicitudes:
+    """
+    Middleware ASGI que registra la duración y el código de estado de cada
+    solicitud. Si las métricas están desactivadas no agrega trabajo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metricas.habilitadas():
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # Se usa la ruta declarada (no la URL) para acotar las series
+            ruta = scope.get("route")
+            ruta = ruta.path if ruta is not None else "desconocida"
+            metricas.observar(
+                metricas.duracion_solicitudes, time.perf_counter() - inicio,
+                scope["method"], ruta)
+            metricas.contar(
+                metricas.solicitudes, scope["method"], ruta, str(estado))
+
+
+app.add_middleware(MedicionSolicitudes)
+
+
+@app.exception_handler(AlmacenamientoNoSoportado)
+def handle_almacenamiento_no_soportado(
+        request: Request, exc: AlmacenamientoNoSoportado):
+    # El repositorio configurado (por ejemplo el de memoria) no guarda
+    # los cupos que usa esta operación
+    return JSONResponse(status_code=501, content={"detail": str(exc)})
+
+
+@app.exception_handler(OperationalError)
+def handle_base_ocupada(request: Request, exc: OperationalError):
+    # La base siguió bloqueada luego de los reintentos, o no quedó una
+    # conexión libre en el pool: el cliente puede volver a intentar sin
+    # que se haya registrado nada.
+    print(f"Base de datos ocupada: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "El servidor está ocupado, intente nuevamente."},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(EjecutorSaturado)
+def handle_ejecutor_saturado(request: Request, exc: EjecutorSaturado):
+    # Hay demasiadas operaciones de base de datos en curso: se rechaza la
+    # solicitud enseguida en lugar de encolarla sin límite.
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Hay demasiadas solicitudes en curso, intente "
+                           "nuevamente en unos segundos."},
+        headers={"Retry-After": "1"}
+    )
+
+
 @app.post(
     "/inscribir",
     status_code=201,
     response_model=dict,
     tags=["Inscripciones"]
 )
-def handle_inscripcion(request_data: InscripcionRequest):
+async def handle_inscripcion(
+        request_data: InscripcionRequest,
+        idempotency_key: Optional[str] = Header(default=None)):
     """
     Endpoint POST para registrar a una o más personas a una actividad,
-    llamando a la función externa.
+    llamando a la función externa. Con el encabezado Idempotency-Key un
+    reintento devuelve la respuesta del primer intento.
     """
+    return await registro_idempotencia.ejecutar(
+        "/inscribir", idempotency_key, request_data.model_dump(mode="json"),
+        lambda: _procesar_inscripcion(request_data))
+
+
+async def _procesar_inscripcion(request_data: InscripcionRequest):
     # 1. Preparar los datos para la función importada
     # Convertir el objeto Pydantic a una lista de diccionarios, que es
     # lo que espera la función.
@@ -75,7 +231,8 @@ def handle_inscripcion(request_data: InscripcionRequest):
     try:
         # La función inscribir_actividad se encarga de toda la
         # validación y la DB.
-        inscribir_actividad(
+        await ejecutar_escritura(
+            inscribir_actividad,
             request_data.actividad,
             request_data.fecha_actividad,
             request_data.horario_actividad,
@@ -88,8 +245,13 @@ def handle_inscripcion(request_data: InscripcionRequest):
 
     except ValueError as e:
         # Errores de validación de negocio (capturados de la función)
+        metricas.contar(metricas.rechazos, "/inscribir", str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
+    except (EjecutorSaturado, OperationalError):
+        # Los responden sus manejadores (429 y 503)
+        raise
+
     except Exception as e:
         # Errores internos o de base de datos
         print(f"Error interno: {e}")
@@ -107,11 +269,272 @@ def handle_inscripcion(request_data: InscripcionRequest):
         )
 
 
+class ItemCarrito(BaseModel):
+    # Un turno del carrito con las personas a inscribir en él
+    actividad: str
+    fecha_actividad: FechaApi
+    horario_actividad: HorarioApi
+    personas: List[PersonaInscripcion]
+
+
+class CarritoRequest(BaseModel):
+    items: List[ItemCarrito]
+    acepta_terminos_condiciones: bool
+
+
+@app.post(
+    "/inscribir/carrito",
+    status_code=201,
+    response_model=dict,
+    tags=["Inscripciones"]
+)
+async def handle_inscripcion_carrito(
+        request_data: CarritoRequest,
+        idempotency_key: Optional[str] = Header(default=None)):
+    """
+    Inscribe varios turnos (de una o más actividades) en una sola
+    transacción: o se reservan todos o ninguno. La respuesta trae el
+    resultado de cada ítem. Admite Idempotency-Key como /inscribir.
+    """
+    return await registro_idempotencia.ejecutar(
+        "/inscribir/carrito", idempotency_key,
+        request_data.model_dump(mode="json"),
+        lambda: _procesar_carrito(request_data))
+
+
+async def _procesar_carrito(request_data: CarritoRequest):
+    items = [item.dict() for item in request_data.items]
+
+    try:
+        resultados = await ejecutar_escritura(
+            inscribir_carrito,
+            items,
+            request_data.acepta_terminos_condiciones
+        )
+        return {
+            "mensaje": "Inscripción realizada con éxito.",
+            "items": resultados
+        }
+
+    except ErrorCarrito as e:
+        metricas.contar(metricas.rechazos, "/inscribir/carrito", str(e))
+        raise HTTPException(
+            status_code=400,
+            detail={"mensaje": str(e), "items": e.resultados}
+        )
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/inscribir/carrito", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except (EjecutorSaturado, OperationalError):
+        # Los responden sus manejadores (429 y 503)
+        raise
+
+    except Exception as e:
+        print(f"Error interno en el carrito: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al procesar la inscripción."
+        )
+
+
+class ReservaRequest(BaseModel):
+    # Cupos a retener mientras se cargan los datos de las personas
+    actividad: str
+    fecha_actividad: FechaApi
+    horario_actividad: HorarioApi
+    cantidad: int
+    duracion_segundos: Optional[float] = None
+
+
+class ConfirmacionReservaRequest(BaseModel):
+    personas: List[PersonaInscripcion]
+    acepta_terminos_condiciones: bool
+
+
+@app.post(
+    "/reservas",
+    status_code=201,
+    response_model=dict,
+    tags=["Reservas"]
+)
+async def post_reserva(request_data: ReservaRequest):
+    """
+    Retiene cupos de un turno por unos minutos. Si no se confirman antes
+    de `vence_en`, vuelven a estar disponibles.
+    """
+    try:
+        token, vence_en = await ejecutar_escritura(
+            reservar_cupos,
+            request_data.actividad,
+            request_data.fecha_actividad,
+            request_data.horario_actividad,
+            request_data.cantidad,
+            request_data.duracion_segundos
+        )
+        return {
+            "token": token,
+            "cantidad": request_data.cantidad,
+            "vence_en": vence_en
+        }
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/reservas", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post(
+    "/reservas/{token}/confirmar",
+    status_code=201,
+    response_model=dict,
+    tags=["Reservas"]
+)
+async def post_confirmar_reserva(
+        token: str, request_data: ConfirmacionReservaRequest):
+    # Inscribe a las personas con los cupos retenidos por la reserva
+    personas_dict = [p.dict() for p in request_data.personas]
+    try:
+        inscriptas = await ejecutar_escritura(
+            confirmar_reserva,
+            token,
+            personas_dict,
+            request_data.acepta_terminos_condiciones
+        )
+        return {
+            "mensaje": "Inscripción realizada con éxito.",
+            "inscriptas": inscriptas
+        }
+
+    except ValueError as e:
+        metricas.contar(
+            metricas.rechazos, "/reservas/{token}/confirmar", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete(
+    "/reservas/{token}",
+    response_model=dict,
+    tags=["Reservas"]
+)
+async def delete_reserva(token: str):
+    # Devuelve los cupos de una reserva que no se va a confirmar
+    liberados = await ejecutar_escritura(liberar_reserva, token)
+    if not liberados:
+        raise HTTPException(
+            status_code=404, detail="La reserva no existe o ya venció.")
+    return {"liberados": liberados}
+
+
+@app.post(
+    "/lista-espera",
+    status_code=201,
+    response_model=dict,
+    tags=["Lista de espera"]
+)
+async def post_lista_espera(request_data: InscripcionRequest):
+    """
+    Anota al grupo en la lista de espera del turno. Cuando se liberan
+    cupos los grupos se inscriben solos, en orden de llegada.
+    """
+    personas_dict = [p.dict() for p in request_data.personas]
+    try:
+        return await ejecutar_escritura(
+            anotar_en_lista_espera,
+            request_data.actividad,
+            request_data.fecha_actividad,
+            request_data.horario_actividad,
+            personas_dict,
+            request_data.acepta_terminos_condiciones
+        )
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/lista-espera", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get(
+    "/lista-espera/{id_espera}",
+    response_model=dict,
+    tags=["Lista de espera"]
+)
+async def get_lista_espera(id_espera: int):
+    # Estado del grupo (esperando, inscripto, ...) y posición en la lista
+    try:
+        return await ejecutar_lectura(consultar_lista_espera, id_espera)
+
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete(
+    "/lista-espera/{id_espera}",
+    response_model=dict,
+    tags=["Lista de espera"]
+)
+async def delete_lista_espera(id_espera: int):
+    if not await ejecutar_escritura(cancelar_lista_espera, id_espera):
+        raise HTTPException(
+            status_code=404,
+            detail="El grupo no está esperando en la lista.")
+    return {"mensaje": "El grupo salió de la lista de espera."}
+
+
+@app.delete(
+    "/inscripciones",
+    response_model=dict,
+    tags=["Inscripciones"]
+)
+async def delete_inscripciones(
+        actividad: str,
+        fecha_actividad: FechaApi,
+        horario_actividad: HorarioApi,
+        dni: List[int] = Query()):
+    """
+    Cancela la inscripción de una persona (un `dni`) o de un grupo (varios
+    `dni`) y devuelve los cupos al turno.
+    """
+    try:
+        canceladas = await ejecutar_escritura(
+            cancelar_inscripciones,
+            actividad,
+            fecha_actividad,
+            horario_actividad,
+            dni
+        )
+        return {"canceladas": canceladas}
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/inscripciones", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete(
+    "/turnos/inscripciones",
+    response_model=dict,
+    tags=["Administración"]
+)
+async def delete_inscripciones_turno(
+        actividad: str, fecha_actividad: FechaApi,
+        horario_actividad: HorarioApi):
+    """
+    Cancela todas las inscripciones de un turno (por ejemplo si se
+    suspende por clima) y devuelve sus cupos.
+    """
+    try:
+        canceladas = await ejecutar_escritura(
+            cancelar_turno, actividad, fecha_actividad, horario_actividad)
+        return {"canceladas": canceladas}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 class CuposRequest(BaseModel):
     # Define la estructura de los parámetros para consultar cupos
     actividad: str
-    fecha_actividad: str  # Formato DD-MM-YYYY
-    horario_actividad: str  # Formato HH:MM
+    fecha_actividad: FechaApi
+    horario_actividad: HorarioApi
 
 
 @app.post(
@@ -119,9 +542,10 @@ class CuposRequest(BaseModel):
     response_model=dict,
     tags=["Consultas"]
 )
-def get_cupos(request_data: CuposRequest):
+async def get_cupos(request_data: CuposRequest):
     try:
-        resultado_cupos = mostrar_cupos_para_fecha_hora_actividad(
+        resultado_cupos = await ejecutar_lectura(
+            mostrar_cupos_para_fecha_hora_actividad,
             request_data.actividad,
             request_data.fecha_actividad,
             request_data.horario_actividad
@@ -130,11 +554,324 @@ def get_cupos(request_data: CuposRequest):
         return {"cupos": resultado_cupos}
 
     except ValueError as e:
+        metricas.contar(metricas.rechazos, "/cupos", str(e))
         raise HTTPException(status_code=404, detail=str(e))
 
+    except (EjecutorSaturado, OperationalError):
+        # Los responden sus manejadores (429 y 503)
+        raise
+
     except Exception as e:
         print(f"Error interno al consultar cupos: {e}")
         raise HTTPException(
             status_code=500,
             detail="Error interno del servidor al consultar cupos."
-        )
\ No newline at end of file
+        )
+
+
+class GrillaCuposRequest(BaseModel):
+    # Parámetros para consultar la grilla de cupos de uno o más días
+    fecha_desde: FechaApi
+    fecha_hasta: Optional[FechaApi] = None
+    actividad: Optional[str] = None  # Si se omite, todas las actividades
+
+
+@app.post(
+    "/cupos/grilla",
+    response_model=dict,
+    tags=["Consultas"]
+)
+async def get_grilla_cupos(request_data: GrillaCuposRequest):
+    """
+    Devuelve los cupos de todos los horarios de una fecha (o rango de
+    fechas) en una sola llamada, para evitar una consulta por horario.
+    """
+    try:
+        grilla = await ejecutar_lectura(
+            mostrar_grilla_cupos,
+            request_data.fecha_desde,
+            request_data.fecha_hasta,
+            request_data.actividad
+        )
+        return {"grilla": grilla}
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/cupos/grilla", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except (EjecutorSaturado, OperationalError):
+        # Los responden sus manejadores (429 y 503)
+        raise
+
+    except Exception as e:
+        print(f"Error interno al consultar la grilla de cupos: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno del servidor al consultar cupos."
+        )
+
+
+# Los clientes y proxies pueden guardar la respuesta de GET /cupos, pero
+# deben revalidarla con If-None-Match antes de usarla
+CACHE_CONTROL_CUPOS = "public, no-cache"
+
+
+def _etag_coincide(if_none_match, etag):
+    # If-None-Match puede traer varios ETags y usa la comparación débil
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidato.strip().removeprefix("W/") == etag
+        for candidato in if_none_match.split(","))
+
+
+@app.get(
+    "/cupos",
+    response_model=dict,
+    tags=["Consultas"]
+)
+async def get_cupos_fecha(
+        fecha_actividad: FechaApi,
+        actividad: Optional[str] = None,
+        horario_actividad: Optional[HorarioApi] = None,
+        if_none_match: Optional[str] = Header(default=None)):
+    """
+    Cupos de una fecha (de todas las actividades, de una o de un horario)
+    consultables con GET. La respuesta lleva como ETag la versión de los
+    cupos de esa fecha: si el cliente la envía en If-None-Match y no hubo
+    cambios, la respuesta es un 304 sin consultar la base.
+    """
+    fecha = fecha_a_api(fecha_actividad)
+    # La versión se lee antes que los cupos: si hay una escritura en el
+    # medio, el próximo pedido ve otra versión y vuelve a consultar.
+    encabezados = {
+        "ETag": versiones_cupos.etag(fecha),
+        "Cache-Control": CACHE_CONTROL_CUPOS,
+    }
+    if _etag_coincide(if_none_match, encabezados["ETag"]):
+        return Response(status_code=304, headers=encabezados)
+
+    try:
+        grilla = await ejecutar_lectura(
+            mostrar_grilla_cupos, fecha_actividad, None, actividad)
+
+    except ValueError as e:
+        metricas.contar(metricas.rechazos, "/cupos", str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if horario_actividad is not None:
+        horario = horario_a_api(horario_actividad)
+        grilla = [
+            item for item in grilla if item["horario_actividad"] == horario]
+
+    return JSONResponse(
+        {"fecha_actividad": fecha, "grilla": grilla}, headers=encabezados)
+
+
+# Fechas que puede seguir una suscripción a GET /cupos/eventos
+MAXIMO_FECHAS_SUSCRIPCION = 7
+
+# Segundos sin cambios tras los que se envía un comentario, para que
+# proxies y clientes no den la conexión por muerta
+INTERVALO_LATIDO = 15
+
+# Segundos que dura una conexión de GET /cupos/eventos; luego el cliente
+# se vuelve a conectar. Al detenerse, uvicorn espera a que terminen las
+# respuestas en curso, así que esto acota esa espera.
+DURACION_FLUJO = 300
+
+
+def _evento_sse(evento, datos):
+    return f"event: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+
+def _es_posterior(cambio, orden):
+    # Si el cambio es de una escritura posterior a `orden` (o no se sabe)
+    return cambio.orden is None or orden is None or cambio.orden > orden
+
+
+async def _flujo_cupos(request: Request, suscripcion):
+    """
+    Envía los cambios de la suscripción como eventos `cupos`, con el
+    último valor de cada turno modificado. Si el cliente no leyó a tiempo
+    y se perdieron cambios, envía `resincronizar` para que vuelva a
+    consultar la grilla. Termina a los DURACION_FLUJO segundos.
+
+    Los cambios de una escritura anterior a la última ya enviada para el
+    turno (que se publicaron tarde) se descartan.
+    """
+    reloj = asyncio.get_running_loop().time
+    fin = reloj() + DURACION_FLUJO
+    enviados = {}  # turno -> orden de la última escritura enviada
+    try:
+        yield f"retry: {INTERVALO_LATIDO * 1000}\n\n"
+        while reloj() < fin and not await request.is_disconnected():
+            cambios = await suscripcion.siguientes(
+                min(INTERVALO_LATIDO, fin - reloj()))
+            if suscripcion.desbordada:
+                suscripcion.descartar_pendientes()
+                yield _evento_sse("resincronizar", {})
+                continue
+            if not cambios:
+                yield ": latido\n\n"
+                continue
+
+            # Si un turno cambió varias veces, alcanza con el cambio de la
+            # última escritura
+            ultimos = {}
+            for cambio in cambios:
+                turno = (cambio.actividad, cambio.fecha_actividad,
+                         cambio.horario_actividad)
+                ultimo = ultimos.get(turno)
+                if _es_posterior(cambio, enviados.get(turno)) and (
+                        ultimo is None or _es_posterior(cambio, ultimo.orden)):
+                    ultimos[turno] = cambio
+
+            for turno, cambio in ultimos.items():
+                actividad, fecha, horario = turno
+                cupos = cambio.cupos
+                if cambio.orden is not None:
+                    enviados[turno] = cambio.orden
+                if cupos is None:
+                    # Se consulta una vez por turno modificado y por
+                    # conexión (la primera deja el valor en caché)
+                    try:
+                        resultado = await ejecutar_lectura(
+                            mostrar_cupos_para_fecha_hora_actividad,
+                            actividad, fecha, horario)
+                    except EjecutorSaturado:
+                        yield _evento_sse("resincronizar", {})
+                        break
+                    if resultado is None:
+                        continue
+                    cupos = resultado[0]
+
+                datos = {
+                    "actividad": actividad,
+                    "fecha_actividad": fecha,
+                    "horario_actividad": horario,
+                    "cupos": cupos,
+                }
+                if cambio.orden is not None:
+                    datos["orden"] = cambio.orden
+                yield _evento_sse("cupos", datos)
+    finally:
+        canal_cupos.desuscribir(suscripcion)
+
+
+@app.get(
+    "/cupos/eventos",
+    response_class=StreamingResponse,
+    tags=["Consultas"]
+)
+async def get_eventos_cupos(
+        request: Request,
+        fecha_actividad: List[FechaApi] = Query(),
+        actividad: List[str] = Query(default=[])):
+    """
+    Flujo de Server-Sent Events con los cupos de cada turno que cambia en
+    las fechas pedidas (y actividades, si se indican). El cliente carga
+    la grilla una vez y después solo recibe los cambios, en lugar de
+    volver a consultar todos los horarios.
+    """
+    if len(fecha_actividad) > MAXIMO_FECHAS_SUSCRIPCION:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "No se pueden seguir más de "
+                f"{MAXIMO_FECHAS_SUSCRIPCION} fechas a la vez"))
+
+    suscripcion = canal_cupos.suscribir(
+        [fecha_a_api(fecha) for fecha in fecha_actividad], actividad)
+    return StreamingResponse(
+        _flujo_cupos(request, suscripcion),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.get(
+    "/cupos/cache",
+    response_model=dict,
+    tags=["Consultas"]
+)
+def get_estadisticas_cache_cupos():
+    # Aciertos, fallos y ocupación de la caché de cupos
+    return cache_cupos.estadisticas()
+
+
+@app.get(
+    "/reportes/ocupacion",
+    response_model=dict,
+    tags=["Reportes"]
+)
+async def get_reporte_ocupacion(
+        fecha_desde: FechaApi,
+        fecha_hasta: Optional[FechaApi] = None,
+        actividad: Optional[str] = None):
+    """
+    Inscriptos, cupos libres y ocupación de cada turno entre fecha_desde
+    y fecha_hasta (incluidas).
+    """
+    try:
+        turnos = await ejecutar_lectura(
+            reporte_ocupacion, fecha_desde, fecha_hasta, actividad)
+        return {"turnos": turnos}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get(
+    "/reportes/tallas",
+    response_model=dict,
+    tags=["Reportes"]
+)
+async def get_reporte_tallas(
+        fecha_desde: FechaApi,
+        fecha_hasta: Optional[FechaApi] = None,
+        actividad: Optional[str] = None):
+    """
+    Equipos de seguridad (arnés y casco) a preparar por día, actividad y
+    talla entre fecha_desde y fecha_hasta (incluidas).
+    """
+    try:
+        demanda = await ejecutar_lectura(
+            reporte_demanda_tallas, fecha_desde, fecha_hasta, actividad)
+        return {"demanda": demanda}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post(
+    "/catalogo/recargar",
+    response_model=dict,
+    tags=["Administración"]
+)
+async def post_recargar_catalogo():
+    """
+    Vuelve a leer ACTIVIDADES, HORARIOS y TALLAS luego de modificarlas.
+    """
+    catalogo = await ejecutar_lectura(recargar_catalogo)
+    return {
+        "actividades": len(catalogo.actividades),
+        "horarios": len(catalogo.horarios),
+        "tallas": len(catalogo.tallas),
+    }
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    tags=["Administración"]
+)
+def get_metricas():
+    """
+    Latencias por fase de la inscripción y por ruta, rechazos por motivo
+    y reintentos por base ocupada, en formato de texto de Prometheus.
+    """
+    return PlainTextResponse(
+        metricas.exportar_prometheus(),
+        media_type="text/plain; version=0.0.4")
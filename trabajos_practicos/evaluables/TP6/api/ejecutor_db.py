@@ -0,0 +1,148 @@
+"""
+Ejecución de las funciones de base de datos fuera del event loop.
+
+Las lecturas y las escrituras usan pools de hilos propios y acotados, así
+una ráfaga de escrituras lentas no deja sin hilos a las consultas de
+cupos. Cuando un pool tiene todos sus hilos ocupados y la cola de espera
+llena, se rechaza la tarea con EjecutorSaturado (la API responde 429).
+
+Con PARQUE_API_MODO=threadpool se usa el pool por defecto de Starlette
+(el comportamiento de los endpoints sincrónicos), sin límite propio.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+MODO_DEDICADO = "dedicado"
+MODO_THREADPOOL = "threadpool"
+
+MODO_POR_DEFECTO = os.environ.get("PARQUE_API_MODO", MODO_DEDICADO)
+HILOS_LECTURA = int(os.environ.get("PARQUE_HILOS_LECTURA", "6"))
+COLA_LECTURA = int(os.environ.get("PARQUE_COLA_LECTURA", "64"))
+HILOS_ESCRITURA = int(os.environ.get("PARQUE_HILOS_ESCRITURA", "2"))
+COLA_ESCRITURA = int(os.environ.get("PARQUE_COLA_ESCRITURA", "32"))
+
+
+class EjecutorSaturado(Exception):
+    pass
+
+
+class EjecutorAcotado:
+    """
+    Pool de hilos con un máximo de tareas en curso (hilos + cola). Las
+    tareas que superan ese máximo se rechazan en lugar de encolarse sin
+    límite.
+    """
+
+    def __init__(self, nombre, hilos, cola_maxima):
+        self.nombre = nombre
+        self.hilos = hilos
+        self.cola_maxima = cola_maxima
+        self._executor = ThreadPoolExecutor(
+            max_workers=hilos, thread_name_prefix=f"db-{nombre}")
+        self._lugares = threading.BoundedSemaphore(hilos + cola_maxima)
+        self.rechazadas = 0
+
+    async def ejecutar(self, funcion, *args, **kwargs):
+        if not self._lugares.acquire(blocking=False):
+            self.rechazadas += 1
+            raise EjecutorSaturado(
+                f"Demasiadas solicitudes de {self.nombre} en curso")
+
+        try:
+            futuro = self._executor.submit(
+                functools.partial(funcion, *args, **kwargs))
+        except Exception:
+            self._lugares.release()
+            raise
+
+        # El lugar se libera cuando termina la tarea en el hilo, aunque
+        # el cliente se haya desconectado antes.
+        futuro.add_done_callback(lambda _: self._lugares.release())
+        return await asyncio.wrap_future(futuro)
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False)
+
+
+_modo = MODO_POR_DEFECTO
+_ejecutor_lecturas = None
+_ejecutor_escrituras = None
+_lock_configuracion = threading.Lock()
+
+
+def configurar_ejecutores(modo=None, hilos_lectura=None, cola_lectura=None,
+                          hilos_escritura=None, cola_escritura=None):
+    """
+    Reemplaza los pools de lectura y escritura. Los parámetros omitidos
+    toman el valor por defecto (configurable por variables de entorno).
+    """
+    global _modo, _ejecutor_lecturas, _ejecutor_escrituras
+    modo = modo or MODO_POR_DEFECTO
+    if modo not in (MODO_DEDICADO, MODO_THREADPOOL):
+        raise ValueError(f"Modo de ejecución desconocido: {modo}")
+
+    cerrar_ejecutores()
+    with _lock_configuracion:
+        _modo = modo
+        _ejecutor_lecturas = EjecutorAcotado(
+            "lecturas",
+            hilos_lectura or HILOS_LECTURA,
+            COLA_LECTURA if cola_lectura is None else cola_lectura)
+        _ejecutor_escrituras = EjecutorAcotado(
+            "escrituras",
+            hilos_escritura or HILOS_ESCRITURA,
+            COLA_ESCRITURA if cola_escritura is None else cola_escritura)
+
+
+def cerrar_ejecutores():
+    global _ejecutor_lecturas, _ejecutor_escrituras
+    with _lock_configuracion:
+        ejecutores = (_ejecutor_lecturas, _ejecutor_escrituras)
+        _ejecutor_lecturas = None
+        _ejecutor_escrituras = None
+    for ejecutor in ejecutores:
+        if ejecutor is not None:
+            ejecutor.cerrar()
+
+
+def _obtener_ejecutores():
+    global _ejecutor_lecturas, _ejecutor_escrituras
+    with _lock_configuracion:
+        if _ejecutor_lecturas is None:
+            _ejecutor_lecturas = EjecutorAcotado(
+                "lecturas", HILOS_LECTURA, COLA_LECTURA)
+            _ejecutor_escrituras = EjecutorAcotado(
+                "escrituras", HILOS_ESCRITURA, COLA_ESCRITURA)
+        return _ejecutor_lecturas, _ejecutor_escrituras
+
+
+def modo_actual():
+    return _modo
+
+
+def estadisticas_ejecutores():
+    lecturas, escrituras = _obtener_ejecutores()
+    return {
+        "modo": _modo,
+        "lecturas_rechazadas": lecturas.rechazadas,
+        "escrituras_rechazadas": escrituras.rechazadas,
+    }
+
+
+async def ejecutar_lectura(funcion, *args, **kwargs):
+    if _modo == MODO_THREADPOOL:
+        return await run_in_threadpool(funcion, *args, **kwargs)
+    lecturas, _ = _obtener_ejecutores()
+    return await lecturas.ejecutar(funcion, *args, **kwargs)
+
+
+async def ejecutar_escritura(funcion, *args, **kwargs):
+    if _modo == MODO_THREADPOOL:
+        return await run_in_threadpool(funcion, *args, **kwargs)
+    _, escrituras = _obtener_ejecutores()
+    return await escrituras.ejecutar(funcion, *args, **kwargs)
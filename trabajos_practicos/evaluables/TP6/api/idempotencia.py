@@ -0,0 +1,120 @@
+"""
+Claves de idempotencia (encabezado Idempotency-Key) para las inscripciones.
+
+Si el cliente reintenta una inscripción con la misma clave (por ejemplo
+luego de un timeout), se devuelve la respuesta guardada del primer intento
+en lugar de volver a ejecutar la transacción, que fallaría por DNI
+repetido aunque la inscripción original se haya hecho.
+
+Las respuestas se guardan en memoria con vencimiento y desalojo LRU
+(CacheLRU). Se guardan solo los resultados definitivos (201 y 400): una
+respuesta 429, 503 o 500 no registró nada y se puede volver a intentar.
+"""
+import asyncio
+import hashlib
+import json
+import os
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from data.cache_cupos import NO_ENCONTRADO, CacheLRU
+
+ENCABEZADO = "Idempotency-Key"
+
+# Segundos durante los que se recuerda cada clave
+TTL_POR_DEFECTO = float(os.environ.get("PARQUE_IDEMPOTENCIA_TTL", "86400"))
+
+# Cantidad máxima de claves recordadas
+CAPACIDAD_POR_DEFECTO = int(
+    os.environ.get("PARQUE_IDEMPOTENCIA_CAPACIDAD", "10000"))
+
+LARGO_MAXIMO_CLAVE = 255
+
+# Estados que son un resultado definitivo de la inscripción
+ESTADOS_GUARDADOS = (201, 400)
+
+
+class RegistroIdempotencia:
+    """
+    Recuerda la respuesta de cada (ruta, clave) junto con una huella del
+    cuerpo de la solicitud. Debe usarse desde el loop de eventos: las
+    solicitudes repetidas que llegan mientras la primera sigue en curso
+    esperan su resultado.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO,
+                 ttl_segundos=TTL_POR_DEFECTO):
+        self.respuestas = CacheLRU(capacidad, ttl_segundos)
+        self._en_curso = {}  # (ruta, clave) -> asyncio.Future
+        self.repetidas = 0
+
+    async def ejecutar(self, ruta, clave, cuerpo, operacion):
+        """
+        Ejecuta `operacion` (una corrutina sin argumentos que devuelve el
+        contenido de la respuesta o lanza HTTPException) a menos que la
+        clave ya tenga una respuesta guardada. Sin clave no hace nada.
+        """
+        if clave is None:
+            return await operacion()
+
+        if not clave or len(clave) > LARGO_MAXIMO_CLAVE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"El encabezado {ENCABEZADO} no es válido")
+
+        id_clave = (ruta, clave)
+        huella = _huella(cuerpo)
+
+        # Si la primera termina sin guardar respuesta (por ejemplo con un
+        # 503), la que sigue se ejecuta normalmente.
+        while id_clave in self._en_curso:
+            await asyncio.shield(self._en_curso[id_clave])
+
+        guardada = self.respuestas.obtener(id_clave)
+        if guardada is not NO_ENCONTRADO:
+            return self._repetir(huella, guardada)
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[id_clave] = futuro
+        try:
+            try:
+                contenido = await operacion()
+            except HTTPException as e:
+                if e.status_code in ESTADOS_GUARDADOS:
+                    self.respuestas.guardar(
+                        id_clave, (huella, e.status_code, e.detail))
+                raise
+            self.respuestas.guardar(id_clave, (huella, 201, contenido))
+            return contenido
+        finally:
+            del self._en_curso[id_clave]
+            futuro.set_result(None)
+
+    def _repetir(self, huella, guardada):
+        huella_guardada, estado, contenido = guardada
+        if huella != huella_guardada:
+            raise HTTPException(
+                status_code=422,
+                detail=f"La clave {ENCABEZADO} ya se usó con otra solicitud")
+
+        self.repetidas += 1
+        encabezados = {"Idempotent-Replayed": "true"}
+        if estado >= 400:
+            raise HTTPException(
+                status_code=estado, detail=contenido, headers=encabezados)
+        return JSONResponse(
+            status_code=estado, content=contenido, headers=encabezados)
+
+    def limpiar(self):
+        self.respuestas.limpiar()
+        self.repetidas = 0
+
+
+def _huella(cuerpo):
+    texto = json.dumps(cuerpo, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+# Registro compartido por los endpoints de inscripción
+registro_idempotencia = RegistroIdempotencia()
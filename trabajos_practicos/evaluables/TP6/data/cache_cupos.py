@@ -0,0 +1,199 @@
+"""
+Caché en memoria de ACTIVIDADES_X_HORARIOS para las consultas de cupos.
+
+Las lecturas de cupos son mucho más frecuentes que las inscripciones, así
+que se guardan por (actividad, fecha, hora) con vencimiento (TTL) y
+desalojo LRU. La inscripción actualiza la entrada luego del commit.
+Una lectura que consultó la base antes de ese commit no debe pisar el
+valor nuevo: toma la generación de la caché antes de leer y la pasa a
+guardar(), que descarta el valor si la clave se modificó mientras tanto.
+Dos escrituras del mismo turno pueden avisar en otro orden que el de sus
+commits: cada una pasa el número de su transacción (tomado con el
+bloqueo de escritura) y el valor de una escritura anterior a la última
+guardada se descarta.
+Cada proceso tiene su propia caché: si hay varios procesos escribiendo,
+el TTL acota cuánto tiempo puede verse un valor desactualizado.
+
+VersionesCupos lleva además un contador por fecha que cada escritura
+incrementa; la API lo usa como ETag de GET /cupos.
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# Segundos que una entrada se considera válida
+TTL_POR_DEFECTO = float(os.environ.get("PARQUE_CACHE_TTL", "30"))
+
+# Cantidad máxima de entradas antes de desalojar la menos usada
+CAPACIDAD_POR_DEFECTO = int(os.environ.get("PARQUE_CACHE_CAPACIDAD", "4096"))
+
+# Valor que devuelve obtener() cuando la clave no está (o venció)
+NO_ENCONTRADO = object()
+
+
+class CacheLRU:
+    """
+    Caché clave/valor con TTL y desalojo LRU, segura para usar desde
+    varios hilos. Lleva contadores de aciertos, fallos y desalojos.
+
+    Cada escritura (guardar sin generación o invalidar) recibe un número
+    de secuencia que se anota para su clave, junto con el orden de la
+    escritura si se indica. Las modificaciones anotadas se acotan a la
+    capacidad: de las que se olvidan solo se recuerdan la secuencia y el
+    orden más altos, y una clave sin anotación se trata como modificada
+    en ese momento y por esa escritura.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO,
+                 ttl_segundos=TTL_POR_DEFECTO, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._entradas = OrderedDict()  # clave -> (vence, valor)
+        self._lock = threading.Lock()
+        self._secuencia = 0
+        # clave -> (secuencia, orden de la última escritura)
+        self._modificaciones = OrderedDict()
+        self._olvidadas_hasta = (0, 0)
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] <= self._reloj():
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                return NO_ENCONTRADO
+
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def generacion(self):
+        """
+        Marca a tomar antes de leer el valor de la fuente, para pasarla a
+        guardar().
+        """
+        with self._lock:
+            return self._secuencia
+
+    def _ultima_modificacion(self, clave):
+        # (secuencia, orden); se llama con el lock tomado
+        return self._modificaciones.get(clave, self._olvidadas_hasta)
+
+    def _modificar(self, clave, orden=None):
+        # Se llama con el lock tomado
+        self._secuencia += 1
+        orden = max(orden or 0, self._ultima_modificacion(clave)[1])
+        self._modificaciones[clave] = (self._secuencia, orden)
+        self._modificaciones.move_to_end(clave)
+        if len(self._modificaciones) > self.capacidad:
+            _, (secuencia, orden) = self._modificaciones.popitem(last=False)
+            self._olvidadas_hasta = (
+                secuencia, max(orden, self._olvidadas_hasta[1]))
+
+    def guardar(self, clave, valor, generacion=None, orden=None):
+        """
+        Guarda el valor de la clave. Sin `generacion` es una escritura
+        (el valor nuevo luego de un commit); con `orden`, el valor se
+        descarta si ya se guardó el de una escritura posterior, y se
+        invalida la entrada si no se puede saber. Con `generacion` es el
+        resultado de una lectura: no se guarda si la clave se modificó
+        después de tomar esa generación. Devuelve si se guardó.
+        """
+        with self._lock:
+            if generacion is None:
+                anterior = orden is not None and (
+                    orden <= self._ultima_modificacion(clave)[1])
+                if anterior and clave not in self._modificaciones:
+                    self._modificar(clave)
+                    self._entradas.pop(clave, None)
+                if anterior:
+                    return False
+                self._modificar(clave, orden)
+            elif self._ultima_modificacion(clave)[0] > generacion:
+                return False
+
+            self._entradas[clave] = (self._reloj() + self.ttl_segundos, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+            return True
+
+    def invalidar(self, clave, orden=None):
+        with self._lock:
+            self._modificar(clave, orden)
+            self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._secuencia = 0
+            self._modificaciones.clear()
+            self._olvidadas_hasta = (0, 0)
+            self.aciertos = 0
+            self.fallos = 0
+            self.desalojos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": (
+                    self.aciertos / consultas if consultas else 0.0),
+                "entradas": len(self._entradas),
+                "capacidad": self.capacidad,
+                "ttl_segundos": self.ttl_segundos,
+            }
+
+
+class VersionesCupos:
+    """
+    Versión de los cupos de cada fecha (DD-MM-YYYY). Las funciones que
+    modifican cupos la incrementan luego del commit (con
+    src.eventos.turno_modificado), así que dos lecturas con la misma
+    versión ven los mismos cupos de esa fecha.
+
+    La época es un valor aleatorio por proceso: al reiniciar el servidor
+    los contadores vuelven a cero, pero los ETags anteriores dejan de
+    coincidir. Como la caché, solo ve las escrituras de su proceso.
+    """
+
+    def __init__(self):
+        self._versiones = {}
+        self._lock = threading.Lock()
+        self.epoca = secrets.token_hex(4)
+
+    def incrementar(self, fecha_actividad):
+        with self._lock:
+            self._versiones[fecha_actividad] = (
+                self._versiones.get(fecha_actividad, 0) + 1)
+
+    def version(self, fecha_actividad):
+        with self._lock:
+            return self._versiones.get(fecha_actividad, 0)
+
+    def etag(self, fecha_actividad):
+        # ETag fuerte: cambia con cada escritura en la fecha
+        return f'"{self.epoca}-{self.version(fecha_actividad)}"'
+
+    def limpiar(self):
+        with self._lock:
+            self._versiones.clear()
+
+
+# Caché compartida de cupos, con clave (actividad, fecha, hora)
+cache_cupos = CacheLRU()
+
+# Versiones de los cupos por fecha, con la misma fecha que la clave de
+# cache_cupos
+versiones_cupos = VersionesCupos()
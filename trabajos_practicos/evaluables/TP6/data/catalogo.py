@@ -0,0 +1,87 @@
+"""
+Tablas de referencia (ACTIVIDADES, HORARIOS y TALLAS) en memoria.
+
+Son tablas chicas que casi no cambian, así que se leen una sola vez y se
+guardan en mapas inmutables. Así la inscripción y las consultas de cupos
+resuelven los ids sin SQL y van directo a la clave primaria de
+ACTIVIDADES_X_HORARIOS. Si se modifican las tablas hay que llamar a
+recargar_catalogo().
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from data.conexion import conexion
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    actividades: Mapping[str, int]  # nombre -> id
+    horarios: Mapping[str, int]  # hora "HH:MM" -> id
+    tallas: Mapping[str, int]  # nombre -> id
+    nombres_actividades: Mapping[int, str]  # id -> nombre
+    horas: Mapping[int, str]  # id -> hora "HH:MM"
+    nombres_tallas: Mapping[int, str]  # id -> nombre
+
+    @classmethod
+    def desde_filas(cls, actividades, horarios, tallas):
+        """
+        Arma el catálogo a partir de pares (id, nombre) de cada tabla.
+        """
+        return cls(
+            actividades=MappingProxyType(
+                {nombre: id_ for id_, nombre in actividades}),
+            horarios=MappingProxyType(
+                {hora: id_ for id_, hora in horarios}),
+            tallas=MappingProxyType(
+                {nombre: id_ for id_, nombre in tallas}),
+            nombres_actividades=MappingProxyType(dict(actividades)),
+            horas=MappingProxyType(dict(horarios)),
+            nombres_tallas=MappingProxyType(dict(tallas)),
+        )
+
+
+_catalogo = None
+_lock = threading.Lock()
+
+
+def _leer_catalogo():
+    with conexion() as conn:
+        actividades = conn.execute(
+            "SELECT id, nombre FROM ACTIVIDADES").fetchall()
+        horarios = conn.execute("SELECT id, hora FROM HORARIOS").fetchall()
+        tallas = conn.execute("SELECT id, nombre FROM TALLAS").fetchall()
+    return Catalogo.desde_filas(actividades, horarios, tallas)
+
+
+def obtener_catalogo():
+    # Se carga en el primer uso si no se precargó al iniciar la API
+    global _catalogo
+    catalogo = _catalogo
+    if catalogo is None:
+        with _lock:
+            if _catalogo is None:
+                _catalogo = _leer_catalogo()
+            catalogo = _catalogo
+    return catalogo
+
+
+def recargar_catalogo():
+    """
+    Vuelve a leer las tablas de referencia. El catálogo anterior se
+    reemplaza completo, por lo que quien ya lo tenía sigue viendo una
+    versión consistente.
+    """
+    global _catalogo
+    catalogo = _leer_catalogo()
+    with _lock:
+        _catalogo = catalogo
+    return catalogo
+
+
+def establecer_catalogo(catalogo):
+    # Reemplaza el catálogo en memoria (None fuerza una nueva lectura)
+    global _catalogo
+    with _lock:
+        _catalogo = catalogo
@@ -0,0 +1,216 @@
+"""
+Acceso compartido a la base de datos del parque.
+
+Mantiene un pool de conexiones SQLite ya configuradas (WAL,
+synchronous=NORMAL, busy_timeout y caché de sentencias preparadas) para
+no abrir y cerrar una conexión en cada solicitud.
+"""
+import itertools
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from sqlite3 import OperationalError
+
+from data import metricas
+
+# Ruta por defecto: parque.db junto a este módulo. Se puede cambiar con la
+# variable de entorno PARQUE_DB_RUTA o con configurar_base_datos().
+RUTA_DB_POR_DEFECTO = os.environ.get(
+    "PARQUE_DB_RUTA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "parque.db"))
+
+# Cantidad máxima de conexiones abiertas en simultáneo
+TAMANIO_POOL_POR_DEFECTO = int(os.environ.get("PARQUE_DB_POOL", "8"))
+
+# Milisegundos que SQLite espera un bloqueo antes de "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Segundos que se espera una conexión libre cuando el pool está lleno
+ESPERA_POOL = BUSY_TIMEOUT_MS / 1000
+
+# Sentencias preparadas que cada conexión mantiene en caché
+SENTENCIAS_EN_CACHE = 256
+
+# Reintentos para tomar el bloqueo de escritura cuando la base está ocupada
+MAXIMO_REINTENTOS_BLOQUEO = 5
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones SQLite. Cada conexión la usa un solo hilo a la vez;
+    si un hilo pide una conexión mientras ya tiene una tomada, recibe la
+    misma (así una función puede llamar a otra sin abrir una segunda
+    conexión ni quedar bloqueada por su propia transacción).
+    """
+
+    def __init__(self, ruta, tamanio_maximo=TAMANIO_POOL_POR_DEFECTO):
+        self.ruta = ruta
+        self.tamanio_maximo = tamanio_maximo
+        self._libres = queue.LifoQueue()
+        self._creadas = 0
+        self._lock = threading.Lock()
+        self._hilo = threading.local()
+
+    def _crear_conexion(self):
+        # isolation_level=None: las transacciones se abren explícitamente
+        conn = sqlite3.connect(
+            self.ruta,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=SENTENCIAS_EN_CACHE)
+        if self.ruta != ":memory:":
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return conn
+
+    def obtener(self):
+        tomada = getattr(self._hilo, "conexion", None)
+        if tomada is not None:
+            self._hilo.profundidad += 1
+            return tomada
+
+        try:
+            conn = self._libres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                puede_crear = self._creadas < self.tamanio_maximo
+                if puede_crear:
+                    self._creadas += 1
+            if puede_crear:
+                try:
+                    conn = self._crear_conexion()
+                except Exception:
+                    with self._lock:
+                        self._creadas -= 1
+                    raise
+            else:
+                # Pool lleno: se espera a que otro hilo devuelva una. Si
+                # no llega a tiempo se informa como una base ocupada
+                # (la API responde 503)
+                try:
+                    conn = self._libres.get(timeout=ESPERA_POOL)
+                except queue.Empty:
+                    raise OperationalError("pool agotado") from None
+
+        self._hilo.conexion = conn
+        self._hilo.profundidad = 1
+        return conn
+
+    def devolver(self, conn):
+        self._hilo.profundidad -= 1
+        if self._hilo.profundidad > 0:
+            return
+        self._hilo.conexion = None
+
+        # Una transacción que quedó abierta no debe pasar al próximo uso
+        if conn.in_transaction:
+            conn.rollback()
+        self._libres.put(conn)
+
+    def cerrar(self):
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._creadas -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_ruta_configurada = RUTA_DB_POR_DEFECTO
+_tamanio_configurado = TAMANIO_POOL_POR_DEFECTO
+
+
+def configurar_base_datos(ruta=None, tamanio_pool=None):
+    """
+    Cambia la base de datos (y opcionalmente el tamaño del pool) que usa
+    la aplicación. Las conexiones abiertas contra la ruta anterior se
+    cierran.
+    """
+    global _ruta_configurada, _tamanio_configurado
+    with _pool_lock:
+        _ruta_configurada = ruta or RUTA_DB_POR_DEFECTO
+        _tamanio_configurado = tamanio_pool or TAMANIO_POOL_POR_DEFECTO
+    cerrar_pool()
+
+
+def obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoolConexiones(_ruta_configurada, _tamanio_configurado)
+        return _pool
+
+
+def cerrar_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.cerrar()
+
+
+@contextmanager
+def conexion():
+    """
+    Presta una conexión del pool durante el bloque `with` y la devuelve
+    al terminar, aunque ocurra un error.
+    """
+    pool = obtener_pool()
+    conn = pool.obtener()
+    try:
+        yield conn
+    finally:
+        pool.devolver(conn)
+
+
+# Número de cada transacción de escritura del proceso, tomado con el
+# bloqueo de escritura: ordena las escrituras como sus commits
+_ordenes_escritura = itertools.count(1)
+_escritura_del_hilo = threading.local()
+
+
+def registrar_orden_escritura():
+    """
+    Numera la transacción de escritura que el hilo acaba de abrir. Se
+    llama con el bloqueo de escritura tomado.
+    """
+    _escritura_del_hilo.orden = next(_ordenes_escritura)
+
+
+def orden_escritura():
+    """
+    Número de la última transacción de escritura del hilo (None si no
+    abrió ninguna). Luego del commit sirve para descartar avisos de
+    escrituras anteriores que se publiquen tarde.
+    """
+    return getattr(_escritura_del_hilo, "orden", None)
+
+
+def iniciar_transaccion_inmediata(conn):
+    """
+    Abre una transacción tomando el bloqueo de escritura desde el inicio
+    (BEGIN IMMEDIATE), así dos escrituras sobre el mismo horario no pueden
+    leer los mismos cupos. Si la base sigue ocupada luego del
+    busy_timeout, se reintenta con una espera creciente antes de propagar
+    el error.
+    """
+    for intento in range(MAXIMO_REINTENTOS_BLOQUEO):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            registrar_orden_escritura()
+            return
+        except OperationalError as e:
+            es_ultimo_intento = intento == MAXIMO_REINTENTOS_BLOQUEO - 1
+            if "locked" not in str(e) or es_ultimo_intento:
+                raise
+            metricas.contar(metricas.reintentos_bloqueo)
+            time.sleep(random.uniform(0, 0.05 * 2 ** intento))
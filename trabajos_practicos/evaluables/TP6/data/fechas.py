@@ -0,0 +1,98 @@
+"""
+Conversión entre el formato de fecha de la API (DD-MM-YYYY) y el que se
+guarda en la base (ISO-8601, YYYY-MM-DD).
+
+En ISO las fechas ordenan igual como texto que cronológicamente, así que
+los índices sobre `fecha` sirven para consultas por rango.
+
+Las fechas y horarios que llegan a la API se parsean una vez a
+datetime.date y datetime.time. Como son pocos valores distintos (unos días
+y los horarios de los turnos), los parsers guardan sus resultados.
+"""
+import datetime
+import functools
+
+FORMATO_API = "%d-%m-%Y"
+FORMATO_DB = "%Y-%m-%d"
+
+# Valores distintos que recuerdan los parsers
+CAPACIDAD_MEMORIA = 1024
+
+
+def parsear_fecha(fecha):
+    """
+    Convierte una fecha de la API ("22-10-2025") en datetime.date. Si ya
+    es un date la devuelve igual. Lanza ValueError si no es válida.
+    """
+    if isinstance(fecha, datetime.date):
+        return fecha
+    if not isinstance(fecha, str):
+        raise ValueError(f"Fecha inválida: {fecha}")
+    return _parsear_fecha(fecha)
+
+
+@functools.lru_cache(maxsize=CAPACIDAD_MEMORIA)
+def _parsear_fecha(texto):
+    try:
+        dia, mes, anio = texto.split("-")
+        if (len(dia) != 2 or len(mes) != 2 or len(anio) != 4
+                or not (dia + mes + anio).isdigit()):
+            raise ValueError
+        return datetime.date(int(anio), int(mes), int(dia))
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {texto}") from None
+
+
+def parsear_horario(horario):
+    """
+    Convierte un horario de la API ("16:00") en datetime.time. Si ya es un
+    time lo devuelve igual. Lanza ValueError si no es válido.
+    """
+    if isinstance(horario, datetime.time):
+        return horario
+    if not isinstance(horario, str):
+        raise ValueError(f"Horario inválido: {horario}")
+    return _parsear_horario(horario)
+
+
+@functools.lru_cache(maxsize=CAPACIDAD_MEMORIA)
+def _parsear_horario(texto):
+    try:
+        hora, minutos = texto.split(":")
+        if (len(hora) != 2 or len(minutos) != 2
+                or not (hora + minutos).isdigit()):
+            raise ValueError
+        return datetime.time(int(hora), int(minutos))
+    except ValueError:
+        raise ValueError(f"Horario inválido: {texto}") from None
+
+
+@functools.lru_cache(maxsize=CAPACIDAD_MEMORIA)
+def fecha_a_api(fecha):
+    # date (o texto de la API) -> "22-10-2025"
+    return parsear_fecha(fecha).strftime(FORMATO_API)
+
+
+@functools.lru_cache(maxsize=CAPACIDAD_MEMORIA)
+def horario_a_api(horario):
+    # time (o texto de la API) -> "16:00"
+    return parsear_horario(horario).strftime("%H:%M")
+
+
+def fecha_a_db(fecha):
+    """
+    Convierte una fecha de la API ("22-10-2025") o un datetime.date al
+    formato que se guarda en la base ("2025-10-22").
+    """
+    if isinstance(fecha, datetime.date):
+        return fecha.strftime(FORMATO_DB)
+    dia, mes, anio = fecha.split("-")
+    if len(dia) != 2 or len(mes) != 2 or len(anio) != 4:
+        raise ValueError(f"Fecha inválida: {fecha}")
+    return f"{anio}-{mes}-{dia}"
+
+
+def fecha_desde_db(fecha_db):
+    # "2025-10-22" -> "22-10-2025"
+    anio, mes, dia = fecha_db.split("-")
+    return f"{dia}-{mes}-{anio}"
@@ -0,0 +1,120 @@
+"""
+Genera los turnos de ACTIVIDADES_X_HORARIOS para un rango de fechas.
+
+Para cada día en que el parque abre (ver src/calendario.py), cada
+actividad y cada horario crea un turno con los cupos máximos de la
+actividad. Todo se inserta en una transacción con un único executemany, y
+los turnos que ya existen no se tocan (conservan sus cupos), así que se
+puede volver a correr sobre el mismo rango.
+
+Uso (desde la raíz del TP):
+    python -m data.generar_turnos --desde 01-11-2025 --hasta 31-03-2026
+    python -m data.generar_turnos --desde 01-11-2025 --hasta 30-11-2025 \
+        --actividad Safari --actividad Tirolesa
+"""
+import argparse
+import datetime
+import itertools
+import sqlite3
+import time
+
+from data.conexion import RUTA_DB_POR_DEFECTO
+from src.calendario import HORARIOS_TURNOS, dias_abiertos
+
+# Rango máximo que se genera de una vez
+MAXIMO_DIAS = 731
+
+SQL_INSERTAR_TURNO = """
+INSERT INTO ACTIVIDADES_X_HORARIOS
+(id_actividad, id_horario, fecha, cupos_disponibles)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (id_actividad, id_horario, fecha) DO NOTHING
+"""
+
+
+def generar_turnos(conn, desde, hasta, actividades=None):
+    """
+    Crea los turnos entre `desde` y `hasta` (date, inclusive) en la base
+    abierta en `conn`. `actividades` limita la generación a esos nombres.
+    Devuelve la cantidad de turnos nuevos.
+    """
+    if hasta < desde:
+        raise ValueError(
+            "La fecha de fin no puede ser anterior a la fecha de inicio")
+    if (hasta - desde).days + 1 > MAXIMO_DIAS:
+        raise ValueError(
+            f"No se pueden generar más de {MAXIMO_DIAS} dias de una vez")
+
+    cupos_por_actividad = {
+        nombre: (id_actividad, cupos_max)
+        for id_actividad, nombre, cupos_max in conn.execute(
+            "SELECT id, nombre, cupos_max FROM ACTIVIDADES")
+    }
+    if actividades is not None:
+        desconocidas = set(actividades) - set(cupos_por_actividad)
+        if desconocidas:
+            raise ValueError(
+                "No existen las actividades: "
+                f"{', '.join(sorted(desconocidas))}")
+        cupos_por_actividad = {
+            nombre: cupos_por_actividad[nombre] for nombre in actividades}
+
+    ids_horarios = dict(conn.execute("SELECT hora, id FROM HORARIOS"))
+    faltantes = [h for h in HORARIOS_TURNOS if h not in ids_horarios]
+    if faltantes:
+        raise ValueError(
+            f"Faltan horarios en la tabla HORARIOS: {', '.join(faltantes)}")
+    horarios = [ids_horarios[h] for h in HORARIOS_TURNOS]
+
+    filas = (
+        (id_actividad, id_horario, dia.isoformat(), cupos_max)
+        for dia, (id_actividad, cupos_max), id_horario in itertools.product(
+            dias_abiertos(desde, hasta), cupos_por_actividad.values(),
+            horarios)
+    )
+
+    cambios_antes = conn.total_changes
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(SQL_INSERTAR_TURNO, filas)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return conn.total_changes - cambios_antes
+
+
+def _fecha(texto):
+    try:
+        return datetime.datetime.strptime(texto, "%d-%m-%Y").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Fecha inválida (se espera DD-MM-YYYY): {texto}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--db", default=RUTA_DB_POR_DEFECTO)
+    parser.add_argument("--desde", type=_fecha, required=True)
+    parser.add_argument("--hasta", type=_fecha, required=True)
+    parser.add_argument(
+        "--actividad", action="append", dest="actividades",
+        help="se puede repetir; por defecto, todas")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        inicio = time.perf_counter()
+        nuevos = generar_turnos(
+            conn, args.desde, args.hasta, args.actividades)
+        duracion = time.perf_counter() - inicio
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        conn.close()
+
+    print(f"{nuevos} turnos nuevos en {duracion:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Métricas en memoria del servidor: contadores e histogramas de latencia
+con etiquetas, exportables en el formato de texto de Prometheus.
+
+Se pueden desactivar con PARQUE_METRICAS=0 (o con habilitar(False)): en
+ese caso medir() devuelve un contexto vacío y los contadores no hacen
+nada, así el costo en el camino de inscripción es una comparación.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Límites (en segundos) de los buckets de los histogramas de latencia
+LIMITES_LATENCIA = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0)
+
+_SIN_MEDICION = nullcontext()
+
+
+class Contador:
+    # Contador monótono con un valor por combinación de etiquetas
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._valores[valores_etiquetas] = (
+                self._valores.get(valores_etiquetas, 0) + cantidad)
+
+    def valor(self, *valores_etiquetas):
+        with self._lock:
+            return self._valores.get(valores_etiquetas, 0)
+
+    def limpiar(self):
+        with self._lock:
+            self._valores.clear()
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}",
+                  f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            for valores, total in sorted(self._valores.items()):
+                lineas.append(
+                    f"{self.nombre}{_etiquetas(self.etiquetas, valores)} "
+                    f"{total}")
+        return lineas
+
+
+class Histograma:
+    """
+    Histograma con buckets fijos (como los de Prometheus: cada bucket
+    cuenta las observaciones menores o iguales a su límite).
+    """
+
+    def __init__(self, nombre, ayuda, etiquetas=(),
+                 limites=LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = tuple(limites)
+        self._series = {}  # etiquetas -> [cuentas por bucket, suma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = [[0] * (len(self.limites) + 1), 0.0, 0]
+                self._series[valores_etiquetas] = serie
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            return serie[2] if serie else 0
+
+    def limpiar(self):
+        with self._lock:
+            self._series.clear()
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}",
+                  f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            for valores, (cuentas, suma, total) in sorted(
+                    self._series.items()):
+                acumulado = 0
+                limites = [*map(repr, self.limites), "+Inf"]
+                for limite, cuenta in zip(limites, cuentas):
+                    acumulado += cuenta
+                    etiquetas = _etiquetas(
+                        (*self.etiquetas, "le"), (*valores, limite))
+                    lineas.append(
+                        f"{self.nombre}_bucket{etiquetas} {acumulado}")
+                etiquetas = _etiquetas(self.etiquetas, valores)
+                lineas.append(f"{self.nombre}_sum{etiquetas} {suma!r}")
+                lineas.append(f"{self.nombre}_count{etiquetas} {total}")
+        return lineas
+
+
+def _etiquetas(nombres, valores):
+    if not nombres:
+        return ""
+    pares = ",".join(
+        f'{nombre}="{_escapar(valor)}"'
+        for nombre, valor in zip(nombres, valores))
+    return "{" + pares + "}"
+
+
+def _escapar(valor):
+    return (str(valor).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+# --- MÉTRICAS DEL SERVIDOR ---
+
+duracion_fases = Histograma(
+    "parque_inscripcion_fase_segundos",
+    "Duración de cada fase de inscribir_actividad",
+    etiquetas=("fase",))
+
+duracion_solicitudes = Histograma(
+    "parque_http_solicitud_segundos",
+    "Duración de las solicitudes HTTP por ruta y método",
+    etiquetas=("metodo", "ruta"))
+
+solicitudes = Contador(
+    "parque_http_solicitudes_total",
+    "Solicitudes HTTP atendidas por ruta y código de estado",
+    etiquetas=("metodo", "ruta", "estado"))
+
+rechazos = Contador(
+    "parque_rechazos_total",
+    "Solicitudes rechazadas por validación, por motivo",
+    etiquetas=("ruta", "motivo"))
+
+reintentos_bloqueo = Contador(
+    "parque_db_reintentos_bloqueo_total",
+    "Reintentos de BEGIN IMMEDIATE porque la base estaba ocupada")
+
+METRICAS = (
+    duracion_fases, duracion_solicitudes, solicitudes, rechazos,
+    reintentos_bloqueo)
+
+_habilitadas = os.environ.get("PARQUE_METRICAS", "1") != "0"
+
+
+def habilitar(valor=True):
+    global _habilitadas
+    _habilitadas = valor
+
+
+def habilitadas():
+    return _habilitadas
+
+
+@contextmanager
+def _medir(fase):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion_fases.observar(time.perf_counter() - inicio, fase)
+
+
+def medir(fase):
+    # Contexto que registra cuánto tarda el bloque en la fase indicada
+    if not _habilitadas:
+        return _SIN_MEDICION
+    return _medir(fase)
+
+
+def contar(contador, *valores_etiquetas):
+    if _habilitadas:
+        contador.incrementar(*valores_etiquetas)
+
+
+def observar(histograma, valor, *valores_etiquetas):
+    if _habilitadas:
+        histograma.observar(valor, *valores_etiquetas)
+
+
+def limpiar():
+    for metrica in METRICAS:
+        metrica.limpiar()
+
+
+def exportar_prometheus():
+    lineas = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
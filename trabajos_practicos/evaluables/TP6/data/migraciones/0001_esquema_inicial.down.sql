@@ -0,0 +1,5 @@
+DROP TABLE INSCRIPCIONES;
+DROP TABLE ACTIVIDADES_X_HORARIOS;
+DROP TABLE TALLAS;
+DROP TABLE HORARIOS;
+DROP TABLE ACTIVIDADES;
@@ -0,0 +1,74 @@
+-- Esquema original de parque.db con las tablas de referencia cargadas.
+
+CREATE TABLE "ACTIVIDADES"
+(
+    id         INTEGER
+        primary key,
+    nombre     TEXT              not null,
+    vestimenta INTEGER default 0 not null,
+    cupos_max  INTEGER           not null,
+    check (cupos_max >= 0),
+    check (vestimenta IN (0, 1))
+);
+
+CREATE TABLE HORARIOS (
+    id   INTEGER PRIMARY KEY,
+    hora TEXT NOT NULL                                 -- ej. "16:00"
+);
+
+CREATE TABLE "TALLAS" (
+    id     INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE "ACTIVIDADES_X_HORARIOS" (
+    id_actividad      INTEGER NOT NULL,
+    id_horario        INTEGER NOT NULL,
+    fecha             DATE    NOT NULL,
+    cupos_disponibles INTEGER NOT NULL CHECK (cupos_disponibles >= 0),
+
+    -- PK compuesta: una fila por (actividad, horario, fecha)
+    PRIMARY KEY (id_actividad, id_horario, fecha),
+
+    FOREIGN KEY (id_actividad) REFERENCES "ACTIVIDADES" (id) ON DELETE CASCADE,
+    FOREIGN KEY (id_horario)   REFERENCES HORARIOS  (id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_axh_actividad_fecha
+    ON "ACTIVIDADES_X_HORARIOS" (id_actividad, fecha);
+
+CREATE TABLE "INSCRIPCIONES"
+(
+    id_actividad     INTEGER not null,
+    id_horario       INTEGER not null,
+    fecha            DATE    not null,
+    dni              INTEGER not null,
+    id_talla         INTEGER
+        references TALLAS,
+    nombre_visitante TEXT    not null,
+    primary key (id_actividad, id_horario, fecha, dni),
+    foreign key (id_actividad, id_horario, fecha) references ACTIVIDADES_X_HORARIOS
+        on delete cascade
+);
+
+CREATE INDEX idx_inscripcion_dni
+    on INSCRIPCIONES (dni);
+
+CREATE INDEX idx_inscripcion_talla
+    on INSCRIPCIONES (id_talla);
+
+INSERT INTO ACTIVIDADES (id, nombre, vestimenta, cupos_max) VALUES
+    (1, 'Palestra', 1, 12),
+    (2, 'Tirolesa', 1, 10),
+    (3, 'Safari', 0, 8),
+    (4, 'Jardineria', 0, 12);
+
+INSERT INTO HORARIOS (id, hora) VALUES
+    (1, '09:00'), (2, '09:30'), (3, '10:00'), (4, '10:30'), (5, '11:00'),
+    (6, '11:30'), (7, '12:00'), (8, '12:30'), (9, '13:00'), (10, '13:30'),
+    (11, '14:00'), (12, '14:30'), (13, '15:00'), (14, '15:30'),
+    (15, '16:00'), (16, '16:30'), (17, '17:00'), (18, '17:30'),
+    (19, '18:00');
+
+INSERT INTO TALLAS (id, nombre) VALUES
+    (1, 'XS'), (2, 'S'), (3, 'M'), (4, 'L'), (5, 'XL'), (6, 'XXL');
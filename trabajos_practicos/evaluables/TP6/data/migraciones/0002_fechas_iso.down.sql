@@ -0,0 +1,11 @@
+DROP INDEX IF EXISTS idx_axh_fecha;
+
+UPDATE ACTIVIDADES_X_HORARIOS
+SET fecha = substr(fecha, 9, 2) || '-' || substr(fecha, 6, 2)
+            || '-' || substr(fecha, 1, 4)
+WHERE fecha GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]';
+
+UPDATE INSCRIPCIONES
+SET fecha = substr(fecha, 9, 2) || '-' || substr(fecha, 6, 2)
+            || '-' || substr(fecha, 1, 4)
+WHERE fecha GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]';
@@ -0,0 +1,19 @@
+-- Fechas de DD-MM-YYYY a ISO-8601 (YYYY-MM-DD) para poder consultar por
+-- rango con los índices. Solo se tocan las filas en el formato viejo.
+
+UPDATE ACTIVIDADES_X_HORARIOS
+SET fecha = substr(fecha, 7, 4) || '-' || substr(fecha, 4, 2)
+            || '-' || substr(fecha, 1, 2)
+WHERE fecha GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]';
+
+UPDATE INSCRIPCIONES
+SET fecha = substr(fecha, 7, 4) || '-' || substr(fecha, 4, 2)
+            || '-' || substr(fecha, 1, 2)
+WHERE fecha GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]';
+
+-- Grilla de todas las actividades por rango de fechas
+CREATE INDEX IF NOT EXISTS idx_axh_fecha
+    ON "ACTIVIDADES_X_HORARIOS" (fecha);
+
+REINDEX "ACTIVIDADES_X_HORARIOS";
+REINDEX "INSCRIPCIONES";
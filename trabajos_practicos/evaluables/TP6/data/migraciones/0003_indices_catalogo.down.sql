@@ -0,0 +1,3 @@
+DROP INDEX idx_horarios_hora;
+
+DROP INDEX idx_actividades_nombre;
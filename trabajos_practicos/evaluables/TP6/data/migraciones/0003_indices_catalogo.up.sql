@@ -0,0 +1,6 @@
+-- Los nombres de actividad y las horas identifican a cada fila: se
+-- indexan (y se garantiza que no se repitan) para las búsquedas por nombre.
+
+CREATE UNIQUE INDEX idx_actividades_nombre ON ACTIVIDADES (nombre);
+
+CREATE UNIQUE INDEX idx_horarios_hora ON HORARIOS (hora);
@@ -0,0 +1,16 @@
+-- Los cupos retenidos vuelven a estar disponibles antes de borrar la tabla
+UPDATE ACTIVIDADES_X_HORARIOS
+SET cupos_disponibles = cupos_disponibles + (
+    SELECT SUM(r.cantidad) FROM RESERVAS_TEMPORALES r
+    WHERE r.id_actividad = ACTIVIDADES_X_HORARIOS.id_actividad
+      AND r.id_horario = ACTIVIDADES_X_HORARIOS.id_horario
+      AND r.fecha = ACTIVIDADES_X_HORARIOS.fecha)
+WHERE EXISTS (
+    SELECT 1 FROM RESERVAS_TEMPORALES r
+    WHERE r.id_actividad = ACTIVIDADES_X_HORARIOS.id_actividad
+      AND r.id_horario = ACTIVIDADES_X_HORARIOS.id_horario
+      AND r.fecha = ACTIVIDADES_X_HORARIOS.fecha);
+
+DROP INDEX idx_reservas_vence_en;
+
+DROP TABLE RESERVAS_TEMPORALES;
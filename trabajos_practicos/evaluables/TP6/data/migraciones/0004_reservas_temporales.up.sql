@@ -0,0 +1,17 @@
+-- Reservas temporales de cupos: los cupos se descuentan de
+-- ACTIVIDADES_X_HORARIOS al reservar y vuelven si la reserva se libera o
+-- vence sin confirmarse.
+
+CREATE TABLE RESERVAS_TEMPORALES (
+    token        TEXT    PRIMARY KEY,
+    id_actividad INTEGER NOT NULL,
+    id_horario   INTEGER NOT NULL,
+    fecha        DATE    NOT NULL,
+    cantidad     INTEGER NOT NULL CHECK (cantidad > 0),
+    vence_en     REAL    NOT NULL,               -- segundos desde epoch
+    FOREIGN KEY (id_actividad, id_horario, fecha)
+        REFERENCES ACTIVIDADES_X_HORARIOS ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Para recorrer las reservas en orden de vencimiento al iniciar
+CREATE INDEX idx_reservas_vence_en ON RESERVAS_TEMPORALES (vence_en);
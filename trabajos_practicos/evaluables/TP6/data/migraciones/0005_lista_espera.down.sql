@@ -0,0 +1,3 @@
+DROP INDEX idx_lista_espera_turno;
+
+DROP TABLE LISTA_ESPERA;
@@ -0,0 +1,23 @@
+-- Lista de espera por turno. El orden de llegada lo da el id
+-- (AUTOINCREMENT no reutiliza ids) y cada fila es un grupo completo, con
+-- las filas de INSCRIPCIONES ya validadas guardadas como JSON.
+
+CREATE TABLE LISTA_ESPERA (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_actividad INTEGER NOT NULL,
+    id_horario   INTEGER NOT NULL,
+    fecha        DATE    NOT NULL,
+    cantidad     INTEGER NOT NULL CHECK (cantidad > 0),
+    personas     TEXT    NOT NULL,               -- [[dni, id_talla, nombre]]
+    estado       TEXT    NOT NULL DEFAULT 'esperando'
+        CHECK (estado IN ('esperando', 'inscripto', 'descartado',
+                          'cancelado')),
+    creada_en    TEXT    NOT NULL,
+    FOREIGN KEY (id_actividad, id_horario, fecha)
+        REFERENCES ACTIVIDADES_X_HORARIOS ON DELETE CASCADE
+);
+
+-- Cabeza de la lista de cada turno: solo los grupos que siguen esperando
+CREATE INDEX idx_lista_espera_turno
+    ON LISTA_ESPERA (id_actividad, id_horario, fecha, id)
+    WHERE estado = 'esperando';
@@ -0,0 +1,8 @@
+DROP TRIGGER trg_inscripcion_cambio;
+DROP TRIGGER trg_inscripcion_baja_talla;
+DROP TRIGGER trg_inscripcion_baja_turno;
+DROP TRIGGER trg_inscripcion_alta_talla;
+DROP TRIGGER trg_inscripcion_alta_turno;
+
+DROP TABLE DEMANDA_TALLAS;
+DROP TABLE RESUMEN_TURNOS;
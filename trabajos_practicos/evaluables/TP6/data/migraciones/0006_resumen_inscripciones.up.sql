@@ -0,0 +1,93 @@
+-- Resúmenes para los reportes, mantenidos por triggers en la misma
+-- transacción que cada alta o baja de INSCRIPCIONES. Los reportes leen
+-- solo las filas del rango pedido, sin recorrer INSCRIPCIONES.
+-- La clave empieza por la fecha para consultar por rango.
+
+-- Personas inscriptas por turno
+CREATE TABLE RESUMEN_TURNOS (
+    fecha        DATE    NOT NULL,
+    id_actividad INTEGER NOT NULL,
+    id_horario   INTEGER NOT NULL,
+    inscriptos   INTEGER NOT NULL CHECK (inscriptos >= 0),
+    PRIMARY KEY (fecha, id_actividad, id_horario)
+) WITHOUT ROWID;
+
+-- Equipos de seguridad pedidos por día, actividad y talla
+CREATE TABLE DEMANDA_TALLAS (
+    fecha        DATE    NOT NULL,
+    id_actividad INTEGER NOT NULL,
+    id_talla     INTEGER NOT NULL,
+    cantidad     INTEGER NOT NULL CHECK (cantidad >= 0),
+    PRIMARY KEY (fecha, id_actividad, id_talla)
+) WITHOUT ROWID;
+
+INSERT INTO RESUMEN_TURNOS (fecha, id_actividad, id_horario, inscriptos)
+SELECT fecha, id_actividad, id_horario, COUNT(*)
+FROM INSCRIPCIONES
+GROUP BY fecha, id_actividad, id_horario;
+
+INSERT INTO DEMANDA_TALLAS (fecha, id_actividad, id_talla, cantidad)
+SELECT fecha, id_actividad, id_talla, COUNT(*)
+FROM INSCRIPCIONES
+WHERE id_talla IS NOT NULL
+GROUP BY fecha, id_actividad, id_talla;
+
+CREATE TRIGGER trg_inscripcion_alta_turno
+AFTER INSERT ON INSCRIPCIONES
+BEGIN
+    INSERT INTO RESUMEN_TURNOS (fecha, id_actividad, id_horario, inscriptos)
+    VALUES (NEW.fecha, NEW.id_actividad, NEW.id_horario, 1)
+    ON CONFLICT (fecha, id_actividad, id_horario)
+    DO UPDATE SET inscriptos = inscriptos + 1;
+END;
+
+CREATE TRIGGER trg_inscripcion_alta_talla
+AFTER INSERT ON INSCRIPCIONES
+WHEN NEW.id_talla IS NOT NULL
+BEGIN
+    INSERT INTO DEMANDA_TALLAS (fecha, id_actividad, id_talla, cantidad)
+    VALUES (NEW.fecha, NEW.id_actividad, NEW.id_talla, 1)
+    ON CONFLICT (fecha, id_actividad, id_talla)
+    DO UPDATE SET cantidad = cantidad + 1;
+END;
+
+CREATE TRIGGER trg_inscripcion_baja_turno
+AFTER DELETE ON INSCRIPCIONES
+BEGIN
+    UPDATE RESUMEN_TURNOS SET inscriptos = inscriptos - 1
+    WHERE fecha = OLD.fecha AND id_actividad = OLD.id_actividad
+      AND id_horario = OLD.id_horario;
+END;
+
+CREATE TRIGGER trg_inscripcion_baja_talla
+AFTER DELETE ON INSCRIPCIONES
+WHEN OLD.id_talla IS NOT NULL
+BEGIN
+    UPDATE DEMANDA_TALLAS SET cantidad = cantidad - 1
+    WHERE fecha = OLD.fecha AND id_actividad = OLD.id_actividad
+      AND id_talla = OLD.id_talla;
+END;
+
+-- La aplicación no modifica inscripciones, pero una corrección a mano
+-- (o una migración) no debe desincronizar los resúmenes
+CREATE TRIGGER trg_inscripcion_cambio
+AFTER UPDATE OF id_actividad, id_horario, fecha, id_talla ON INSCRIPCIONES
+BEGIN
+    UPDATE RESUMEN_TURNOS SET inscriptos = inscriptos - 1
+    WHERE fecha = OLD.fecha AND id_actividad = OLD.id_actividad
+      AND id_horario = OLD.id_horario;
+    INSERT INTO RESUMEN_TURNOS (fecha, id_actividad, id_horario, inscriptos)
+    VALUES (NEW.fecha, NEW.id_actividad, NEW.id_horario, 1)
+    ON CONFLICT (fecha, id_actividad, id_horario)
+    DO UPDATE SET inscriptos = inscriptos + 1;
+
+    UPDATE DEMANDA_TALLAS SET cantidad = cantidad - 1
+    WHERE OLD.id_talla IS NOT NULL
+      AND fecha = OLD.fecha AND id_actividad = OLD.id_actividad
+      AND id_talla = OLD.id_talla;
+    INSERT INTO DEMANDA_TALLAS (fecha, id_actividad, id_talla, cantidad)
+    SELECT NEW.fecha, NEW.id_actividad, NEW.id_talla, 1
+    WHERE NEW.id_talla IS NOT NULL
+    ON CONFLICT (fecha, id_actividad, id_talla)
+    DO UPDATE SET cantidad = cantidad + 1;
+END;
@@ -0,0 +1,202 @@
+"""
+Migraciones versionadas del esquema de parque.db.
+
+Cada migración es un par de scripts en data/migraciones/:
+    NNNN_descripcion.up.sql    (aplica el cambio)
+    NNNN_descripcion.down.sql  (lo revierte)
+La versión aplicada se registra en la tabla SCHEMA_VERSION y cada script
+corre en su propia transacción junto con ese registro.
+
+Uso (desde la raíz del TP):
+    python -m data.migrador [--db ruta] estado
+    python -m data.migrador [--db ruta] subir [--hasta N]
+    python -m data.migrador [--db ruta] bajar --hasta N
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+
+from data.conexion import RUTA_DB_POR_DEFECTO
+
+DIRECTORIO_MIGRACIONES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "migraciones")
+
+PATRON_ARCHIVO = re.compile(r"^(\d{4})_(\w+)\.(up|down)\.sql$")
+
+
+@dataclass(frozen=True)
+class Migracion:
+    version: int
+    nombre: str
+    script_subir: str
+    script_bajar: str
+
+
+def listar_migraciones(directorio=DIRECTORIO_MIGRACIONES):
+    # Devuelve las migraciones ordenadas por versión
+    scripts = {}
+    for archivo in os.listdir(directorio):
+        coincidencia = PATRON_ARCHIVO.match(archivo)
+        if coincidencia is None:
+            continue
+        version, nombre, sentido = coincidencia.groups()
+        with open(os.path.join(directorio, archivo), encoding="utf-8") as f:
+            scripts.setdefault((int(version), nombre), {})[sentido] = f.read()
+
+    migraciones = []
+    for (version, nombre), por_sentido in sorted(scripts.items()):
+        if set(por_sentido) != {"up", "down"}:
+            raise ValueError(
+                f"La migración {version:04d}_{nombre} necesita los scripts "
+                "up y down")
+        migraciones.append(Migracion(
+            version, nombre, por_sentido["up"], por_sentido["down"]))
+
+    versiones = [m.version for m in migraciones]
+    if len(versiones) != len(set(versiones)):
+        raise ValueError("Hay dos migraciones con el mismo número de versión")
+    return migraciones
+
+
+def _crear_tabla_versiones(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS SCHEMA_VERSION (
+        version     INTEGER PRIMARY KEY,
+        nombre      TEXT NOT NULL,
+        aplicada_en TEXT NOT NULL
+    )
+    """)
+
+    # Una base anterior a las migraciones ya tiene el esquema inicial
+    # (creado a mano): se registra como aplicado en lugar de recrearlo.
+    sin_versiones = conn.execute(
+        "SELECT COUNT(*) FROM SCHEMA_VERSION").fetchone()[0] == 0
+    tiene_esquema = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+        "AND name = 'ACTIVIDADES'").fetchone() is not None
+    if sin_versiones and tiene_esquema:
+        _registrar_version(conn, 1, "esquema_inicial")
+
+
+def _registrar_version(conn, version, nombre):
+    conn.execute(
+        "INSERT INTO SCHEMA_VERSION (version, nombre, aplicada_en) "
+        "VALUES (?, ?, ?)",
+        (version, nombre, datetime.datetime.now().isoformat(" ", "seconds")))
+
+
+def versiones_aplicadas(conn):
+    _crear_tabla_versiones(conn)
+    return [v for v, in conn.execute(
+        "SELECT version FROM SCHEMA_VERSION ORDER BY version")]
+
+
+def _ejecutar_en_transaccion(conn, script, actualizar_versiones):
+    # El script y el cambio en SCHEMA_VERSION se confirman juntos
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for sentencia in _separar_sentencias(script):
+            conn.execute(sentencia)
+        actualizar_versiones()
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _separar_sentencias(script):
+    # executescript confirma por su cuenta, así que se ejecuta sentencia
+    # por sentencia dentro de la transacción.
+    sentencia = ""
+    for linea in script.splitlines(keepends=True):
+        sentencia += linea
+        if sqlite3.complete_statement(sentencia):
+            yield sentencia
+            sentencia = ""
+
+    resto = [
+        linea for linea in sentencia.splitlines()
+        if linea.strip() and not linea.strip().startswith("--")
+    ]
+    if resto:
+        yield sentencia
+
+
+def subir(conn, hasta=None, migraciones=None):
+    """
+    Aplica en orden las migraciones pendientes (hasta la versión `hasta`
+    inclusive, o todas). Devuelve las versiones aplicadas.
+    """
+    migraciones = listar_migraciones() if migraciones is None else migraciones
+    aplicadas = set(versiones_aplicadas(conn))
+    nuevas = []
+    for migracion in migraciones:
+        if migracion.version in aplicadas:
+            continue
+        if hasta is not None and migracion.version > hasta:
+            break
+        _ejecutar_en_transaccion(
+            conn, migracion.script_subir,
+            lambda: _registrar_version(
+                conn, migracion.version, migracion.nombre))
+        nuevas.append(migracion.version)
+    return nuevas
+
+
+def bajar(conn, hasta, migraciones=None):
+    """
+    Revierte, de la más nueva a la más vieja, las migraciones aplicadas
+    con versión mayor a `hasta`. Devuelve las versiones revertidas.
+    """
+    migraciones = listar_migraciones() if migraciones is None else migraciones
+    aplicadas = set(versiones_aplicadas(conn))
+    revertidas = []
+    for migracion in reversed(migraciones):
+        if migracion.version <= hasta or migracion.version not in aplicadas:
+            continue
+        _ejecutar_en_transaccion(
+            conn, migracion.script_bajar,
+            lambda: conn.execute(
+                "DELETE FROM SCHEMA_VERSION WHERE version = ?",
+                (migracion.version,)))
+        revertidas.append(migracion.version)
+    return revertidas
+
+
+def crear_base(ruta=":memory:"):
+    # Base nueva con todas las migraciones aplicadas (útil para tests)
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    subir(conn)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--db", default=RUTA_DB_POR_DEFECTO)
+    parser.add_argument("accion", choices=("estado", "subir", "bajar"))
+    parser.add_argument("--hasta", type=int)
+    args = parser.parse_args()
+
+    if args.accion == "bajar" and args.hasta is None:
+        parser.error("bajar necesita --hasta")
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        if args.accion == "subir":
+            print(f"Aplicadas: {subir(conn, args.hasta)}")
+        elif args.accion == "bajar":
+            print(f"Revertidas: {bajar(conn, args.hasta)}")
+
+        aplicadas = set(versiones_aplicadas(conn))
+        for migracion in listar_migraciones():
+            estado = "aplicada" if migracion.version in aplicadas else "-"
+            print(f"{migracion.version:04d} {migracion.nombre:<30} {estado}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Almacenamiento de los turnos y sus inscripciones.
+
+La lógica de inscripción (src/inscripcion_actividad.py) no arma SQL ni
+abre conexiones: usa un repositorio con cuatro operaciones (cupos de un
+turno, descuento condicional de cupos, alta de inscripciones y grilla de
+cupos por rango de fechas). Hay dos implementaciones:
+
+- RepositorioSQLite: la base del parque, con el pool de data/conexion.py.
+- RepositorioMemoria: diccionarios indexados por (id_actividad,
+  id_horario, fecha) y un conjunto de DNIs por turno, con la misma
+  semántica (un escritor a la vez, rollback, DNI único por turno). Sirve
+  para benchmarks y tests sin disco.
+
+Cada turno se identifica con la clave (id_actividad, id_horario, fecha en
+formato ISO).
+
+Las reservas temporales, la lista de espera y las cancelaciones no pasan
+por el repositorio: modifican los cupos directamente en la base del
+parque. Con un repositorio que guarda los cupos en otro lado (como
+RepositorioMemoria) esas operaciones se rechazan con
+AlmacenamientoNoSoportado, para que no haya dos cupos distintos para el
+mismo turno.
+"""
+import bisect
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from data import metricas
+from data.conexion import (
+    conexion,
+    iniciar_transaccion_inmediata,
+    obtener_pool,
+    registrar_orden_escritura
+)
+
+# -----------------------------------------------------------
+# CONSULTAS SQL (data/verificar_planes.py revisa sus planes)
+# -----------------------------------------------------------
+SQL_CUPOS_POR_CLAVE = (
+    "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS "
+    "WHERE id_actividad = ? AND id_horario = ? AND fecha = ?")
+
+# El descuento es condicional: si otra transacción tomó los cupos entre
+# la lectura y la escritura, no se actualiza ninguna fila.
+SQL_DESCONTAR_CUPOS = """
+UPDATE ACTIVIDADES_X_HORARIOS
+SET cupos_disponibles = cupos_disponibles - ?
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+  AND cupos_disponibles >= ?
+"""
+
+# Cupos que vuelven al turno (reservas liberadas, cancelaciones)
+SQL_DEVOLVER_CUPOS = """
+UPDATE ACTIVIDADES_X_HORARIOS
+SET cupos_disponibles = cupos_disponibles + ?
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+"""
+
+SQL_INSERTAR_INSCRIPCION = """
+INSERT INTO INSCRIPCIONES
+(id_actividad, id_horario, fecha, dni,
+ id_talla, nombre_visitante)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_GRILLA = (
+    "SELECT id_actividad, fecha, id_horario, cupos_disponibles "
+    "FROM ACTIVIDADES_X_HORARIOS "
+    "WHERE fecha BETWEEN ? AND ?")
+
+SQL_GRILLA_ACTIVIDAD = SQL_GRILLA + " AND id_actividad = ?"
+
+
+class AlmacenamientoNoSoportado(Exception):
+    pass
+
+
+class RepositorioTurnos:
+    """
+    Interfaz de los repositorios. Las escrituras se hacen dentro de
+    `transaccion()`, que devuelve un objeto con los métodos cupos,
+    descontar_cupos, devolver_cupos e insertar_inscripciones; si el bloque
+    termina con una excepción no queda ningún cambio.
+
+    `cupos_en_base` indica si los cupos son los de ACTIVIDADES_X_HORARIOS
+    en la base del parque, los mismos que usan las reservas, la lista de
+    espera y las cancelaciones.
+    """
+
+    cupos_en_base = False
+
+    def transaccion(self):
+        raise NotImplementedError
+
+    def consultar_cupos(self, clave):
+        # Cupos del turno, o None si el turno no existe
+        raise NotImplementedError
+
+    def grilla(self, desde_db, hasta_db, id_actividad=None):
+        """
+        Turnos con fecha entre desde_db y hasta_db (incluidas), como
+        filas (id_actividad, fecha, id_horario, cupos) sin orden.
+        """
+        raise NotImplementedError
+
+
+# --- SQLITE ---
+
+
+class _TransaccionSQLite:
+
+    def __init__(self, conn):
+        self.cursor = conn.cursor()
+
+    def cupos(self, clave):
+        # busca los cupos disponibles por clave primaria
+        self.cursor.execute(SQL_CUPOS_POR_CLAVE, clave)
+        fila = self.cursor.fetchone()
+        return None if fila is None else fila[0]
+
+    def descontar_cupos(self, clave, cantidad):
+        # Devuelve False si el turno ya no tiene esa cantidad de cupos
+        self.cursor.execute(SQL_DESCONTAR_CUPOS, (cantidad, *clave, cantidad))
+        return self.cursor.rowcount != 0
+
+    def devolver_cupos(self, clave, cantidad):
+        self.cursor.execute(SQL_DEVOLVER_CUPOS, (cantidad, *clave))
+
+    def insertar_inscripciones(self, filas):
+        # Todo el grupo en una sola sentencia; IntegrityError si un DNI ya
+        # está inscripto en el turno
+        self.cursor.executemany(SQL_INSERTAR_INSCRIPCION, filas)
+
+
+class RepositorioSQLite(RepositorioTurnos):
+    """
+    Repositorio sobre la base configurada en data/conexion.py. Cada
+    transacción toma una conexión del pool y el bloqueo de escritura
+    (BEGIN IMMEDIATE) antes de leer.
+    """
+
+    cupos_en_base = True
+
+    @contextmanager
+    def transaccion(self):
+        pool = obtener_pool()
+        conn = None  # Se inicializa la conexión para el bloque finally
+        try:
+            with metricas.medir("conexion"):
+                conn = pool.obtener()
+            # Incluye la espera por el bloqueo de escritura y sus
+            # reintentos
+            with metricas.medir("bloqueo"):
+                iniciar_transaccion_inmediata(conn)
+
+            transaccion = _TransaccionSQLite(conn)
+            try:
+                yield transaccion
+            finally:
+                transaccion.cursor.close()
+
+            with metricas.medir("commit"):
+                conn.commit()
+
+        except Exception:
+            # Si ocurre un error de validación o de DB, se garantiza el
+            # rollback.
+            if conn:
+                conn.rollback()
+            raise
+
+        finally:
+            # Devuelve la conexión al pool
+            if conn:
+                pool.devolver(conn)
+
+    def consultar_cupos(self, clave):
+        with conexion() as conn:
+            fila = conn.execute(SQL_CUPOS_POR_CLAVE, clave).fetchone()
+        return None if fila is None else fila[0]
+
+    def grilla(self, desde_db, hasta_db, id_actividad=None):
+        consulta = SQL_GRILLA
+        parametros = [desde_db, hasta_db]
+        if id_actividad is not None:
+            consulta = SQL_GRILLA_ACTIVIDAD
+            parametros.append(id_actividad)
+
+        with conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(consulta, parametros)
+            return cursor.fetchall()
+
+
+# --- MEMORIA ---
+
+
+class _TransaccionMemoria:
+    # Aplica los cambios en el repositorio y anota cómo deshacerlos
+
+    def __init__(self, repositorio):
+        self.repositorio = repositorio
+        self.deshacer = []
+
+    def cupos(self, clave):
+        return self.repositorio._cupos.get(clave)
+
+    def descontar_cupos(self, clave, cantidad):
+        cupos = self.repositorio._cupos.get(clave)
+        if cupos is None or cupos < cantidad:
+            return False
+        self.repositorio._cupos[clave] = cupos - cantidad
+        self.deshacer.append((self.devolver_cupos, clave, cantidad))
+        return True
+
+    def devolver_cupos(self, clave, cantidad):
+        cupos = self.repositorio._cupos.get(clave)
+        if cupos is None:
+            return  # como el UPDATE sin filas
+        self.repositorio._cupos[clave] = cupos + cantidad
+        self.deshacer.append((self._restar, clave, cantidad))
+
+    def _restar(self, clave, cantidad):
+        self.repositorio._cupos[clave] -= cantidad
+
+    def insertar_inscripciones(self, filas):
+        # Se verifica todo el grupo antes de insertar, como la restricción
+        # de clave primaria de INSCRIPCIONES
+        nuevas = {}
+        for id_actividad, id_horario, fecha, dni, id_talla, nombre in filas:
+            clave = (id_actividad, id_horario, fecha)
+            if clave not in self.repositorio._cupos:
+                raise sqlite3.IntegrityError(
+                    "FOREIGN KEY constraint failed")
+            dnis = self.repositorio._dnis.get(clave, ())
+            por_turno = nuevas.setdefault(clave, {})
+            if dni in dnis or dni in por_turno:
+                raise sqlite3.IntegrityError(
+                    "UNIQUE constraint failed: INSCRIPCIONES.dni")
+            por_turno[dni] = (id_talla, nombre)
+
+        for clave, inscripciones in nuevas.items():
+            self.repositorio._dnis.setdefault(clave, {}).update(
+                inscripciones)
+            self.deshacer.append((self._quitar, clave, list(inscripciones)))
+
+    def _quitar(self, clave, dnis):
+        inscriptos = self.repositorio._dnis[clave]
+        for dni in dnis:
+            del inscriptos[dni]
+
+    def revertir(self):
+        for funcion, *argumentos in reversed(self.deshacer):
+            funcion(*argumentos)
+        self.deshacer.clear()
+
+
+class RepositorioMemoria(RepositorioTurnos):
+    """
+    Repositorio en memoria. Un lock hace de bloqueo de escritura: las
+    transacciones se ejecutan de a una, como con BEGIN IMMEDIATE.
+    """
+
+    def __init__(self):
+        self._cupos = {}  # clave -> cupos disponibles
+        self._dnis = {}  # clave -> {dni: (id_talla, nombre)}
+        # Índice para la grilla: fechas ordenadas y turnos por fecha
+        self._fechas = []
+        self._turnos_por_fecha = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def desde_base(cls, conn):
+        # Copia los turnos y las inscripciones de una base SQLite abierta
+        repositorio = cls()
+        repositorio.cargar_turnos(conn.execute(
+            "SELECT id_actividad, id_horario, fecha, cupos_disponibles "
+            "FROM ACTIVIDADES_X_HORARIOS"))
+        for fila in conn.execute(
+                "SELECT id_actividad, id_horario, fecha, dni, id_talla, "
+                "nombre_visitante FROM INSCRIPCIONES"):
+            clave, (dni, id_talla, nombre) = fila[:3], fila[3:]
+            repositorio._dnis.setdefault(clave, {})[dni] = (
+                id_talla, nombre)
+        return repositorio
+
+    def cargar_turnos(self, filas):
+        """
+        Agrega turnos (id_actividad, id_horario, fecha, cupos). Los que ya
+        existen no se modifican.
+        """
+        with self._lock:
+            for id_actividad, id_horario, fecha, cupos in filas:
+                clave = (id_actividad, id_horario, fecha)
+                if clave in self._cupos:
+                    continue
+                self._cupos[clave] = cupos
+                turnos = self._turnos_por_fecha.get(fecha)
+                if turnos is None:
+                    turnos = self._turnos_por_fecha[fecha] = []
+                    bisect.insort(self._fechas, fecha)
+                turnos.append(clave)
+
+    def inscriptos(self, clave):
+        # DNIs inscriptos en el turno
+        with self._lock:
+            return set(self._dnis.get(clave, ()))
+
+    @contextmanager
+    def transaccion(self):
+        with metricas.medir("bloqueo"):
+            self._lock.acquire()
+        try:
+            registrar_orden_escritura()
+            transaccion = _TransaccionMemoria(self)
+            try:
+                yield transaccion
+            except BaseException:
+                transaccion.revertir()
+                raise
+        finally:
+            self._lock.release()
+
+    def consultar_cupos(self, clave):
+        with self._lock:
+            return self._cupos.get(clave)
+
+    def grilla(self, desde_db, hasta_db, id_actividad=None):
+        with self._lock:
+            inicio = bisect.bisect_left(self._fechas, desde_db)
+            fin = bisect.bisect_right(self._fechas, hasta_db)
+            return [
+                (ida, fecha, idh, self._cupos[(ida, idh, fecha)])
+                for fecha in self._fechas[inicio:fin]
+                for ida, idh, _ in self._turnos_por_fecha[fecha]
+                if id_actividad is None or ida == id_actividad
+            ]
+
+
+_repositorio = None
+_repositorio_lock = threading.Lock()
+
+
+def configurar_repositorio(repositorio=None):
+    """
+    Cambia el repositorio que usa la aplicación. Sin argumentos vuelve al
+    de SQLite.
+    """
+    global _repositorio
+    with _repositorio_lock:
+        _repositorio = repositorio
+
+
+def obtener_repositorio():
+    global _repositorio
+    with _repositorio_lock:
+        if _repositorio is None:
+            _repositorio = RepositorioSQLite()
+        return _repositorio
+
+
+def exigir_cupos_en_base(operacion):
+    """
+    Rechaza `operacion` (por ejemplo "reservar cupos") si el repositorio
+    configurado no guarda los cupos en la base del parque.
+    """
+    if not obtener_repositorio().cupos_en_base:
+        raise AlmacenamientoNoSoportado(
+            f"No se puede {operacion} con el almacenamiento configurado.")
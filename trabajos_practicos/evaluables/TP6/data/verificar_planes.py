@@ -0,0 +1,74 @@
+"""
+Revisa con EXPLAIN QUERY PLAN las consultas de la lógica de negocio y
+falla si alguna recorre una tabla completa (SCAN) en lugar de usar la
+clave primaria o un índice (SEARCH).
+
+Los planes se obtienen sobre una base nueva creada con las migraciones,
+así se verifica el esquema que está en el código y no una copia local.
+
+Uso (desde la raíz del TP):
+    python -m data.verificar_planes
+"""
+import sys
+
+from data.migrador import crear_base
+
+# Pasos del plan que no recorren una tabla aunque empiecen con SCAN
+PASOS_PERMITIDOS = ("SCAN CONSTANT ROW",)
+
+
+def obtener_plan(conn, sql):
+    # Se completan los parámetros con NULL: el plan no depende del valor
+    parametros = (None,) * sql.count("?")
+    return [
+        detalle for _, _, _, detalle in conn.execute(
+            "EXPLAIN QUERY PLAN " + sql, parametros)
+    ]
+
+
+def buscar_recorridos_completos(conn, consultas):
+    """
+    Devuelve (nombre, paso del plan) de cada consulta que hace un
+    recorrido completo de alguna tabla.
+    """
+    problemas = []
+    for nombre, sql in consultas.items():
+        for paso in obtener_plan(conn, sql):
+            if paso.startswith("SCAN") and paso not in PASOS_PERMITIDOS:
+                problemas.append((nombre, paso))
+    return problemas
+
+
+def consultas_del_sistema():
+    # Todas las consultas registradas por la lógica de negocio
+    from src import (
+        cancelaciones, inscripcion_actividad, lista_espera, reportes,
+        reservas)
+
+    consultas = {}
+    for modulo in (
+            inscripcion_actividad, reservas, lista_espera, cancelaciones,
+            reportes):
+        nombre_modulo = modulo.__name__.rsplit(".", 1)[-1]
+        for nombre, sql in modulo.CONSULTAS.items():
+            consultas[f"{nombre_modulo}.{nombre}"] = sql
+    return consultas
+
+
+def main():
+    conn = crear_base()
+    try:
+        consultas = consultas_del_sistema()
+        problemas = buscar_recorridos_completos(conn, consultas)
+    finally:
+        conn.close()
+
+    for nombre, paso in problemas:
+        print(f"[SCAN] {nombre}: {paso}")
+    print(f"{len(consultas)} consultas revisadas, "
+          f"{len(problemas)} con recorridos completos")
+    return 1 if problemas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
+import copy
+import json
+import os
 import sys
-from datetime import datetime, timedelta
+import time
+import uuid
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -23,12 +27,46 @@ from PyQt6.QtWidgets import (
     QHeaderView,
 )
 from PyQt6.QtGui import QIntValidator, QFont, QTextCharFormat, QColor, QPalette
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import (
+    Qt,
+    QDate,
+    QObject,
+    QRunnable,
+    QThread,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+)
 
 import requests
 
+# Las reglas de inscripción son las mismas que aplica el servidor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+from src.calendario import HORARIOS_TURNOS, motivo_cierre  # noqa: E402
+from src.reglas import (  # noqa: E402
+    MAXIMO_DIAS_ANTICIPACION,
+    TALLES,
+    reglas_de,
+    validar_inscripcion,
+)
+
 API_URL = "http://127.0.0.1:8000/inscribir"
 CUPOS_URL = "http://127.0.0.1:8000/cupos"
+GRILLA_CUPOS_URL = "http://127.0.0.1:8000/cupos/grilla"
+EVENTOS_CUPOS_URL = "http://127.0.0.1:8000/cupos/eventos"
+LISTA_ESPERA_URL = "http://127.0.0.1:8000/lista-espera"
+
+# Espera desde el último cambio de actividad o fecha antes de consultar
+# los cupos, para no disparar una consulta por cada día que se recorre
+ESPERA_REFRESCO_MS = 300
+
+# Segundos durante los que se reusan los cupos ya consultados de una
+# actividad y fecha
+VIGENCIA_CACHE_CUPOS = 15
+
+# Segundos de espera antes de volver a conectarse a los avisos de cupos
+ESPERA_RECONEXION = 5
 
 
 # ----------------------------------------
@@ -41,48 +79,166 @@ def inscribir_actividad(
     personas,
     acepta_terminos_condiciones,
 ):
-    if not acepta_terminos_condiciones:
-        raise ValueError("Se deben aceptar los términos y condiciones")
-
-    fecha_actividad_dt = datetime.strptime(fecha_actividad, "%d-%m-%Y")
-    fecha_actual_dt = datetime.strptime(
-        datetime.now().strftime("%d-%m-%Y"), "%d-%m-%Y"
+    # Se rechaza localmente lo que el servidor rechazaría, sin enviarlo
+    validar_inscripcion(
+        actividad,
+        fecha_actividad,
+        horario_actividad,
+        personas,
+        acepta_terminos_condiciones,
     )
+    return "Inscripción realizada correctamente."
 
-    if fecha_actividad_dt.day == 25 and fecha_actividad_dt.month == 12:
-        raise ValueError("No se permiten inscripciones en Navidad.")
-    if fecha_actividad_dt.day == 1 and fecha_actividad_dt.month == 1:
-        raise ValueError("No se permiten inscripciones en Año Nuevo.")
-    if fecha_actividad_dt < fecha_actual_dt:
-        raise ValueError("No se puede inscribir a actividades ya realizadas")
-    if fecha_actividad_dt > fecha_actual_dt + timedelta(days=2):
-        raise ValueError(
-            "No se puede inscribir con más de dos días de anticipación"
-        )
-    if fecha_actividad_dt.weekday() == 0:
-        raise ValueError("No se permiten inscripciones los lunes.")
-
-    hora, minuto = map(int, horario_actividad.split(":"))
-    if hora < 9 or (hora > 18 or (hora == 18 and minuto > 0)):
-        raise ValueError("El parque está cerrado en ese horario.")
-    if minuto not in (0, 30):
-        raise ValueError("No hay horario para esa actividad.")
-
-    if not personas:
-        raise ValueError("Debe inscribir al menos una persona.")
-
-    for persona in personas:
-        edad_minima = {"Palestra": 12, "Tirolesa": 8}.get(actividad, 0)
-        if persona["edad"] < edad_minima:
-            raise ValueError(
-                f"La edad mínima para {actividad} es {edad_minima} años."
-            )
-        if actividad in ["Palestra", "Tirolesa"] and not persona.get("talle"):
-            raise ValueError(
-                f"El talle es obligatorio para {actividad}."
+
+# ----------------------------------------
+# Consulta de cupos en segundo plano
+# ----------------------------------------
+class SenalesConsulta(QObject):
+    # (número de consulta, actividad, fecha, grilla o None si falló)
+    terminada = pyqtSignal(int, str, str, object)
+
+
+class ConsultaGrilla(QRunnable):
+    """
+    Consulta la grilla de cupos de una actividad y fecha en un hilo del
+    QThreadPool, para que la ventana siga respondiendo mientras la API
+    contesta. El resultado llega a la ventana por la señal `terminada`.
+    """
+
+    def __init__(self, numero, actividad, fecha):
+        super().__init__()
+        self.numero = numero
+        self.actividad = actividad
+        self.fecha = fecha
+        self.senales = SenalesConsulta()
+        # La ventana la guarda hasta recibir la respuesta (y puede
+        # llamar a tryTake): Qt no debe borrarla al terminar run()
+        self.setAutoDelete(False)
+
+    def run(self):
+        grilla = None
+        try:
+            resp = requests.post(
+                GRILLA_CUPOS_URL,
+                json={
+                    "fecha_desde": self.fecha,
+                    "actividad": self.actividad,
+                },
+                timeout=10,
             )
+            if resp.status_code == 200:
+                grilla = (resp.json() or {}).get("grilla", [])
+        except Exception:
+            pass
 
-    return "Inscripción realizada correctamente."
+        self.senales.terminada.emit(
+            self.numero, self.actividad, self.fecha, grilla
+        )
+
+
+def fechas_inscribibles():
+    # Hoy y los días que se pueden anticipar, en formato de la API
+    hoy = QDate.currentDate()
+    return [
+        hoy.addDays(dias).toString("dd-MM-yyyy")
+        for dias in range(MAXIMO_DIAS_ANTICIPACION + 1)
+    ]
+
+
+class EscuchaCupos(QThread):
+    """
+    Mantiene abierta la conexión a GET /cupos/eventos para las fechas en
+    que se puede inscribir y avisa cada cambio de cupos con la señal
+    `cambio`. Si la conexión se corta, vuelve a conectarse; mientras
+    tanto `conectada` vale False y la ventana vuelve a consultar. El
+    servidor cierra cada conexión a los pocos minutos; en ese caso se
+    reconecta enseguida.
+    """
+
+    # (actividad, fecha, horario, cupos)
+    cambio = pyqtSignal(str, str, str, int)
+    # Se perdieron cambios: hay que volver a consultar la grilla
+    resincronizar = pyqtSignal()
+    conectada = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.detenida = False
+        self.respuesta = None
+
+    def run(self):
+        while not self.detenida:
+            fechas = fechas_inscribibles()
+            cerrada_por_servidor = False
+            try:
+                with requests.get(
+                    EVENTOS_CUPOS_URL,
+                    params={"fecha_actividad": fechas},
+                    stream=True,
+                    # El servidor envía un latido cada 15 segundos
+                    timeout=(5, 60),
+                ) as resp:
+                    if resp.status_code == 200:
+                        self.respuesta = resp
+                        self.conectada.emit(True)
+                        self.leer_eventos(resp, fechas)
+                        cerrada_por_servidor = True
+            except Exception:
+                pass
+            finally:
+                self.respuesta = None
+            self.conectada.emit(False)
+            if cerrada_por_servidor:
+                continue
+
+            for _ in range(ESPERA_RECONEXION * 10):
+                if self.detenida:
+                    break
+                self.msleep(100)
+
+    def leer_eventos(self, resp, fechas):
+        evento = None
+        # Orden de la última escritura recibida por turno, para descartar
+        # avisos de escrituras anteriores que lleguen tarde
+        ordenes = {}
+        for linea in resp.iter_lines(decode_unicode=True):
+            if self.detenida or fechas != fechas_inscribibles():
+                return  # al cambiar el día se renueva la suscripción
+
+            if linea.startswith("event: "):
+                evento = linea.removeprefix("event: ")
+            elif linea.startswith("data: ") and evento == "cupos":
+                datos = json.loads(linea.removeprefix("data: "))
+                turno = (
+                    datos["actividad"],
+                    datos["fecha_actividad"],
+                    datos["horario_actividad"],
+                )
+                orden = datos.get("orden")
+                if orden is not None:
+                    if orden <= ordenes.get(turno, 0):
+                        continue
+                    ordenes[turno] = orden
+                self.cambio.emit(
+                    datos["actividad"],
+                    datos["fecha_actividad"],
+                    datos["horario_actividad"],
+                    datos["cupos"],
+                )
+            elif linea.startswith("data: ") and evento == "resincronizar":
+                self.resincronizar.emit()
+            elif not linea:
+                evento = None
+
+    def detener(self):
+        self.detenida = True
+        respuesta = self.respuesta
+        if respuesta is not None:
+            try:
+                respuesta.close()
+            except Exception:
+                pass
+        self.wait(2000)
 
 
 # ----------------------------------------
@@ -226,10 +382,11 @@ class DialogoPersona(QDialog):
         self.edad.setValidator(QIntValidator(1, 119, self))
         self.edad.setPlaceholderText("Solo números")
 
-        self.requiere_talle = self.actividad in ["Palestra", "Tirolesa"]
+        self.reglas = reglas_de(self.actividad)
+        self.requiere_talle = self.reglas.requiere_talle
         if self.requiere_talle:
             self.talle = QComboBox()
-            self.talle.addItems(["", "XS", "S", "M", "L", "XL"])
+            self.talle.addItems(["", *TALLES])
             layout.addRow("Talle:", self.talle)
         else:
             self.talle = None
@@ -274,7 +431,7 @@ class DialogoPersona(QDialog):
             )
             return
 
-        edad_minima = {"Palestra": 12, "Tirolesa": 8}.get(self.actividad, 0)
+        edad_minima = self.reglas.edad_minima
         if edad < edad_minima:
             QMessageBox.warning(
                 self,
@@ -312,6 +469,37 @@ class VentanaPrincipal(QMainWindow):
         self.setWindowTitle("Inscripción de Actividades")
         self.resize(600, 800)
         self.personas = []
+        # (payload, clave) de la última inscripción sin respuesta
+        # definitiva: si se reintenta la misma, se reusa la clave para
+        # que el servidor no la registre dos veces.
+        self.inscripcion_pendiente = None
+
+        # Cupos por horario ya consultados: (actividad, fecha) ->
+        # (momento de la consulta, {horario: cupos})
+        self.cache_cupos = {}
+        # Consultas lanzadas que todavía no respondieron, por número. Solo
+        # se muestra la respuesta de la última; las anteriores quedan
+        # reemplazadas.
+        self.consultas = {}
+        self.numero_consulta = 0
+        self.clave_en_curso = None
+        self.pool_consultas = QThreadPool(self)
+        self.pool_consultas.setMaxThreadCount(2)
+
+        self.timer_refresco = QTimer(self)
+        self.timer_refresco.setSingleShot(True)
+        self.timer_refresco.setInterval(ESPERA_REFRESCO_MS)
+        self.timer_refresco.timeout.connect(
+            self.actualizar_horarios_con_cupos
+        )
+
+        # Mientras llegan los avisos del servidor, los cupos guardados se
+        # mantienen al día sin volver a consultarlos
+        self.avisos_activos = False
+        self.escucha_cupos = EscuchaCupos(self)
+        self.escucha_cupos.cambio.connect(self.on_cambio_cupos)
+        self.escucha_cupos.resincronizar.connect(self.on_resincronizar)
+        self.escucha_cupos.conectada.connect(self.on_escucha_conectada)
 
         palette = QPalette()
         palette.setColor(QPalette.ColorRole.Window, QColor("#134611"))
@@ -383,9 +571,7 @@ class VentanaPrincipal(QMainWindow):
         self.combo_actividad.currentTextChanged.connect(
             self.on_actividad_cambiada
         )
-        self.fecha_input.dateChanged.connect(
-            self.actualizar_horarios_con_cupos
-        )
+        self.fecha_input.dateChanged.connect(self.programar_actualizacion)
 
         form_layout.addRow(QLabel("Actividad:"), self.combo_actividad)
         form_layout.addRow(QLabel("Fecha:"), self.fecha_input)
@@ -430,6 +616,7 @@ class VentanaPrincipal(QMainWindow):
         central.setLayout(layout)
         self.setCentralWidget(central)
         self.actualizar_horarios_con_cupos()
+        self.escucha_cupos.start()
 
     def configurar_calendario(self):
         calendario = self.fecha_input.calendarWidget()
@@ -457,17 +644,7 @@ class VentanaPrincipal(QMainWindow):
         calendario.setDateTextFormat(QDate.currentDate(), formato_hoy)
 
     def generar_horarios(self):
-        horarios = []
-        hora, minuto = 9, 0
-        while True:
-            horarios.append(f"{hora:02d}:{minuto:02d}")
-            if hora == 18 and minuto == 0:
-                break
-            minuto += 30
-            if minuto >= 60:
-                minuto = 0
-                hora += 1
-        return horarios
+        return list(HORARIOS_TURNOS)
 
     def agregar_persona(self):
         actividad = self.combo_actividad.currentText()
@@ -513,6 +690,14 @@ class VentanaPrincipal(QMainWindow):
             )
             return
 
+        if not self.hora_combo.isEnabled():
+            QMessageBox.information(
+                self,
+                "Atención",
+                "Esperá a que se carguen los horarios disponibles.",
+            )
+            return
+
         dialogo_terminos = TerminosDialog()
         if not dialogo_terminos.exec() or not dialogo_terminos.aceptado:
             QMessageBox.warning(
@@ -541,58 +726,222 @@ class VentanaPrincipal(QMainWindow):
                 "personas": self.personas,
                 "acepta_terminos_condiciones": True,
             }
+            inscribir_actividad(**payload)
+
+            clave = self.clave_idempotencia(payload)
+            resp = requests.post(
+                API_URL,
+                json=payload,
+                headers={"Idempotency-Key": clave},
+                timeout=15,
+            )
+            # Con 429 o 503 no se registró nada: se puede reintentar
+            # con la misma clave.
+            if resp.status_code not in (429, 503):
+                self.inscripcion_pendiente = None
 
-            resp = requests.post(API_URL, json=payload, timeout=15)
             if resp.status_code == 201:
                 data = resp.json()
                 mensaje = data.get(
                     "mensaje", "Inscripción realizada con éxito."
                 )
                 QMessageBox.information(self, "Éxito", "✅ " + mensaje)
+                if not self.avisos_activos:
+                    self.refrescar_cupos()
             else:
                 try:
                     detail = resp.json().get("detail", "")
                 except Exception:
                     detail = resp.text
+                if str(detail).startswith("No hay cupos suficientes"):
+                    self.ofrecer_lista_espera(payload)
+                    return
                 QMessageBox.critical(self, "Error", f"Error: {detail}")
 
         except Exception as exc:
             QMessageBox.critical(self, "Error", str(exc))
 
-    def actualizar_horarios_con_cupos(self):
+    def ofrecer_lista_espera(self, payload):
+        respuesta = QMessageBox.question(
+            self,
+            "Sin cupos",
+            (
+                "No hay cupos suficientes para el grupo. ¿Desea anotarse "
+                "en la lista de espera? Si se liberan cupos, el grupo "
+                "queda inscripto automáticamente."
+            ),
+        )
+        if respuesta != QMessageBox.StandardButton.Yes:
+            return
+
+        resp = requests.post(LISTA_ESPERA_URL, json=payload, timeout=15)
+        if resp.status_code != 201:
+            QMessageBox.critical(
+                self, "Error", f"Error: {resp.json().get('detail', '')}"
+            )
+            return
+
+        data = resp.json()
+        if data["estado"] == "inscripto":
+            mensaje = "Se liberaron cupos: el grupo quedó inscripto."
+        else:
+            mensaje = (
+                f"Quedaron anotados en la lista de espera (lugar "
+                f"{data['posicion']}, número {data['id']})."
+            )
+        QMessageBox.information(self, "Lista de espera", mensaje)
+        if not self.avisos_activos:
+            self.refrescar_cupos()
+
+    def clave_idempotencia(self, payload):
+        if (
+            self.inscripcion_pendiente
+            and self.inscripcion_pendiente[0] == payload
+        ):
+            return self.inscripcion_pendiente[1]
+
+        clave = str(uuid.uuid4())
+        # Copia: la lista de personas se sigue editando en la ventana
+        self.inscripcion_pendiente = (copy.deepcopy(payload), clave)
+        return clave
+
+    def programar_actualizacion(self, *_args):
+        # Reinicia la espera: se consulta cuando el usuario deja de
+        # cambiar la actividad o la fecha
+        self.timer_refresco.start()
+
+    def refrescar_cupos(self):
+        # Descarta los cupos guardados del turno elegido y los vuelve a
+        # consultar (por ejemplo luego de inscribir)
         actividad = self.combo_actividad.currentText()
         fecha = self.fecha_input.date().toString("dd-MM-yyyy")
-        horarios = self.generar_horarios()
+        self.cache_cupos.pop((actividad, fecha), None)
+        self.actualizar_horarios_con_cupos()
 
-        self.hora_combo.clear()
+    def actualizar_horarios_con_cupos(self, mostrar_carga=True):
+        self.timer_refresco.stop()
+        actividad = self.combo_actividad.currentText()
+        fecha = self.fecha_input.date().toString("dd-MM-yyyy")
+        clave = (actividad, fecha)
 
-        for h in horarios:
-            try:
-                resp = requests.post(
-                    CUPOS_URL,
-                    json={
-                        "actividad": actividad,
-                        "fecha_actividad": fecha,
-                        "horario_actividad": h,
-                    },
-                    timeout=10,
-                )
+        # Los días en que el parque cierra no tienen horarios
+        if motivo_cierre(self.fecha_input.date().toPyDate()) is not None:
+            self.descartar_consultas()
+            self.mostrar_horarios({})
+            return
 
-                if resp.status_code == 200:
-                    data = resp.json() or {}
-                    cupos = data.get("cupos", None)
+        guardados = self.cache_cupos.get(clave)
+        if guardados is not None and (
+            (self.avisos_activos and fecha in fechas_inscribibles())
+            or time.monotonic() - guardados[0] < VIGENCIA_CACHE_CUPOS
+        ):
+            self.descartar_consultas()
+            self.mostrar_horarios(guardados[1])
+            return
 
-                    if cupos is None:
-                        continue
+        # Ya se está consultando ese mismo turno: se espera la respuesta
+        if clave == self.clave_en_curso:
+            return
 
-                    display = f"{h} — cupos: {cupos}"
-                    self.hora_combo.addItem(display, userData=h)
-                else:
-                    continue
+        self.descartar_consultas()
+        self.clave_en_curso = clave
+        if mostrar_carga:
+            self.hora_combo.clear()
+            self.hora_combo.addItem("Cargando horarios...")
+            self.hora_combo.setEnabled(False)
+
+        consulta = ConsultaGrilla(self.numero_consulta, actividad, fecha)
+        consulta.senales.terminada.connect(self.on_grilla_recibida)
+        self.consultas[self.numero_consulta] = consulta
+        self.pool_consultas.start(consulta)
+
+    def descartar_consultas(self):
+        # Las consultas que todavía no empezaron ya no hacen falta; las
+        # que están en curso terminan, pero su respuesta ya no se muestra
+        # (sólo se guarda en la caché).
+        for numero, consulta in list(self.consultas.items()):
+            if self.pool_consultas.tryTake(consulta):
+                del self.consultas[numero]
+
+        self.numero_consulta += 1
+        self.clave_en_curso = None
+
+    def on_grilla_recibida(self, numero, actividad, fecha, grilla):
+        self.consultas.pop(numero, None)
+
+        cupos_por_horario = {}
+        if grilla is not None:
+            cupos_por_horario = {
+                item["horario_actividad"]: item["cupos"] for item in grilla
+            }
+            self.cache_cupos[(actividad, fecha)] = (
+                time.monotonic(),
+                cupos_por_horario,
+            )
 
-            except Exception:
+        if numero != self.numero_consulta:
+            return  # la reemplazó una consulta posterior
+
+        self.clave_en_curso = None
+        self.mostrar_horarios(cupos_por_horario)
+
+    def mostrar_horarios(self, cupos_por_horario):
+        # Si el horario elegido sigue en la lista, queda elegido
+        seleccionado = self.hora_combo.currentData()
+        self.hora_combo.clear()
+        self.hora_combo.setEnabled(True)
+
+        for h in self.generar_horarios():
+            cupos = cupos_por_horario.get(h)
+            if cupos is None:
                 continue
 
+            self.hora_combo.addItem(self.texto_horario(h, cupos), userData=h)
+
+        indice = self.hora_combo.findData(seleccionado)
+        if seleccionado is not None and indice >= 0:
+            self.hora_combo.setCurrentIndex(indice)
+
+    def texto_horario(self, horario, cupos):
+        return f"{horario} — cupos: {cupos}"
+
+    def on_cambio_cupos(self, actividad, fecha, horario, cupos):
+        # Aplica un aviso del servidor a los cupos guardados y, si es el
+        # turno a la vista, al combo de horarios
+        guardados = self.cache_cupos.get((actividad, fecha))
+        if guardados is not None:
+            guardados[1][horario] = cupos
+
+        if (
+            actividad != self.combo_actividad.currentText()
+            or fecha != self.fecha_input.date().toString("dd-MM-yyyy")
+            or not self.hora_combo.isEnabled()
+        ):
+            return
+
+        indice = self.hora_combo.findData(horario)
+        if indice >= 0:
+            self.hora_combo.setItemText(
+                indice, self.texto_horario(horario, cupos)
+            )
+
+    def on_resincronizar(self):
+        self.cache_cupos.clear()
+        self.refrescar_cupos()
+
+    def on_escucha_conectada(self, conectada):
+        # Los cambios ocurridos sin conexión no se recibieron: al
+        # conectarse se descartan los cupos guardados y se vuelven a
+        # consultar los que están a la vista, sin vaciar el combo
+        if conectada and not self.avisos_activos:
+            self.cache_cupos.clear()
+            self.actualizar_horarios_con_cupos(mostrar_carga=False)
+        self.avisos_activos = conectada
+
+    def closeEvent(self, event):
+        self.escucha_cupos.detener()
+        super().closeEvent(event)
+
     def on_actividad_cambiada(self, _texto):
         """Al cambiar la actividad:
         - Limpia las personas agregadas (datos + tabla).
@@ -604,7 +953,7 @@ class VentanaPrincipal(QMainWindow):
         if hasattr(self, "tabla_personas"):
             self.tabla_personas.setRowCount(0)
 
-        self.actualizar_horarios_con_cupos()
+        self.programar_actualizacion()
 
 
 # ----------------------------------------
@@ -0,0 +1,58 @@
+"""
+Calendario del parque: días en que está cerrado y horarios de los turnos.
+
+El parque cierra los lunes, el 25 de diciembre y el 1 de enero, y los
+turnos de cada actividad empiezan cada 30 minutos de 9:00 a 18:00.
+"""
+import datetime
+
+# datetime.date.weekday(): 0 es lunes
+DIAS_SEMANA_CERRADO = {0: "los lunes"}
+
+# (día, mes) -> feriado en que el parque no abre
+FERIADOS_CERRADO = {
+    (25, 12): "en Navidad",
+    (1, 1): "en Año Nuevo",
+}
+
+HORA_APERTURA = datetime.time(9, 0)
+HORA_ULTIMO_TURNO = datetime.time(18, 0)
+MINUTOS_ENTRE_TURNOS = 30
+
+
+def motivo_cierre(fecha):
+    """
+    Devuelve por qué el parque está cerrado en `fecha` (un date), por
+    ejemplo "los lunes", o None si abre ese día.
+    """
+    feriado = FERIADOS_CERRADO.get((fecha.day, fecha.month))
+    if feriado is not None:
+        return feriado
+    return DIAS_SEMANA_CERRADO.get(fecha.weekday())
+
+
+def parque_abierto(fecha):
+    return motivo_cierre(fecha) is None
+
+
+def _calcular_horarios():
+    horarios = []
+    actual = datetime.datetime.combine(datetime.date.min, HORA_APERTURA)
+    ultimo = datetime.datetime.combine(datetime.date.min, HORA_ULTIMO_TURNO)
+    while actual <= ultimo:
+        horarios.append(actual.strftime("%H:%M"))
+        actual += datetime.timedelta(minutes=MINUTOS_ENTRE_TURNOS)
+    return tuple(horarios)
+
+
+# Horarios de los turnos ("HH:MM"), iguales todos los días
+HORARIOS_TURNOS = _calcular_horarios()
+
+
+def dias_abiertos(desde, hasta):
+    # Fechas (date) entre desde y hasta, inclusive, en que el parque abre
+    dia = desde
+    while dia <= hasta:
+        if parque_abierto(dia):
+            yield dia
+        dia += datetime.timedelta(days=1)
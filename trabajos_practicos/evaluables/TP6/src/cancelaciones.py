@@ -0,0 +1,139 @@
+"""
+Cancelación de inscripciones con devolución de cupos.
+
+Se puede cancelar una persona o un grupo (por DNI) de un turno, o todas
+las inscripciones de un turno (por ejemplo si se suspende por clima, como
+prevén los términos y condiciones). En cada caso el borrado es una sola
+sentencia sobre el conjunto de filas y los cupos se devuelven en la misma
+transacción.
+"""
+import datetime
+
+from data.catalogo import obtener_catalogo
+from data.conexion import conexion, iniciar_transaccion_inmediata
+from data.fechas import (
+    fecha_a_db,
+    horario_a_api,
+    parsear_fecha,
+    parsear_horario
+)
+from data.repositorio import exigir_cupos_en_base
+from src.eventos import turno_modificado
+from src.inscripcion_actividad import SQL_DEVOLVER_CUPOS, clave_cache
+from src.lista_espera import promover_lista_espera
+
+# Máximo de DNIs por cancelación de grupo (límite de parámetros de SQLite)
+MAXIMO_DNIS_GRUPO = 200
+
+SQL_CANCELAR_TURNO = """
+DELETE FROM INSCRIPCIONES
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+"""
+
+SQL_CANCELAR_LISTA_ESPERA_TURNO = """
+UPDATE LISTA_ESPERA SET estado = 'cancelado'
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+  AND estado = 'esperando'
+"""
+
+
+def _sql_cancelar_dnis(cantidad):
+    return (
+        "DELETE FROM INSCRIPCIONES "
+        "WHERE id_actividad = ? AND id_horario = ? AND fecha = ? "
+        f"AND dni IN ({', '.join('?' * cantidad)})")
+
+
+CONSULTAS = {
+    "cancelar_dnis": _sql_cancelar_dnis(2),
+    "cancelar_turno": SQL_CANCELAR_TURNO,
+    "cancelar_lista_espera_turno": SQL_CANCELAR_LISTA_ESPERA_TURNO,
+}
+
+
+def cancelar_inscripciones(
+        actividad, fecha_actividad, horario_actividad, dnis):
+    """
+    Cancela las inscripciones de los DNIs indicados (una persona o un
+    grupo) en el turno y devuelve sus cupos. Es todo o nada: si algún DNI
+    no estaba inscripto no se cancela ninguno. Los cupos devueltos pasan
+    primero a la lista de espera. Devuelve la cantidad de cancelaciones.
+    """
+    dnis = set(dnis)
+    if not dnis:
+        raise ValueError("Se debe indicar al menos un DNI.")
+    if len(dnis) > MAXIMO_DNIS_GRUPO:
+        raise ValueError(
+            f"No se pueden cancelar más de {MAXIMO_DNIS_GRUPO} "
+            "personas a la vez")
+
+    clave = _resolver_turno(actividad, fecha_actividad, horario_actividad)
+    if _ya_comenzo(fecha_actividad, horario_actividad):
+        raise ValueError("No se puede cancelar una actividad ya realizada")
+
+    exigir_cupos_en_base("cancelar inscripciones")
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            canceladas = conn.execute(
+                _sql_cancelar_dnis(len(dnis)), (*clave, *dnis)).rowcount
+            if canceladas != len(dnis):
+                raise ValueError(
+                    "Hay personas que no están inscriptas en ese horario")
+
+            conn.execute(SQL_DEVOLVER_CUPOS, (canceladas, *clave))
+            promover_lista_espera(conn, *clave)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    turno_modificado(
+        clave_cache(actividad, fecha_actividad, horario_actividad))
+    return canceladas
+
+
+def cancelar_turno(actividad, fecha_actividad, horario_actividad):
+    """
+    Cancela todas las inscripciones del turno con un único DELETE,
+    devuelve los cupos y saca de la lista de espera a los grupos que
+    esperaban (el turno se suspende, no se promueve a nadie). Devuelve la
+    cantidad de inscripciones canceladas.
+    """
+    clave = _resolver_turno(actividad, fecha_actividad, horario_actividad)
+
+    exigir_cupos_en_base("cancelar inscripciones")
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            canceladas = conn.execute(SQL_CANCELAR_TURNO, clave).rowcount
+            if canceladas:
+                conn.execute(SQL_DEVOLVER_CUPOS, (canceladas, *clave))
+            conn.execute(SQL_CANCELAR_LISTA_ESPERA_TURNO, clave)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    turno_modificado(
+        clave_cache(actividad, fecha_actividad, horario_actividad))
+    return canceladas
+
+
+def _resolver_turno(actividad, fecha_actividad, horario_actividad):
+    catalogo = obtener_catalogo()
+    id_actividad = catalogo.actividades.get(actividad)
+    id_horario = catalogo.horarios.get(horario_a_api(horario_actividad))
+
+    if id_actividad is None or id_horario is None:
+        raise ValueError("No hay horario para esa actividad.")
+
+    return id_actividad, id_horario, fecha_a_db(parsear_fecha(fecha_actividad))
+
+
+def _ya_comenzo(fecha_actividad, horario_actividad):
+    fecha = parsear_fecha(fecha_actividad)
+    horario = parsear_horario(horario_actividad)
+    inicio = datetime.datetime(
+        fecha.year, fecha.month, fecha.day, horario.hour, horario.minute)
+    return inicio < datetime.datetime.now()
@@ -0,0 +1,156 @@
+"""
+Avisos de cambios de cupos.
+
+Las funciones que modifican cupos llaman a turno_modificado() luego del
+commit: actualiza o invalida la entrada de cache_cupos, incrementa la
+versión de la fecha (el ETag de GET /cupos) y publica el cambio en
+canal_cupos. Cada conexión de GET /cupos/eventos es una suscripción a
+ciertas fechas (y opcionalmente actividades) con su propia cola, así que
+un cambio se entrega solo a quienes miran ese turno.
+
+La publicación ocurre en los hilos de la base y las colas pertenecen al
+event loop de la API: los cambios se entregan con call_soon_threadsafe.
+Como se publica luego de liberar el bloqueo de escritura, dos escrituras
+del mismo turno pueden avisar en otro orden que el de sus commits; cada
+cambio lleva el número de su transacción (data.conexion.orden_escritura)
+para que la caché y cada flujo descarten los valores viejos.
+Como la caché, el canal solo ve las escrituras de su proceso.
+"""
+import asyncio
+import threading
+from dataclasses import dataclass
+
+from data.cache_cupos import cache_cupos, versiones_cupos
+from data.conexion import orden_escritura
+
+# Cambios que puede acumular un suscriptor lento antes de perderlos (en
+# ese caso se le pide que vuelva a consultar la grilla)
+CAPACIDAD_COLA = 256
+
+
+@dataclass(frozen=True)
+class CambioCupos:
+    # Turno con el formato de la API; cupos es None si no se conoce el
+    # valor nuevo y hay que consultarlo. orden es el número de la
+    # transacción que hizo el cambio (None si no se conoce).
+    actividad: str
+    fecha_actividad: str
+    horario_actividad: str
+    cupos: int = None
+    orden: int = None
+
+
+class Suscripcion:
+    """
+    Cola de cambios de un cliente. Se crea desde el event loop que la va
+    a leer.
+    """
+
+    def __init__(self, fechas, actividades=None, capacidad=CAPACIDAD_COLA):
+        self.fechas = frozenset(fechas)
+        self.actividades = frozenset(actividades or ()) or None
+        self.desbordada = False
+        self._loop = asyncio.get_running_loop()
+        self._cola = asyncio.Queue(capacidad)
+
+    def interesa(self, cambio):
+        return (cambio.fecha_actividad in self.fechas and (
+            self.actividades is None or
+            cambio.actividad in self.actividades))
+
+    def entregar(self, cambio):
+        # Se puede llamar desde cualquier hilo
+        try:
+            self._loop.call_soon_threadsafe(self._encolar, cambio)
+        except RuntimeError:
+            pass  # el event loop ya se cerró
+
+    def _encolar(self, cambio):
+        try:
+            self._cola.put_nowait(cambio)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+    async def siguientes(self, espera):
+        """
+        Espera hasta `espera` segundos por un cambio y devuelve todos los
+        pendientes, o una lista vacía si no hubo ninguno.
+        """
+        try:
+            cambios = [await asyncio.wait_for(self._cola.get(), espera)]
+        except asyncio.TimeoutError:
+            return []
+        while not self._cola.empty():
+            cambios.append(self._cola.get_nowait())
+        return cambios
+
+    def descartar_pendientes(self):
+        # Luego de un desborde: el cliente va a consultar todo de nuevo
+        while not self._cola.empty():
+            self._cola.get_nowait()
+        self.desbordada = False
+
+
+class CanalCupos:
+    """
+    Publica cada cambio a las suscripciones de su fecha. Las
+    suscripciones se indexan por fecha para no recorrer las demás.
+    """
+
+    def __init__(self):
+        self._por_fecha = {}  # fecha -> {suscripciones}
+        self._lock = threading.Lock()
+
+    def suscribir(self, fechas, actividades=None):
+        suscripcion = Suscripcion(fechas, actividades)
+        with self._lock:
+            for fecha in suscripcion.fechas:
+                self._por_fecha.setdefault(fecha, set()).add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            for fecha in suscripcion.fechas:
+                suscripciones = self._por_fecha.get(fecha)
+                if suscripciones is None:
+                    continue
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._por_fecha[fecha]
+
+    def publicar(self, cambio):
+        with self._lock:
+            destinatarios = [
+                suscripcion for suscripcion in
+                self._por_fecha.get(cambio.fecha_actividad, ())
+                if suscripcion.interesa(cambio)
+            ]
+        for suscripcion in destinatarios:
+            suscripcion.entregar(cambio)
+
+    def cantidad_suscripciones(self):
+        with self._lock:
+            return len(set().union(*self._por_fecha.values()))
+
+    def limpiar(self):
+        with self._lock:
+            self._por_fecha.clear()
+
+
+canal_cupos = CanalCupos()
+
+
+def turno_modificado(clave, cupos=None):
+    """
+    Registra que cambiaron los cupos del turno `clave` (la clave de
+    cache_cupos). Si se conocen los cupos que quedaron se guardan en la
+    caché; si no, se invalida la entrada. Se llama desde el hilo que
+    hizo la escritura, luego del commit.
+    """
+    orden = orden_escritura()
+    if cupos is None:
+        cache_cupos.invalidar(clave, orden)
+    else:
+        cache_cupos.guardar(clave, (cupos,), orden=orden)
+    versiones_cupos.incrementar(clave[1])
+    canal_cupos.publicar(CambioCupos(*clave, cupos, orden))
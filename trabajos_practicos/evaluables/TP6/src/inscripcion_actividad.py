@@ -1,6 +1,46 @@
 import datetime
-import sqlite3
-from sqlite3 import IntegrityError, OperationalError
+from dataclasses import dataclass
+from sqlite3 import IntegrityError
+
+from data import metricas
+from data.cache_cupos import NO_ENCONTRADO, cache_cupos
+from data.catalogo import obtener_catalogo
+from data.fechas import (
+    fecha_a_api,
+    fecha_a_db,
+    fecha_desde_db,
+    horario_a_api,
+    parsear_fecha,
+    parsear_horario
+)
+from data.repositorio import (
+    SQL_CUPOS_POR_CLAVE,
+    SQL_DESCONTAR_CUPOS,
+    SQL_DEVOLVER_CUPOS,
+    SQL_GRILLA,
+    SQL_GRILLA_ACTIVIDAD,
+    SQL_INSERTAR_INSCRIPCION,
+    obtener_repositorio
+)
+from src.eventos import turno_modificado
+from src.reglas import reglas_de, validar_fecha_hora, validar_personas
+
+# Cantidad máxima de días que se pueden pedir en una consulta de grilla
+MAXIMO_DIAS_GRILLA = 31
+
+# Turnos que se pueden inscribir juntos en un carrito
+MAXIMO_ITEMS_CARRITO = 10
+
+# Consultas del repositorio SQLite que usa este módulo
+# (data/verificar_planes.py revisa sus planes)
+CONSULTAS = {
+    "cupos_por_clave": SQL_CUPOS_POR_CLAVE,
+    "descontar_cupos": SQL_DESCONTAR_CUPOS,
+    "devolver_cupos": SQL_DEVOLVER_CUPOS,
+    "insertar_inscripcion": SQL_INSERTAR_INSCRIPCION,
+    "grilla": SQL_GRILLA,
+    "grilla_actividad": SQL_GRILLA_ACTIVIDAD,
+}
 
 
 def inscribir_actividad(
@@ -12,161 +52,345 @@ def inscribir_actividad(
     if not acepta_terminos_condiciones:
         raise ValueError("Se deben aceptar los terminos y condiciones")
 
+    turno = validar_turno(
+        actividad, fecha_actividad, horario_actividad, personas)
+
+    # -----------------------------------------------------------
+    # TRANSACCIÓN (conexión, bloqueo, commit o rollback en el repositorio)
+    # -----------------------------------------------------------
+    with obtener_repositorio().transaccion() as transaccion:
+        cupos_disponibles = _reservar_turno(transaccion, turno)
+
+    # La lectura se hizo con el bloqueo de escritura tomado, así que el
+    # valor nuevo es exacto y se puede actualizar la caché (y avisar a
+    # los suscriptores) en lugar de solo invalidarla.
+    turno_modificado(
+        clave_cache(actividad, fecha_actividad, horario_actividad),
+        cupos_disponibles - len(personas))
+    return (turno.id_actividad, turno.id_horario, cupos_disponibles)
+
+
+class ErrorCarrito(ValueError):
+    """
+    Rechazo de un carrito de inscripciones. Además del mensaje lleva el
+    resultado de cada ítem, para que el cliente sepa cuál falló.
+    """
+
+    def __init__(self, mensaje, resultados):
+        super().__init__(mensaje)
+        self.resultados = resultados
+
+
+def inscribir_carrito(items, acepta_terminos_condiciones):
+    """
+    Inscribe varios turnos (actividad, fecha, horario y personas) en una
+    sola transacción: se reservan todos o ninguno.
+
+    `items` es una lista de diccionarios con las claves actividad,
+    fecha_actividad, horario_actividad y personas. Devuelve, por ítem, un
+    diccionario con el turno y los cupos que quedan. Si algún ítem no se
+    puede inscribir se lanza ErrorCarrito con el resultado de cada uno.
+    """
+    if not acepta_terminos_condiciones:
+        raise ValueError("Se deben aceptar los terminos y condiciones")
+
+    if not items:
+        raise ValueError("El carrito no tiene inscripciones.")
+
+    if len(items) > MAXIMO_ITEMS_CARRITO:
+        raise ValueError(
+            "No se pueden inscribir más de "
+            f"{MAXIMO_ITEMS_CARRITO} turnos a la vez")
+
+    # Se validan todos los ítems antes de abrir la conexión, informando
+    # cada error y no solo el primero.
+    turnos = []
+    resultados = [_resultado_item(item, "sin_procesar") for item in items]
+    for item, resultado in zip(items, resultados):
+        try:
+            turnos.append(validar_turno(
+                item["actividad"], item["fecha_actividad"],
+                item["horario_actividad"], item["personas"]))
+        except ValueError as e:
+            resultado.update(estado="rechazado", detalle=str(e))
+
+    if any(r["estado"] == "rechazado" for r in resultados):
+        raise ErrorCarrito(
+            "Hay inscripciones del carrito que no son válidas", resultados)
+
+    indice = 0
+    try:
+        with obtener_repositorio().transaccion() as transaccion:
+            cupos_restantes = []
+            for indice, turno in enumerate(turnos):
+                cupos = _reservar_turno(transaccion, turno) - len(
+                    turno.filas)
+                cupos_restantes.append(cupos)
+
+    except ValueError as e:
+        # Los ítems anteriores al que falló se deshacen con el rollback
+        for resultado in resultados[:indice]:
+            resultado["estado"] = "revertido"
+        resultados[indice].update(estado="rechazado", detalle=str(e))
+        raise ErrorCarrito(
+            "No se pudo inscribir el carrito completo", resultados)
+
+    # Un mismo turno puede repetirse en el carrito: el último valor es el
+    # que quedó en la base.
+    for item, resultado, cupos in zip(items, resultados, cupos_restantes):
+        turno_modificado(
+            clave_cache(item["actividad"], item["fecha_actividad"],
+                        item["horario_actividad"]),
+            cupos)
+        resultado.update(estado="inscripto", cupos_restantes=cupos)
+    return resultados
+
+
+def _resultado_item(item, estado):
+    # La fecha y el horario se informan en el formato de la API aunque
+    # lleguen ya parseados
+    try:
+        fecha_actividad = fecha_a_api(item["fecha_actividad"])
+        horario_actividad = horario_a_api(item["horario_actividad"])
+    except ValueError:
+        fecha_actividad = item["fecha_actividad"]
+        horario_actividad = item["horario_actividad"]
+    return {
+        "actividad": item["actividad"],
+        "fecha_actividad": fecha_actividad,
+        "horario_actividad": horario_actividad,
+        "estado": estado,
+    }
+
+
+def clave_cache(actividad, fecha_actividad, horario_actividad):
+    """
+    Clave de un turno en cache_cupos. La fecha y el horario pueden venir
+    como texto de la API o ya parseados; la clave usa siempre el texto.
+    """
+    return (actividad, fecha_a_api(fecha_actividad),
+            horario_a_api(horario_actividad))
+
+
+@dataclass(frozen=True)
+class _Turno:
+    # Turno ya validado, con los ids del catálogo y las filas a insertar
+    id_actividad: int
+    id_horario: int
+    fecha_db: str
+    filas: list
+
+
+def validar_turno(actividad, fecha_actividad, horario_actividad, personas):
+    """
+    Valida fecha, horario y personas de una inscripción sin tocar la base
+    y devuelve el turno a reservar (ids, fecha y filas a insertar).
+    """
+    with metricas.medir("validacion"):
+        id_actividad, id_horario, fecha_db = validar_fecha_horario(
+            actividad, fecha_actividad, horario_actividad)
+
+        # Se valida todo el grupo antes de tocar la base: si una persona
+        # no cumple, no se abre la conexión.
+        validar_personas(actividad, personas)
+
+    with metricas.medir("armar_grupo"):
+        filas = _armar_inscripciones(
+            actividad, id_actividad, id_horario, fecha_db, personas,
+            obtener_catalogo())
+
+    return _Turno(id_actividad, id_horario, fecha_db, filas)
+
+
+def validar_fecha_horario(actividad, fecha_actividad, horario_actividad):
+    """
+    Aplica las reglas de fecha y horario (src/reglas.py) y verifica que la
+    actividad y el horario existan. Devuelve (id_actividad, id_horario,
+    fecha en formato de la base).
+    """
     fecha_hora_actual = datetime.datetime.now()
 
-    # Parsear la fecha de la actividad
-    dia_actividad, mes_actividad, anio_actividad = (
-        int(fecha) for fecha in fecha_actividad.split("-"))
-    hora_actividad, minutos_actividad = (
-        int(horario) for horario in horario_actividad.split(":"))
+    # La fecha y el horario llegan parseados desde la API; si vienen como
+    # texto se parsean aquí (los parsers recuerdan los valores ya vistos).
+    fecha = parsear_fecha(fecha_actividad)
+    horario = parsear_horario(horario_actividad)
 
     # Crear objeto datetime para la actividad
     fecha_hora_actividad = datetime.datetime(
-        anio_actividad, mes_actividad, dia_actividad, hora_actividad,
-        minutos_actividad)
+        fecha.year, fecha.month, fecha.day, horario.hour, horario.minute)
+
+    validar_fecha_hora(fecha_hora_actividad, fecha_hora_actual)
+
+    # Los ids de actividad y horario salen del catálogo en memoria
+    catalogo = obtener_catalogo()
+    id_actividad = catalogo.actividades.get(actividad)
+    id_horario = catalogo.horarios.get(horario_a_api(horario))
+
+    if id_actividad is None or id_horario is None:
+        raise ValueError("No hay horario para esa actividad.")
+
+    # En la base la fecha se guarda en formato ISO (YYYY-MM-DD)
+    return id_actividad, id_horario, fecha_a_db(fecha)
+
+
+def _reservar_turno(transaccion, turno):
+    """
+    Descuenta los cupos e inserta las inscripciones de un turno dentro de
+    la transacción ya abierta en el repositorio. Devuelve los cupos que
+    había antes.
+    """
+    clave = (turno.id_actividad, turno.id_horario, turno.fecha_db)
+
+    with metricas.medir("select"):
+        cupos_disponibles = transaccion.cupos(clave)
 
-    # Validación de que la actividad no haya sucedido
-    if fecha_hora_actividad < fecha_hora_actual:
-        raise ValueError("No se puede inscribir a actividades ya realizadas")
+    if cupos_disponibles is None:
+        raise ValueError("No hay horario para esa actividad.")
 
-    # Validación de anticipación máxima de 2 días
-    diferencia_dias = (fecha_hora_actividad.date() -
-                       fecha_hora_actual.date()).days
+    cantidad_personas = len(turno.filas)
 
-    if diferencia_dias > 2:
+    if cupos_disponibles < cantidad_personas:
         raise ValueError(
-            "No se puede inscribir a una actividad con "
-            "más de dos dias de anticipacion")
+            "No hay cupos suficientes para"
+            " inscribir a todas las personas.")
 
-    # Validación de que todos los datos de las personas esten cargados
-    for persona in personas:
-        if not all([
-            persona.get("dni"),
-            persona.get("nombre"),
-            persona.get("edad")
-        ]):
-            raise ValueError("Los datos de la persona están incompletos")
+    # 1. ACTUALIZA CUPOS (descuento condicional)
+    with metricas.medir("update"):
+        descontados = transaccion.descontar_cupos(clave, cantidad_personas)
 
-    # -----------------------------------------------------------
-    # MANEJO DE CONEXIÓN ROBUSTO
-    # -----------------------------------------------------------
-    conn = None  # Se inicializa la conexión para el bloque finally
-    row = None
+    if not descontados:
+        raise ValueError(
+            "No hay cupos suficientes para"
+            " inscribir a todas las personas.")
+
+    # 2. INSERTA INSCRIPCIONES (todo el grupo en una sola sentencia)
     try:
-        conn = sqlite3.connect('data/parque.db')
-        cursor = conn.cursor()
-
-        # busca el id del horario, id de la actividad y cupos disponibles
-        cursor.execute(
-            "SELECT A.id, H.id, AXH.cupos_disponibles "
-            "FROM ACTIVIDADES_X_HORARIOS AXH "
-            "join ACTIVIDADES A on A.id = AXH.id_actividad "
-            "join HORARIOS H on AXH.id_horario = H.id "
-            "WHERE A.nombre = ? AND AXH.fecha = ? AND H.hora = ?",
-            (actividad, fecha_actividad, horario_actividad))
-        # print("paso") # Se comenta print de debug
-
-        row = cursor.fetchone()
-
-        if row is None:
-            raise ValueError("No hay horario para esa actividad.")
-
-        id_actividad, id_horario, cupos_disponibles = row
-        cupos_actualizados = cupos_disponibles - len(personas)
-
-        if cupos_actualizados < 0:
-            raise ValueError(
-                "No hay cupos suficientes para"
-                " inscribir a todas las personas.")
-
-        # 1. ACTUALIZA CUPOS
-        cursor.execute("""
-        UPDATE ACTIVIDADES_X_HORARIOS
-        SET cupos_disponibles = ?
-        WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
-        """, (cupos_actualizados, id_actividad, id_horario, fecha_actividad))
-
-        # print("paso2") # Se comenta print de debug
-
-        # 2. INSERTA INSCRIPCIONES
-        try:
-            for persona in personas:
-                es_palestra = (
-                    actividad == "Palestra" and persona["edad"] < 12)
-                es_tirolesa = (
-                    actividad == "Tirolesa" and persona["edad"] < 8)
-
-                if es_palestra or es_tirolesa:
-                    raise ValueError("no cumple con la edad mínima")
-
-                if actividad in ("Palestra", "Tirolesa"):
-                    cursor.execute("""
-                    SELECT id FROM TALLAS
-                    WHERE nombre = ?""", (persona.get("talle"),))
-                    # Se usa .get para evitar KeyError si 'talle' falta
-
-                    id_talle = cursor.fetchone()
-
-                    if id_talle is None:
-                        raise ValueError("Talle de persona invalido")
-
-                    cursor.execute("""
-                    INSERT INTO INSCRIPCIONES
-                    (id_actividad, id_horario, fecha, dni,
-                     id_talla, nombre_visitante)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        id_actividad, id_horario, fecha_actividad,
-                        persona["dni"], id_talle[0], persona["nombre"]))
-                else:
-                    # CORRECCIÓN DE ERROR SQL: Se aseguran 6 placeholders.
-                    cursor.execute("""
-                    INSERT INTO INSCRIPCIONES
-                    (id_actividad, id_horario, fecha, dni,
-                     id_talla, nombre_visitante)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        id_actividad, id_horario, fecha_actividad,
-                        persona["dni"], None, persona["nombre"]))
-                    # Se pasa None como id_talla
-
-        except IntegrityError as e:
-            print(e)
-            raise ValueError(
-                "No se puede inscribir con el mismo DNI en un mismo "
-                "horario de actividad")
-
-        # Si todo se ejecutó sin errores
-        conn.commit()
-        return row
-
-    except (ValueError, IntegrityError, OperationalError) as e:
-        # Si ocurre un error de validación o de DB, se garantiza el rollback.
-        if conn:
-            conn.rollback()
-        raise e  # Relanzamos la excepción
-
-    finally:
-        # ESTE BLOQUE SE EJECUTA SIEMPRE: Asegura el cierre de la conexión.
-        if 'cursor' in locals() and cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        with metricas.medir("insert"):
+            transaccion.insertar_inscripciones(turno.filas)
+
+    except IntegrityError:
+        raise ValueError(
+            "No se puede inscribir con el mismo DNI en un mismo "
+            "horario de actividad")
+
+    return cupos_disponibles
+
+
+def _armar_inscripciones(
+        actividad, id_actividad, id_horario, fecha_db, personas, catalogo):
+    """
+    Resuelve el id del talle de cada persona (el grupo ya pasó por
+    validar_personas) y devuelve las filas listas para insertar en
+    INSCRIPCIONES.
+    """
+    requiere_talle = reglas_de(actividad).requiere_talle
+
+    filas = []
+    for persona in personas:
+        id_talle = None
+        if requiere_talle:
+            id_talle = catalogo.tallas.get(persona["talle"])
+
+            if id_talle is None:
+                raise ValueError("Talle de persona invalido")
+
+        filas.append((
+            id_actividad, id_horario, fecha_db, persona["dni"],
+            id_talle, persona["nombre"]))
+
+    return filas
 
 
 def mostrar_cupos_para_fecha_hora_actividad(
         actividad, fecha_actividad, horario_actividad):
 
-    conn = sqlite3.connect('data/parque.db')
-    cursor = conn.cursor()
-
-    # busca el id del horario, id de la actividad y cupos disponibles
-    cursor.execute("""
-    SELECT AXH.cupos_disponibles
-    FROM ACTIVIDADES_X_HORARIOS AXH
-    join ACTIVIDADES A on A.id = AXH.id_actividad
-    join HORARIOS H on AXH.id_horario = H.id
-    WHERE A.nombre = ? AND AXH.fecha = ? AND H.hora = ?
-    """, (actividad, fecha_actividad, horario_actividad))
+    clave = clave_cache(actividad, fecha_actividad, horario_actividad)
+    cupos = cache_cupos.obtener(clave)
+    if cupos is not NO_ENCONTRADO:
+        return cupos
+
+    # Antes de leer: si una escritura termina mientras tanto, su valor
+    # queda en la caché y no el que se va a leer acá
+    generacion = cache_cupos.generacion()
+    catalogo = obtener_catalogo()
+    id_actividad = catalogo.actividades.get(actividad)
+    id_horario = catalogo.horarios.get(clave[2])
+
+    cupos = None
+    if id_actividad is not None and id_horario is not None:
+        disponibles = obtener_repositorio().consultar_cupos(
+            (id_actividad, id_horario, fecha_a_db(clave[1])))
+        if disponibles is not None:
+            cupos = (disponibles,)
+
+    # También se guardan los horarios inexistentes, que el frontend
+    # consulta igual que los existentes.
+    cache_cupos.guardar(clave, cupos, generacion)
+    return cupos
+
+
+def _validar_rango_fechas(fecha_desde, fecha_hasta):
+    # Devuelve los extremos del rango (incluidos) en el formato de la base
+    desde = parsear_fecha(fecha_desde)
+    hasta = parsear_fecha(fecha_hasta)
+
+    if hasta < desde:
+        raise ValueError(
+            "La fecha de fin no puede ser anterior a la fecha de inicio")
 
-    return cursor.fetchone()
\ No newline at end of file
+    cantidad_dias = (hasta - desde).days + 1
+    if cantidad_dias > MAXIMO_DIAS_GRILLA:
+        raise ValueError(
+            "No se puede consultar la grilla de cupos para más de "
+            f"{MAXIMO_DIAS_GRILLA} dias")
+
+    return fecha_a_db(desde), fecha_a_db(hasta)
+
+
+def mostrar_grilla_cupos(fecha_desde, fecha_hasta=None, actividad=None):
+    """
+    Devuelve los cupos de todos los horarios para una fecha (o un rango de
+    fechas) con una única consulta. Si no se indica la actividad se
+    incluyen todas.
+    """
+    desde_db, hasta_db = _validar_rango_fechas(
+        fecha_desde, fecha_hasta or fecha_desde)
+    catalogo = obtener_catalogo()
+
+    # Los nombres de actividad y horario se resuelven con el catálogo,
+    # así la consulta no necesita joins.
+    id_actividad = None
+    if actividad is not None:
+        id_actividad = catalogo.actividades.get(actividad)
+        if id_actividad is None:
+            return []
+
+    generacion = cache_cupos.generacion()
+    filas = [
+        (fecha, catalogo.nombres_actividades[id_actividad],
+         catalogo.horas[id_horario], cupos)
+        for id_actividad, fecha, id_horario, cupos in
+        obtener_repositorio().grilla(desde_db, hasta_db, id_actividad)
+    ]
+
+    # Las fechas ISO ordenan cronológicamente como texto
+    filas.sort()
+
+    grilla = [
+        {
+            "actividad": nombre,
+            "fecha_actividad": fecha_desde_db(fecha),
+            "horario_actividad": hora,
+            "cupos": cupos,
+        }
+        for fecha, nombre, hora, cupos in filas
+    ]
+
+    # Se aprovecha la consulta para dejar en caché cada horario
+    for item in grilla:
+        cache_cupos.guardar(
+            (item["actividad"], item["fecha_actividad"],
+             item["horario_actividad"]),
+            (item["cupos"],), generacion)
+
+    return grilla
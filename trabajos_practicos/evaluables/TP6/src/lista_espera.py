@@ -0,0 +1,187 @@
+"""
+Lista de espera por turno con promoción automática.
+
+Un grupo que no consigue cupos queda anotado en LISTA_ESPERA. Cada vez que
+se devuelven cupos a un turno (reservas liberadas o vencidas,
+cancelaciones) se llama a promover_lista_espera() dentro de la misma
+transacción: inscribe a los grupos en orden de llegada mientras entren en
+los cupos libres. Solo se mira la cabeza de la lista del turno (por
+índice), nunca se recorren todas las listas.
+
+El orden es estricto: si el primer grupo no entra, los siguientes
+esperan aunque sean más chicos.
+"""
+import datetime
+import json
+from sqlite3 import IntegrityError
+
+from data.conexion import conexion, iniciar_transaccion_inmediata
+from data.repositorio import exigir_cupos_en_base
+from src.eventos import turno_modificado
+from src.inscripcion_actividad import (
+    SQL_CUPOS_POR_CLAVE,
+    SQL_DESCONTAR_CUPOS,
+    SQL_INSERTAR_INSCRIPCION,
+    clave_cache,
+    validar_turno
+)
+
+ESPERANDO = "esperando"
+INSCRIPTO = "inscripto"
+# No se pudo inscribir al promoverlo (algún DNI ya estaba inscripto)
+DESCARTADO = "descartado"
+CANCELADO = "cancelado"
+
+SQL_ANOTAR = """
+INSERT INTO LISTA_ESPERA
+(id_actividad, id_horario, fecha, cantidad, personas, creada_en)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+SQL_CABEZA = """
+SELECT id, cantidad, personas FROM LISTA_ESPERA
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+  AND estado = 'esperando'
+ORDER BY id LIMIT 1
+"""
+
+SQL_CAMBIAR_ESTADO = "UPDATE LISTA_ESPERA SET estado = ? WHERE id = ?"
+
+SQL_CANCELAR = (
+    "UPDATE LISTA_ESPERA SET estado = 'cancelado' "
+    "WHERE id = ? AND estado = 'esperando'")
+
+SQL_ESTADO = (
+    "SELECT id_actividad, id_horario, fecha, estado FROM LISTA_ESPERA "
+    "WHERE id = ?")
+
+SQL_GRUPOS_ADELANTE = """
+SELECT COUNT(*) FROM LISTA_ESPERA
+WHERE id_actividad = ? AND id_horario = ? AND fecha = ?
+  AND estado = 'esperando' AND id < ?
+"""
+
+CONSULTAS = {
+    "cabeza": SQL_CABEZA,
+    "cambiar_estado": SQL_CAMBIAR_ESTADO,
+    "cancelar": SQL_CANCELAR,
+    "estado": SQL_ESTADO,
+    "grupos_adelante": SQL_GRUPOS_ADELANTE,
+}
+
+
+def anotar_en_lista_espera(
+        actividad, fecha_actividad, horario_actividad, personas,
+        acepta_terminos_condiciones):
+    """
+    Anota al grupo en la lista de espera del turno. El grupo se valida
+    igual que en la inscripción. Si justo hay cupos (y nadie esperando
+    antes), queda inscripto en el momento.
+
+    Devuelve un diccionario con el id, el estado y la posición en la
+    lista (0 si ya no espera).
+    """
+    if not acepta_terminos_condiciones:
+        raise ValueError("Se deben aceptar los terminos y condiciones")
+
+    turno = validar_turno(
+        actividad, fecha_actividad, horario_actividad, personas)
+    clave = (turno.id_actividad, turno.id_horario, turno.fecha_db)
+    # Se guardan las filas ya resueltas: (dni, id_talla, nombre)
+    grupo = json.dumps([fila[3:] for fila in turno.filas])
+
+    exigir_cupos_en_base("anotar en la lista de espera")
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            if conn.execute(SQL_CUPOS_POR_CLAVE, clave).fetchone() is None:
+                raise ValueError("No hay horario para esa actividad.")
+
+            id_espera = conn.execute(SQL_ANOTAR, (
+                *clave, len(turno.filas), grupo,
+                datetime.datetime.now().isoformat(" ", "seconds"),
+            )).lastrowid
+            promovidas = promover_lista_espera(conn, *clave)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if promovidas:
+        turno_modificado(
+            clave_cache(actividad, fecha_actividad, horario_actividad))
+
+    return consultar_lista_espera(id_espera)
+
+
+def consultar_lista_espera(id_espera):
+    # Estado del grupo y cuántos grupos tiene adelante en su turno
+    with conexion() as conn:
+        fila = conn.execute(SQL_ESTADO, (id_espera,)).fetchone()
+        if fila is None:
+            raise ValueError("No existe ese lugar en la lista de espera.")
+
+        id_actividad, id_horario, fecha_db, estado = fila
+        posicion = 0
+        if estado == ESPERANDO:
+            adelante, = conn.execute(SQL_GRUPOS_ADELANTE, (
+                id_actividad, id_horario, fecha_db, id_espera)).fetchone()
+            posicion = adelante + 1
+
+    return {"id": id_espera, "estado": estado, "posicion": posicion}
+
+
+def cancelar_lista_espera(id_espera):
+    """
+    Saca al grupo de la lista. Devuelve False si ya no estaba esperando.
+    """
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            cancelado = conn.execute(SQL_CANCELAR, (id_espera,)).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return bool(cancelado)
+
+
+def promover_lista_espera(conn, id_actividad, id_horario, fecha_db):
+    """
+    Inscribe, dentro de la transacción abierta en `conn`, a los grupos de
+    la cabeza de la lista del turno mientras entren en los cupos libres.
+    Devuelve la cantidad de personas inscriptas.
+    """
+    clave = (id_actividad, id_horario, fecha_db)
+    promovidas = 0
+    while True:
+        cabeza = conn.execute(SQL_CABEZA, clave).fetchone()
+        if cabeza is None:
+            break
+
+        id_espera, cantidad, grupo = cabeza
+
+        # Un savepoint permite descartar solo este grupo si algún DNI ya
+        # se inscribió por otro lado, sin deshacer la transacción entera.
+        conn.execute("SAVEPOINT promocion")
+        descontados = conn.execute(
+            SQL_DESCONTAR_CUPOS, (cantidad, *clave, cantidad)).rowcount
+        if descontados == 0:
+            conn.execute("RELEASE promocion")
+            break  # el primer grupo todavía no entra
+
+        try:
+            conn.executemany(SQL_INSERTAR_INSCRIPCION, (
+                (*clave, dni, id_talla, nombre)
+                for dni, id_talla, nombre in json.loads(grupo)))
+        except IntegrityError:
+            conn.execute("ROLLBACK TO promocion")
+            conn.execute("RELEASE promocion")
+            conn.execute(SQL_CAMBIAR_ESTADO, (DESCARTADO, id_espera))
+            continue
+        conn.execute("RELEASE promocion")
+
+        conn.execute(SQL_CAMBIAR_ESTADO, (INSCRIPTO, id_espera))
+        promovidas += cantidad
+
+    return promovidas
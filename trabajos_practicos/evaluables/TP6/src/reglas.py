@@ -0,0 +1,140 @@
+"""
+Reglas de inscripción compartidas por la API y el frontend.
+
+Las reglas de cada actividad se declaran en REGLAS_ACTIVIDADES y al cargar
+el módulo se arman las tablas de búsqueda que usan las validaciones
+(edades mínimas, actividades con talle, horarios de los turnos). Ninguna
+función de este módulo hace I/O: el servidor las evalúa antes de pedir una
+conexión y el frontend antes de enviar la solicitud.
+"""
+import datetime
+from dataclasses import dataclass
+
+from data.fechas import parsear_fecha, parsear_horario
+from src.calendario import (
+    HORA_APERTURA,
+    HORA_ULTIMO_TURNO,
+    HORARIOS_TURNOS,
+    motivo_cierre
+)
+
+# Días que se puede anticipar una inscripción
+MAXIMO_DIAS_ANTICIPACION = 2
+
+# Talles del equipo de seguridad que ofrece el frontend
+TALLES = ("XS", "S", "M", "L", "XL")
+
+
+@dataclass(frozen=True)
+class ReglasActividad:
+    edad_minima: int = 0
+    requiere_talle: bool = False
+
+
+SIN_REGLAS = ReglasActividad()
+
+# Las actividades que no figuran no tienen restricciones
+REGLAS_ACTIVIDADES = {
+    "Palestra": ReglasActividad(edad_minima=12, requiere_talle=True),
+    "Tirolesa": ReglasActividad(edad_minima=8, requiere_talle=True),
+}
+
+# --- TABLAS DE BÚSQUEDA (calculadas una sola vez) ---
+
+EDADES_MINIMAS = {
+    actividad: reglas.edad_minima
+    for actividad, reglas in REGLAS_ACTIVIDADES.items()
+    if reglas.edad_minima
+}
+
+ACTIVIDADES_CON_TALLE = frozenset(
+    actividad for actividad, reglas in REGLAS_ACTIVIDADES.items()
+    if reglas.requiere_talle)
+
+_HORAS_TURNOS = frozenset(
+    datetime.time.fromisoformat(horario) for horario in HORARIOS_TURNOS)
+
+
+def reglas_de(actividad):
+    return REGLAS_ACTIVIDADES.get(actividad, SIN_REGLAS)
+
+
+def validar_fecha_hora(fecha_hora_actividad, fecha_hora_actual):
+    """
+    Verifica que el turno (un datetime) no haya pasado, que no falten más
+    de dos días, que el parque abra ese día y que haya un turno a esa hora.
+    """
+    if fecha_hora_actividad < fecha_hora_actual:
+        raise ValueError("No se puede inscribir a actividades ya realizadas")
+
+    diferencia_dias = (fecha_hora_actividad.date() -
+                       fecha_hora_actual.date()).days
+    if diferencia_dias > MAXIMO_DIAS_ANTICIPACION:
+        raise ValueError(
+            "No se puede inscribir a una actividad con "
+            "más de dos dias de anticipacion")
+
+    cierre = motivo_cierre(fecha_hora_actividad.date())
+    if cierre is not None:
+        raise ValueError(
+            "No hay horario para esa actividad: el parque no abre "
+            f"{cierre}.")
+
+    hora = fecha_hora_actividad.time()
+    if hora not in _HORAS_TURNOS:
+        if not HORA_APERTURA <= hora <= HORA_ULTIMO_TURNO:
+            raise ValueError(
+                "No hay horario para esa actividad: los turnos son de "
+                f"{HORARIOS_TURNOS[0]} a {HORARIOS_TURNOS[-1]}.")
+        raise ValueError("No hay horario para esa actividad.")
+
+
+def validar_personas(actividad, personas):
+    """
+    Verifica que el grupo no esté vacío, que cada persona tenga sus datos,
+    la edad mínima y el talle que pide la actividad, y que no se repitan
+    DNIs.
+    """
+    if not personas:
+        raise ValueError("Debe inscribir al menos una persona.")
+
+    for persona in personas:
+        if not all([
+            persona.get("dni"),
+            persona.get("nombre"),
+            persona.get("edad")
+        ]):
+            raise ValueError("Los datos de la persona están incompletos")
+
+    reglas = reglas_de(actividad)
+    dnis = set()
+    for persona in personas:
+        if persona["edad"] < reglas.edad_minima:
+            raise ValueError("no cumple con la edad mínima")
+
+        if reglas.requiere_talle and not persona.get("talle"):
+            raise ValueError("Talle de persona invalido")
+
+        if persona["dni"] in dnis:
+            raise ValueError(
+                "No se puede inscribir con el mismo DNI en un mismo "
+                "horario de actividad")
+        dnis.add(persona["dni"])
+
+
+def validar_inscripcion(
+        actividad, fecha_actividad, horario_actividad, personas,
+        acepta_terminos_condiciones, ahora=None):
+    """
+    Aplica todas las reglas a una inscripción tal como llega a la API
+    (fecha DD-MM-YYYY y horario HH:MM).
+    """
+    if not acepta_terminos_condiciones:
+        raise ValueError("Se deben aceptar los terminos y condiciones")
+
+    fecha_hora_actividad = datetime.datetime.combine(
+        parsear_fecha(fecha_actividad), parsear_horario(horario_actividad))
+
+    validar_fecha_hora(
+        fecha_hora_actividad, ahora or datetime.datetime.now())
+    validar_personas(actividad, personas)
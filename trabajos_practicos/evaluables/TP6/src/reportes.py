@@ -0,0 +1,134 @@
+"""
+Reportes de ocupación y de demanda de equipos.
+
+Los números salen de RESUMEN_TURNOS y DEMANDA_TALLAS, que los triggers de
+la migración 0006 mantienen en la misma transacción que cada inscripción
+o cancelación. Cada reporte lee solo las filas del rango de fechas
+pedido, así que su costo depende del tamaño del resultado y no de
+cuántas inscripciones haya en la base.
+
+La ocupación de un turno es inscriptos / (inscriptos + cupos
+disponibles): los cupos retenidos por una reserva temporal no cuentan
+como ocupados ni como libres hasta que se confirman o se liberan.
+"""
+from data.catalogo import obtener_catalogo
+from data.conexion import conexion
+from data.fechas import fecha_a_db, fecha_desde_db, parsear_fecha
+from data.repositorio import exigir_cupos_en_base
+
+# Días que puede abarcar un reporte
+MAXIMO_DIAS_REPORTE = 366
+
+SQL_OCUPACION = """
+SELECT t.fecha, t.id_actividad, t.id_horario, t.cupos_disponibles,
+       COALESCE(r.inscriptos, 0)
+FROM ACTIVIDADES_X_HORARIOS AS t
+LEFT JOIN RESUMEN_TURNOS AS r
+  ON r.fecha = t.fecha AND r.id_actividad = t.id_actividad
+ AND r.id_horario = t.id_horario
+WHERE t.fecha BETWEEN ? AND ?
+"""
+
+SQL_OCUPACION_ACTIVIDAD = SQL_OCUPACION + "  AND t.id_actividad = ?\n"
+
+SQL_DEMANDA_TALLAS = """
+SELECT fecha, id_actividad, id_talla, cantidad FROM DEMANDA_TALLAS
+WHERE fecha BETWEEN ? AND ? AND cantidad > 0
+"""
+
+SQL_DEMANDA_TALLAS_ACTIVIDAD = (
+    SQL_DEMANDA_TALLAS + "  AND id_actividad = ?\n")
+
+CONSULTAS = {
+    "ocupacion": SQL_OCUPACION,
+    "ocupacion_actividad": SQL_OCUPACION_ACTIVIDAD,
+    "demanda_tallas": SQL_DEMANDA_TALLAS,
+    "demanda_tallas_actividad": SQL_DEMANDA_TALLAS_ACTIVIDAD,
+}
+
+
+def _rango_reporte(fecha_desde, fecha_hasta):
+    desde = parsear_fecha(fecha_desde)
+    hasta = parsear_fecha(fecha_hasta)
+
+    if hasta < desde:
+        raise ValueError(
+            "La fecha de fin no puede ser anterior a la fecha de inicio")
+
+    if (hasta - desde).days + 1 > MAXIMO_DIAS_REPORTE:
+        raise ValueError(
+            "No se puede pedir un reporte de más de "
+            f"{MAXIMO_DIAS_REPORTE} dias")
+
+    return fecha_a_db(desde), fecha_a_db(hasta)
+
+
+def _consultar(sql, sql_actividad, fecha_desde, fecha_hasta, actividad):
+    # Filas del rango (y de la actividad, si se indica)
+    exigir_cupos_en_base("generar reportes")
+    parametros = list(
+        _rango_reporte(fecha_desde, fecha_hasta or fecha_desde))
+    consulta = sql
+    if actividad is not None:
+        id_actividad = obtener_catalogo().actividades.get(actividad)
+        if id_actividad is None:
+            return []
+        consulta = sql_actividad
+        parametros.append(id_actividad)
+
+    with conexion() as conn:
+        return conn.execute(consulta, parametros).fetchall()
+
+
+def reporte_ocupacion(fecha_desde, fecha_hasta=None, actividad=None):
+    """
+    Inscriptos, cupos libres y ocupación (de 0 a 1) de cada turno del
+    rango, ordenados por fecha, actividad y horario.
+    """
+    catalogo = obtener_catalogo()
+    filas = sorted(
+        (fecha, catalogo.nombres_actividades[id_actividad],
+         catalogo.horas[id_horario], disponibles, inscriptos)
+        for fecha, id_actividad, id_horario, disponibles, inscriptos in
+        _consultar(SQL_OCUPACION, SQL_OCUPACION_ACTIVIDAD,
+                   fecha_desde, fecha_hasta, actividad)
+    )
+
+    return [
+        {
+            "actividad": nombre,
+            "fecha_actividad": fecha_desde_db(fecha),
+            "horario_actividad": hora,
+            "inscriptos": inscriptos,
+            "cupos_disponibles": disponibles,
+            "ocupacion": (
+                round(inscriptos / (inscriptos + disponibles), 4)
+                if inscriptos + disponibles else 0.0),
+        }
+        for fecha, nombre, hora, disponibles, inscriptos in filas
+    ]
+
+
+def reporte_demanda_tallas(fecha_desde, fecha_hasta=None, actividad=None):
+    """
+    Equipos de seguridad pedidos por día, actividad y talla en el rango,
+    ordenados por fecha, actividad y talla.
+    """
+    catalogo = obtener_catalogo()
+    filas = sorted(
+        (fecha, catalogo.nombres_actividades[id_actividad], id_talla,
+         cantidad)
+        for fecha, id_actividad, id_talla, cantidad in
+        _consultar(SQL_DEMANDA_TALLAS, SQL_DEMANDA_TALLAS_ACTIVIDAD,
+                   fecha_desde, fecha_hasta, actividad)
+    )
+
+    return [
+        {
+            "actividad": nombre,
+            "fecha_actividad": fecha_desde_db(fecha),
+            "talla": catalogo.nombres_tallas[id_talla],
+            "cantidad": cantidad,
+        }
+        for fecha, nombre, id_talla, cantidad in filas
+    ]
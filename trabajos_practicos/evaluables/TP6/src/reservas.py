@@ -0,0 +1,386 @@
+"""
+Reservas temporales de cupos.
+
+Mientras un grupo carga sus datos se pueden retener N cupos de un turno
+por unos minutos: los cupos se descuentan de ACTIVIDADES_X_HORARIOS al
+reservar (con el mismo descuento condicional que la inscripción) y la
+reserva queda en RESERVAS_TEMPORALES hasta que se confirma, se libera o
+vence.
+
+Los vencimientos se ordenan en un heap en memoria (VencimientosReservas):
+el barrido solo mira la cabeza del heap y borra cada reserva vencida por
+clave primaria, sin recorrer la tabla. Cada proceso conoce solo las
+reservas que creó; al iniciar, cargar_vencimientos() toma las que ya
+estaban en la base.
+"""
+import heapq
+import os
+import threading
+import time
+import uuid
+from sqlite3 import IntegrityError
+
+from data import metricas
+from data.catalogo import obtener_catalogo
+from data.conexion import conexion, iniciar_transaccion_inmediata
+from data.fechas import fecha_desde_db
+from data.repositorio import exigir_cupos_en_base
+from src.eventos import turno_modificado
+from src.inscripcion_actividad import (
+    SQL_DESCONTAR_CUPOS,
+    SQL_DEVOLVER_CUPOS,
+    SQL_INSERTAR_INSCRIPCION,
+    clave_cache,
+    validar_fecha_horario,
+    validar_turno
+)
+from src.lista_espera import promover_lista_espera
+
+# Duración por defecto y máxima de una reserva, en segundos
+DURACION_POR_DEFECTO = float(os.environ.get("PARQUE_RESERVA_SEGUNDOS", "300"))
+DURACION_MAXIMA = 900
+
+SQL_INSERTAR_RESERVA = """
+INSERT INTO RESERVAS_TEMPORALES
+(token, id_actividad, id_horario, fecha, cantidad, vence_en)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Borra la reserva (si no venció) y devuelve el turno que retenía
+SQL_TOMAR_RESERVA = """
+DELETE FROM RESERVAS_TEMPORALES
+WHERE token = ? AND vence_en > ?
+RETURNING id_actividad, id_horario, fecha, cantidad
+"""
+
+# Igual que la anterior, sin importar el vencimiento
+SQL_QUITAR_RESERVA = """
+DELETE FROM RESERVAS_TEMPORALES
+WHERE token = ?
+RETURNING id_actividad, id_horario, fecha, cantidad
+"""
+
+SQL_QUITAR_RESERVA_VENCIDA = """
+DELETE FROM RESERVAS_TEMPORALES
+WHERE token = ? AND vence_en <= ?
+RETURNING id_actividad, id_horario, fecha, cantidad
+"""
+
+SQL_RESERVAS_POR_VENCIMIENTO = (
+    "SELECT token, vence_en FROM RESERVAS_TEMPORALES "
+    "WHERE vence_en > ? ORDER BY vence_en")
+
+SQL_RESERVAS_VENCIDAS = (
+    "SELECT token FROM RESERVAS_TEMPORALES WHERE vence_en <= ?")
+
+CONSULTAS = {
+    "tomar_reserva": SQL_TOMAR_RESERVA,
+    "quitar_reserva": SQL_QUITAR_RESERVA,
+    "quitar_reserva_vencida": SQL_QUITAR_RESERVA_VENCIDA,
+    "reservas_por_vencimiento": SQL_RESERVAS_POR_VENCIMIENTO,
+    "reservas_vencidas": SQL_RESERVAS_VENCIDAS,
+}
+
+
+class VencimientosReservas:
+    """
+    Heap de (vence_en, token) de las reservas activas. Las reservas que se
+    confirman o liberan antes de vencer no se sacan del heap: se descartan
+    al llegar a la cabeza si ya no están activas.
+    """
+
+    def __init__(self, reloj=time.time):
+        self.reloj = reloj
+        self._heap = []
+        self._activas = set()
+        self._lock = threading.Lock()
+        self._hay_cambios = threading.Event()
+
+    def agregar(self, token, vence_en):
+        with self._lock:
+            heapq.heappush(self._heap, (vence_en, token))
+            self._activas.add(token)
+        self._hay_cambios.set()
+
+    def descartar(self, token):
+        with self._lock:
+            self._activas.discard(token)
+
+    def vencidas(self, ahora=None):
+        # Saca del heap y devuelve los (vence_en, token) activos ya
+        # vencidos
+        ahora = self.reloj() if ahora is None else ahora
+        vencidas = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= ahora:
+                vence_en, token = heapq.heappop(self._heap)
+                if token in self._activas:
+                    self._activas.discard(token)
+                    vencidas.append((vence_en, token))
+        return vencidas
+
+    def reponer(self, vencidas):
+        # Vuelve a poner en el heap reservas que no se pudieron liberar,
+        # sin despertar al barrendero (que reintenta más tarde)
+        with self._lock:
+            for vence_en, token in vencidas:
+                heapq.heappush(self._heap, (vence_en, token))
+                self._activas.add(token)
+
+    def proximo_vencimiento(self):
+        with self._lock:
+            while self._heap and self._heap[0][1] not in self._activas:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def esperar_cambios(self, segundos):
+        # Despierta antes si se agrega una reserva (que puede vencer antes)
+        self._hay_cambios.wait(segundos)
+        self._hay_cambios.clear()
+
+    def despertar(self):
+        self._hay_cambios.set()
+
+    def limpiar(self):
+        with self._lock:
+            self._heap.clear()
+            self._activas.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._activas)
+
+
+vencimientos = VencimientosReservas()
+
+
+def reservar_cupos(
+        actividad, fecha_actividad, horario_actividad, cantidad,
+        duracion=None):
+    """
+    Retiene `cantidad` cupos del turno durante `duracion` segundos.
+    Devuelve (token, vence_en) de la reserva.
+    """
+    duracion = DURACION_POR_DEFECTO if duracion is None else duracion
+    if cantidad < 1:
+        raise ValueError("Se debe reservar al menos un cupo.")
+    if not 0 < duracion <= DURACION_MAXIMA:
+        raise ValueError(
+            "La reserva debe durar entre 1 y "
+            f"{DURACION_MAXIMA} segundos")
+
+    id_actividad, id_horario, fecha_db = validar_fecha_horario(
+        actividad, fecha_actividad, horario_actividad)
+
+    exigir_cupos_en_base("reservar cupos")
+    token = uuid.uuid4().hex
+    vence_en = vencimientos.reloj() + duracion
+
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            cursor = conn.execute(SQL_DESCONTAR_CUPOS, (
+                cantidad, id_actividad, id_horario, fecha_db, cantidad))
+            if cursor.rowcount == 0:
+                raise ValueError(
+                    "No hay cupos suficientes para reservar.")
+
+            conn.execute(SQL_INSERTAR_RESERVA, (
+                token, id_actividad, id_horario, fecha_db, cantidad,
+                vence_en))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    vencimientos.agregar(token, vence_en)
+    # El valor exacto lo trae la próxima consulta
+    turno_modificado(
+        clave_cache(actividad, fecha_actividad, horario_actividad))
+    return token, vence_en
+
+
+def confirmar_reserva(token, personas, acepta_terminos_condiciones):
+    """
+    Inscribe a las personas usando los cupos retenidos por la reserva. Si
+    son menos que los cupos reservados, el resto vuelve a estar
+    disponible. Devuelve la cantidad de personas inscriptas.
+    """
+    if not acepta_terminos_condiciones:
+        raise ValueError("Se deben aceptar los terminos y condiciones")
+
+    exigir_cupos_en_base("confirmar reservas")
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            fila = conn.execute(
+                SQL_TOMAR_RESERVA, (token, vencimientos.reloj())).fetchone()
+            if fila is None:
+                raise ValueError("La reserva no existe o ya venció.")
+
+            id_actividad, id_horario, fecha_db, cantidad = fila
+            catalogo = obtener_catalogo()
+            actividad = catalogo.nombres_actividades[id_actividad]
+            fecha_actividad = fecha_desde_db(fecha_db)
+            horario_actividad = catalogo.horas[id_horario]
+
+            turno = validar_turno(
+                actividad, fecha_actividad, horario_actividad, personas)
+            if len(turno.filas) > cantidad:
+                raise ValueError(
+                    "Hay más personas que cupos reservados.")
+
+            try:
+                with metricas.medir("insert"):
+                    conn.executemany(SQL_INSERTAR_INSCRIPCION, turno.filas)
+            except IntegrityError:
+                raise ValueError(
+                    "No se puede inscribir con el mismo DNI en un mismo "
+                    "horario de actividad")
+
+            sobrantes = cantidad - len(turno.filas)
+            if sobrantes:
+                conn.execute(SQL_DEVOLVER_CUPOS, (
+                    sobrantes, id_actividad, id_horario, fecha_db))
+                promover_lista_espera(
+                    conn, id_actividad, id_horario, fecha_db)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    vencimientos.descartar(token)
+    turno_modificado(
+        clave_cache(actividad, fecha_actividad, horario_actividad))
+    return len(turno.filas)
+
+
+def liberar_reserva(token):
+    """
+    Devuelve los cupos de una reserva que no se va a confirmar. Devuelve
+    la cantidad de cupos liberados (0 si la reserva ya no existía).
+    """
+    liberados = _devolver_reservas([token], SQL_QUITAR_RESERVA)
+    vencimientos.descartar(token)
+    return liberados
+
+
+def barrer_reservas_vencidas(ahora=None):
+    """
+    Devuelve los cupos de las reservas vencidas. Solo se consulta la base
+    por las reservas que el heap indica como vencidas. Devuelve la
+    cantidad de cupos liberados.
+    """
+    ahora = vencimientos.reloj() if ahora is None else ahora
+    vencidas = vencimientos.vencidas(ahora)
+    if not vencidas:
+        return 0
+    try:
+        return _devolver_reservas(
+            [token for _, token in vencidas], SQL_QUITAR_RESERVA_VENCIDA,
+            ahora)
+    except Exception:
+        # No se liberó ninguna (la transacción se revirtió): quedan para
+        # el próximo barrido
+        vencimientos.reponer(vencidas)
+        raise
+
+
+def _devolver_reservas(tokens, sql_quitar, *parametros):
+    exigir_cupos_en_base("liberar reservas")
+    liberados = 0
+    turnos = set()
+    with conexion() as conn:
+        iniciar_transaccion_inmediata(conn)
+        try:
+            for token in tokens:
+                fila = conn.execute(
+                    sql_quitar, (token, *parametros)).fetchone()
+                if fila is None:
+                    continue  # ya confirmada o liberada
+                id_actividad, id_horario, fecha_db, cantidad = fila
+                conn.execute(SQL_DEVOLVER_CUPOS, (
+                    cantidad, id_actividad, id_horario, fecha_db))
+                liberados += cantidad
+                turnos.add((id_actividad, id_horario, fecha_db))
+
+            # Los cupos devueltos van primero a la lista de espera
+            for turno in turnos:
+                promover_lista_espera(conn, *turno)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    catalogo = obtener_catalogo()
+    for id_actividad, id_horario, fecha_db in turnos:
+        turno_modificado((
+            catalogo.nombres_actividades[id_actividad],
+            fecha_desde_db(fecha_db), catalogo.horas[id_horario]))
+    return liberados
+
+
+def cargar_vencimientos():
+    """
+    Carga en el heap las reservas activas que hay en la base (por ejemplo
+    al reiniciar el servidor), recorriéndolas por el índice de
+    vencimiento, y libera las que vencieron mientras estaba detenido.
+    """
+    ahora = vencimientos.reloj()
+    with conexion() as conn:
+        vencidas = [
+            token for token, in conn.execute(SQL_RESERVAS_VENCIDAS, (ahora,))
+        ]
+        activas = conn.execute(
+            SQL_RESERVAS_POR_VENCIMIENTO, (ahora,)).fetchall()
+
+    for token, vence_en in activas:
+        vencimientos.agregar(token, vence_en)
+    return _devolver_reservas(vencidas, SQL_QUITAR_RESERVA) if vencidas else 0
+
+
+class BarrenderoReservas:
+    """
+    Hilo que duerme hasta el próximo vencimiento del heap (o hasta que se
+    agrega una reserva) y devuelve los cupos de las reservas vencidas.
+    """
+
+    # Espera máxima entre revisiones cuando no hay reservas
+    ESPERA_MAXIMA = 5.0
+    # Espera antes de reintentar un barrido que falló
+    ESPERA_REINTENTO = 1.0
+
+    def __init__(self, barrer=barrer_reservas_vencidas):
+        self._barrer = barrer
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._detener.clear()
+        self._hilo = threading.Thread(
+            target=self._correr, name="barrendero-reservas", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        vencimientos.despertar()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _correr(self):
+        while not self._detener.is_set():
+            try:
+                self._barrer()
+            except Exception as e:
+                # Se reintenta en la próxima vuelta (p. ej. base ocupada);
+                # las reservas vencidas siguen en el heap
+                print(f"Error al liberar reservas vencidas: {e}")
+                vencimientos.esperar_cambios(self.ESPERA_REINTENTO)
+                continue
+
+            proximo = vencimientos.proximo_vencimiento()
+            espera = self.ESPERA_MAXIMA
+            if proximo is not None:
+                espera = min(espera, max(0.0, proximo - vencimientos.reloj()))
+            vencimientos.esperar_cambios(espera)
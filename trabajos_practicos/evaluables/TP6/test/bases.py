@@ -0,0 +1,74 @@
+"""
+Ayudas para los tests que usan una base SQLite real.
+
+La plantilla (todas las migraciones aplicadas) se arma una vez por sesión
+en conftest.py y cada test recibe una copia hecha con la API de backup de
+SQLite, sin volver a correr las migraciones ni copiar data/parque.db.
+"""
+import datetime
+import sqlite3
+
+FECHA_PRUEBA = "18-10-2025"
+FECHA_PRUEBA_DB = "2025-10-18"  # formato en que se guarda
+
+# Momento en que corren los tests: el día anterior a FECHA_PRUEBA
+AHORA_PRUEBA = datetime.datetime(2025, 10, 17, 12, 0, 0)
+
+# Turno que siembra la fixture base_temporal: Safari a las 16:00
+TURNO_PRUEBA = (3, 15, FECHA_PRUEBA_DB)
+CUPOS_TURNO_PRUEBA = 10
+
+
+def clonar_base(plantilla, destino):
+    # Copia la plantilla en `destino` (una ruta o ":memory:")
+    conn = sqlite3.connect(destino, isolation_level=None)
+    plantilla.backup(conn)
+    return conn
+
+
+def agregar_turnos(ruta, filas):
+    # Filas (id_actividad, id_horario, fecha en formato ISO, cupos)
+    conn = sqlite3.connect(ruta)
+    conn.executemany(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS "
+        "(id_actividad, id_horario, fecha, cupos_disponibles) "
+        "VALUES (?, ?, ?, ?)", filas)
+    conn.commit()
+    conn.close()
+
+
+def cupos_disponibles(ruta, turno=TURNO_PRUEBA):
+    # Cupos de `turno` (id_actividad, id_horario, fecha ISO) en la base
+    conn = sqlite3.connect(ruta)
+    cupos, = conn.execute(
+        "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS "
+        "WHERE id_actividad = ? AND id_horario = ? AND fecha = ?",
+        turno).fetchone()
+    conn.close()
+    return cupos
+
+
+def contar_filas(ruta, tabla):
+    conn = sqlite3.connect(ruta)
+    cantidad, = conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()
+    conn.close()
+    return cantidad
+
+
+def dnis_inscriptos(ruta):
+    conn = sqlite3.connect(ruta)
+    dnis = [dni for dni, in conn.execute(
+        "SELECT dni FROM INSCRIPCIONES ORDER BY dni")]
+    conn.close()
+    return dnis
+
+
+def fijar_ahora(mocker, modulo, ahora=AHORA_PRUEBA):
+    # datetime.datetime.now() devuelve `ahora` dentro de `modulo`; el
+    # constructor sigue funcionando
+    mock_datetime = mocker.patch(f"{modulo}.datetime")
+    mock_datetime.datetime.now.return_value = ahora
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+    return mock_datetime
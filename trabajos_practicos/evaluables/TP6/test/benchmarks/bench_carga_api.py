@@ -0,0 +1,348 @@
+"""
+Prueba de carga de la API contra una base SQLite real.
+
+Se crea una base temporal con las migraciones y se la siembra con
+dias × actividades × horarios filas de ACTIVIDADES_X_HORARIOS. Después se
+lanza una mezcla de /inscribir y /cupos de dos formas:
+- en proceso, con un cliente ASGI (httpx.ASGITransport) y N tareas
+  concurrentes;
+- fuera de proceso, contra un uvicorn real con N procesos trabajadores;
+- en memoria, como "en proceso" pero con los turnos copiados a un
+  RepositorioMemoria (mide la API sin el costo de SQLite).
+
+Por cada forma y endpoint se informan solicitudes por segundo, p50/p95/p99
+y la tasa de errores. El resultado se guarda en un JSON junto con el commit
+y la escala usada, para poder comparar corridas entre commits.
+
+Uso (desde la raíz del TP):
+    python -m test.benchmarks.bench_carga_api --dias 7 --solicitudes 2000
+    python -m test.benchmarks.bench_carga_api --modos en_proceso \
+        --salida carga.json
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from data.migrador import crear_base
+from src.calendario import parque_abierto
+from test.benchmarks.bench_modos_api import percentil
+
+MODO_EN_PROCESO = "en_proceso"
+MODO_FUERA_DE_PROCESO = "fuera_de_proceso"
+MODO_MEMORIA = "memoria"
+
+# Con edad y talle válidos para todas las actividades
+PERSONA_BASE = {"nombre": "Visitante", "edad": 30, "talle": "M"}
+
+
+def sembrar_base(ruta, dias, actividades, horarios, cupos, desde=None):
+    """
+    Crea la base en `ruta` y carga un cupo para cada combinación de día,
+    actividad y horario (todo en una transacción). Devuelve la lista de
+    (actividad, fecha DD-MM-YYYY, horario) sembrados.
+    """
+    desde = desde or datetime.date.today()
+    conn = crear_base(ruta)
+    try:
+        nombres = dict(conn.execute(
+            "SELECT nombre, id FROM ACTIVIDADES "
+            "ORDER BY id LIMIT ?", (actividades,)).fetchall())
+        horas = dict(conn.execute(
+            "SELECT hora, id FROM HORARIOS "
+            "ORDER BY id LIMIT ?", (horarios,)).fetchall())
+        fechas = [desde + datetime.timedelta(days=d) for d in range(dias)]
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO ACTIVIDADES_X_HORARIOS "
+            "(id_actividad, id_horario, fecha, cupos_disponibles) "
+            "VALUES (?, ?, ?, ?)",
+            ((nombres[a], horas[h], f.isoformat(), cupos)
+             for f, a, h in itertools.product(fechas, nombres, horas)))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    return [
+        (a, f.strftime("%d-%m-%Y"), h)
+        for f, a, h in itertools.product(fechas, nombres, horas)
+    ]
+
+
+def armar_solicitudes(turnos, cantidad, proporcion_escrituras, semilla,
+                      primer_dni=1):
+    """
+    Genera (endpoint, payload) al azar. Las inscripciones van a turnos de
+    mañana o pasado mañana (los únicos inscribibles a cualquier hora del
+    día) que el parque abra, y cada una usa un DNI distinto.
+    """
+    azar = random.Random(semilla)
+    hoy = datetime.date.today()
+    # Los días de cierre responderían 400 y se contarían como errores
+    inscribibles = {
+        dia.strftime("%d-%m-%Y")
+        for dia in (hoy + datetime.timedelta(days=d) for d in (1, 2))
+        if parque_abierto(dia)
+    }
+    turnos_escritura = [t for t in turnos if t[1] in inscribibles]
+    dnis = itertools.count(primer_dni)
+
+    solicitudes = []
+    for _ in range(cantidad):
+        escribir = (
+            turnos_escritura and azar.random() < proporcion_escrituras)
+        if escribir:
+            actividad, fecha, horario = azar.choice(turnos_escritura)
+            solicitudes.append(("/inscribir", {
+                "actividad": actividad,
+                "fecha_actividad": fecha,
+                "horario_actividad": horario,
+                "personas": [dict(PERSONA_BASE, dni=next(dnis))],
+                "acepta_terminos_condiciones": True,
+            }))
+        else:
+            actividad, fecha, horario = azar.choice(turnos)
+            solicitudes.append(("/cupos", {
+                "actividad": actividad,
+                "fecha_actividad": fecha,
+                "horario_actividad": horario,
+            }))
+    return solicitudes
+
+
+def resumir(mediciones, duracion):
+    """
+    `mediciones` es una lista de (endpoint, estado, latencia en s).
+    Devuelve las métricas por endpoint.
+    """
+    por_endpoint = defaultdict(list)
+    for endpoint, estado, latencia in mediciones:
+        por_endpoint[endpoint].append((estado, latencia))
+
+    resumen = {}
+    for endpoint, datos in sorted(por_endpoint.items()):
+        latencias = [lat * 1000 for _, lat in datos]
+        estados = Counter(str(estado) for estado, _ in datos)
+        # Un 400 es una respuesta de negocio; error es 5xx, 429 o sin
+        # respuesta (estado 0)
+        errores = sum(
+            n for estado, n in estados.items()
+            if estado == "0" or estado == "429" or estado.startswith("5"))
+        resumen[endpoint] = {
+            "solicitudes": len(datos),
+            "rps": round(len(datos) / duracion, 1),
+            "p50_ms": round(percentil(latencias, 50), 2),
+            "p95_ms": round(percentil(latencias, 95), 2),
+            "p99_ms": round(percentil(latencias, 99), 2),
+            "tasa_errores": round(errores / len(datos), 4),
+            "estados": dict(estados),
+        }
+    return resumen
+
+
+async def _correr_en_proceso(solicitudes, concurrencia):
+    # Se importa acá: la app lee la configuración de la base al usarse
+    from api import app_fastapi
+
+    cola = asyncio.Queue()
+    for solicitud in solicitudes:
+        cola.put_nowait(solicitud)
+    mediciones = []
+
+    transporte = httpx.ASGITransport(app=app_fastapi.app)
+    async with httpx.AsyncClient(
+            transport=transporte, base_url="http://carga") as client:
+
+        async def trabajador():
+            while not cola.empty():
+                endpoint, payload = cola.get_nowait()
+                inicio = time.perf_counter()
+                resp = await client.post(endpoint, json=payload)
+                mediciones.append((
+                    endpoint, resp.status_code,
+                    time.perf_counter() - inicio))
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+        duracion = time.perf_counter() - inicio
+
+    return mediciones, duracion
+
+
+def correr_en_proceso(ruta_db, solicitudes, concurrencia, en_memoria=False):
+    from api import ejecutor_db
+    from data.cache_cupos import cache_cupos
+    from data.catalogo import recargar_catalogo
+    from data.conexion import configurar_base_datos
+    from data.repositorio import RepositorioMemoria, configurar_repositorio
+
+    configurar_base_datos(ruta_db)
+    cache_cupos.limpiar()
+    recargar_catalogo()
+    if en_memoria:
+        conn = sqlite3.connect(ruta_db)
+        configurar_repositorio(RepositorioMemoria.desde_base(conn))
+        conn.close()
+    try:
+        mediciones, duracion = asyncio.run(
+            _correr_en_proceso(solicitudes, concurrencia))
+    finally:
+        configurar_repositorio(None)
+        configurar_base_datos()
+        ejecutor_db.cerrar_ejecutores()
+    return resumir(mediciones, duracion)
+
+
+def _trabajador_http(url_base, solicitudes):
+    # Corre en otro proceso: un cliente con conexión persistente
+    mediciones = []
+    with httpx.Client(base_url=url_base, timeout=30) as client:
+        for endpoint, payload in solicitudes:
+            inicio = time.perf_counter()
+            try:
+                estado = client.post(endpoint, json=payload).status_code
+            except httpx.HTTPError:
+                estado = 0
+            mediciones.append(
+                (endpoint, estado, time.perf_counter() - inicio))
+    return mediciones
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(url_base, proceso, espera_maxima=20):
+    limite = time.monotonic() + espera_maxima
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó al iniciar")
+        try:
+            httpx.get(url_base + "/cupos/cache", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def correr_fuera_de_proceso(ruta_db, solicitudes, trabajadores):
+    puerto = _puerto_libre()
+    url_base = f"http://127.0.0.1:{puerto}"
+    entorno = dict(os.environ, PARQUE_DB_RUTA=ruta_db)
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app_fastapi:app",
+         "--port", str(puerto), "--log-level", "warning"],
+        env=entorno)
+    try:
+        _esperar_servidor(url_base, servidor)
+        partes = [solicitudes[i::trabajadores] for i in range(trabajadores)]
+        with multiprocessing.Pool(trabajadores) as procesos:
+            inicio = time.perf_counter()
+            resultados = procesos.starmap(
+                _trabajador_http, [(url_base, parte) for parte in partes])
+            duracion = time.perf_counter() - inicio
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=10)
+
+    return resumir(list(itertools.chain.from_iterable(resultados)), duracion)
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--actividades", type=int, default=4)
+    parser.add_argument("--horarios", type=int, default=19)
+    parser.add_argument(
+        "--cupos", type=int, default=10 ** 6,
+        help="cupos iniciales de cada turno")
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument(
+        "--proporcion-escrituras", type=float, default=0.2,
+        help="fracción de solicitudes que son /inscribir")
+    parser.add_argument(
+        "--concurrencia", type=int, default=32,
+        help="tareas concurrentes del cliente en proceso")
+    parser.add_argument(
+        "--trabajadores", type=int, default=8,
+        help="procesos cliente fuera de proceso")
+    parser.add_argument(
+        "--modos", nargs="+", default=[MODO_EN_PROCESO, MODO_FUERA_DE_PROCESO],
+        choices=[MODO_EN_PROCESO, MODO_FUERA_DE_PROCESO, MODO_MEMORIA])
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="resultados_carga.json")
+    args = parser.parse_args()
+
+    if args.dias < 2:
+        parser.error("--dias debe ser al menos 2 para poder inscribir")
+
+    resultados = {
+        "commit": _commit_actual(),
+        "fecha": datetime.datetime.now().isoformat(" ", "seconds"),
+        "escala": {
+            "dias": args.dias,
+            "actividades": args.actividades,
+            "horarios": args.horarios,
+            "cupos": args.cupos,
+            "solicitudes": args.solicitudes,
+            "proporcion_escrituras": args.proporcion_escrituras,
+        },
+        "modos": {},
+    }
+
+    for numero, modo in enumerate(args.modos):
+        # Cada modo empieza con una base recién sembrada
+        directorio = tempfile.mkdtemp()
+        try:
+            ruta_db = os.path.join(directorio, "parque.db")
+            turnos = sembrar_base(
+                ruta_db, args.dias, args.actividades, args.horarios,
+                args.cupos)
+            solicitudes = armar_solicitudes(
+                turnos, args.solicitudes, args.proporcion_escrituras,
+                args.semilla, primer_dni=numero * args.solicitudes + 1)
+
+            if modo in (MODO_EN_PROCESO, MODO_MEMORIA):
+                resumen = correr_en_proceso(
+                    ruta_db, solicitudes, args.concurrencia,
+                    en_memoria=modo == MODO_MEMORIA)
+            else:
+                resumen = correr_fuera_de_proceso(
+                    ruta_db, solicitudes, args.trabajadores)
+            resultados["modos"][modo] = resumen
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2)
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
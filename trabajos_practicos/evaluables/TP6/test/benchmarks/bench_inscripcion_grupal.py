@@ -0,0 +1,130 @@
+"""
+Micro-benchmark de inscripción grupal para grupos de 1 a 200 personas.
+
+Para cada tamaño de grupo mide, contra una copia temporal de parque.db:
+- inscribir_actividad completo (validación + UPDATE + INSERT + commit),
+- la inserción con un INSERT por persona (como se hacía antes),
+- la inserción con un único executemany.
+
+Uso (desde la raíz del TP):
+    python -m test.benchmarks.bench_inscripcion_grupal --repeticiones 20
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+from data.conexion import configurar_base_datos
+from src.inscripcion_actividad import inscribir_actividad
+
+RUTA_DB_ORIGINAL = os.path.join("data", "parque.db")
+FECHA_ACTIVIDAD = "18-10-2025"
+FECHA_ACTIVIDAD_DB = "2025-10-18"  # formato en que se guarda
+AHORA_SIMULADO = datetime.datetime(2025, 10, 17, 12, 0, 0)
+ID_SAFARI = 3
+ID_HORARIO_16 = 15
+
+SQL_INSERT = """
+INSERT INTO INSCRIPCIONES
+(id_actividad, id_horario, fecha, dni, id_talla, nombre_visitante)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def preparar_base(directorio):
+    ruta = os.path.join(directorio, "parque.db")
+    shutil.copy(RUTA_DB_ORIGINAL, ruta)
+    conn = sqlite3.connect(ruta)
+    conn.execute(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS "
+        "(id_actividad, id_horario, fecha, cupos_disponibles) "
+        "VALUES (?, ?, ?, ?)",
+        (ID_SAFARI, ID_HORARIO_16, FECHA_ACTIVIDAD_DB, 10 ** 9))
+    conn.commit()
+    conn.close()
+    return ruta
+
+
+def medir_insercion(ruta, filas, por_fila, repeticiones):
+    # Inserta el grupo dentro de una transacción que luego se descarta
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        if por_fila:
+            for fila in filas:
+                conn.execute(SQL_INSERT, fila)
+        else:
+            conn.executemany(SQL_INSERT, filas)
+        tiempos.append(time.perf_counter() - inicio)
+        conn.execute("ROLLBACK")
+    conn.close()
+    return statistics.median(tiempos) * 1000
+
+
+def medir_inscribir(tamanio, dnis, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        personas = [
+            {"dni": next(dnis), "nombre": "Visitante", "edad": 30}
+            for _ in range(tamanio)
+        ]
+        inicio = time.perf_counter()
+        inscribir_actividad(
+            "Safari", FECHA_ACTIVIDAD, "16:00", personas, True)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument(
+        "--tamanios", type=int, nargs="+",
+        default=[1, 2, 5, 10, 20, 40, 80, 120, 160, 200])
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    resultados = []
+    try:
+        ruta = preparar_base(directorio)
+        configurar_base_datos(ruta)
+        dnis = itertools.count(1)
+
+        with mock.patch("src.inscripcion_actividad.datetime") as mock_dt:
+            mock_dt.datetime.now.return_value = AHORA_SIMULADO
+            mock_dt.datetime.side_effect = datetime.datetime
+
+            for tamanio in args.tamanios:
+                filas = [
+                    (ID_SAFARI, ID_HORARIO_16, FECHA_ACTIVIDAD_DB,
+                     10 ** 8 + i, None, "Visitante")
+                    for i in range(tamanio)
+                ]
+                resultados.append({
+                    "tamanio_grupo": tamanio,
+                    "inscribir_actividad_ms": round(
+                        medir_inscribir(tamanio, dnis, args.repeticiones),
+                        3),
+                    "insert_por_fila_ms": round(medir_insercion(
+                        ruta, filas, True, args.repeticiones), 3),
+                    "executemany_ms": round(medir_insercion(
+                        ruta, filas, False, args.repeticiones), 3),
+                })
+    finally:
+        configurar_base_datos()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark de carga: compara el modo de ejecución "threadpool" (pool por
+defecto de Starlette, como los endpoints sincrónicos) con el modo
+"dedicado" (pools acotados de lectura y escritura).
+
+Se lanza una ráfaga de escrituras lentas (inscribir_actividad con una
+demora artificial) junto con consultas de cupos reales contra una copia
+temporal de parque.db, y se informa la latencia de las lecturas.
+
+Uso (desde la raíz del TP):
+    python -m test.benchmarks.bench_modos_api --escrituras 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from collections import Counter
+from unittest import mock
+
+import httpx
+
+from api import app_fastapi, ejecutor_db
+from data.cache_cupos import cache_cupos
+from data.conexion import configurar_base_datos
+
+RUTA_DB_ORIGINAL = os.path.join("data", "parque.db")
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * len(ordenados))))
+    return ordenados[indice]
+
+
+async def correr_escenario(modo, escrituras, lecturas, demora_escritura):
+    ejecutor_db.configurar_ejecutores(modo)
+
+    def inscripcion_lenta(*args):
+        time.sleep(demora_escritura)
+
+    payload_inscripcion = {
+        "actividad": "Safari",
+        "fecha_actividad": "22-10-2025",
+        "horario_actividad": "10:00",
+        "personas": [{"dni": 1, "nombre": "Visitante", "edad": 30}],
+        "acepta_terminos_condiciones": True,
+    }
+    payload_cupos = {
+        "actividad": "Safari",
+        "fecha_actividad": "22-10-2025",
+        "horario_actividad": "10:00",
+    }
+
+    transporte = httpx.ASGITransport(app=app_fastapi.app)
+    async with httpx.AsyncClient(
+            transport=transporte, base_url="http://bench") as client:
+
+        async def escribir():
+            resp = await client.post("/inscribir", json=payload_inscripcion)
+            return resp.status_code
+
+        async def leer():
+            inicio = time.perf_counter()
+            resp = await client.post("/cupos", json=payload_cupos)
+            return resp.status_code, time.perf_counter() - inicio
+
+        with mock.patch.object(
+                app_fastapi, "inscribir_actividad", inscripcion_lenta):
+            inicio = time.perf_counter()
+            tareas_escritura = [
+                asyncio.ensure_future(escribir()) for _ in range(escrituras)]
+            # Las lecturas llegan cuando la ráfaga de escrituras ya entró
+            await asyncio.sleep(0.01)
+            resultados_lectura = await asyncio.gather(
+                *(leer() for _ in range(lecturas)))
+            estados_escritura = await asyncio.gather(*tareas_escritura)
+            duracion = time.perf_counter() - inicio
+
+    latencias = [lat * 1000 for _, lat in resultados_lectura]
+    return {
+        "modo": modo,
+        "duracion_s": round(duracion, 3),
+        "lecturas": {
+            "estados": dict(Counter(e for e, _ in resultados_lectura)),
+            "p50_ms": round(statistics.median(latencias), 2),
+            "p95_ms": round(percentil(latencias, 95), 2),
+            "p99_ms": round(percentil(latencias, 99), 2),
+            "max_ms": round(max(latencias), 2),
+        },
+        "escrituras": {
+            "estados": dict(Counter(estados_escritura)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--escrituras", type=int, default=200)
+    parser.add_argument("--lecturas", type=int, default=200)
+    parser.add_argument(
+        "--demora-escritura", type=float, default=0.2,
+        help="segundos que tarda cada escritura simulada")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, "parque.db")
+        shutil.copy(RUTA_DB_ORIGINAL, ruta)
+        configurar_base_datos(ruta)
+        # Sin caché, para que cada lectura llegue a SQLite
+        cache_cupos.ttl_segundos = 0
+
+        resultados = [
+            asyncio.run(correr_escenario(
+                modo, args.escrituras, args.lecturas,
+                args.demora_escritura))
+            for modo in (ejecutor_db.MODO_THREADPOOL,
+                         ejecutor_db.MODO_DEDICADO)
+        ]
+    finally:
+        configurar_base_datos()
+        ejecutor_db.cerrar_ejecutores()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark de los reportes con una base de 1M de inscripciones.
+
+Se crea una base temporal con las migraciones, se siembran turnos para
+`--dias` días desde hoy y se reparten `--inscripciones` entre ellos (las
+inserciones pasan por los triggers que mantienen RESUMEN_TURNOS y
+DEMANDA_TALLAS). Después se mide, para rangos de 1, 7 y 31 días:
+- reporte_ocupacion y reporte_demanda_tallas (leen los resúmenes);
+- la misma agregación calculada sobre INSCRIPCIONES con GROUP BY, como
+  habría que hacerlo sin los resúmenes.
+También se informa cuánto agregan los triggers a la inserción de un grupo.
+
+Uso (desde la raíz del TP):
+    python -m test.benchmarks.bench_reportes
+    python -m test.benchmarks.bench_reportes --inscripciones 100000
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from data.catalogo import recargar_catalogo
+from data.conexion import cerrar_pool, configurar_base_datos
+from data.fechas import fecha_a_api
+from data.migrador import crear_base
+from src.reportes import reporte_demanda_tallas, reporte_ocupacion
+
+# Agregaciones equivalentes a los reportes, calculadas sin los resúmenes
+SQL_OCUPACION_SIN_RESUMEN = """
+SELECT t.fecha, t.id_actividad, t.id_horario, t.cupos_disponibles,
+       COUNT(i.dni)
+FROM ACTIVIDADES_X_HORARIOS AS t
+LEFT JOIN INSCRIPCIONES AS i
+  ON i.id_actividad = t.id_actividad AND i.id_horario = t.id_horario
+ AND i.fecha = t.fecha
+WHERE t.fecha BETWEEN ? AND ?
+GROUP BY t.fecha, t.id_actividad, t.id_horario
+"""
+
+SQL_TALLAS_SIN_RESUMEN = """
+SELECT fecha, id_actividad, id_talla, COUNT(*) FROM INSCRIPCIONES
+WHERE fecha BETWEEN ? AND ? AND id_talla IS NOT NULL
+GROUP BY fecha, id_actividad, id_talla
+"""
+
+SQL_INSERTAR = """
+INSERT INTO INSCRIPCIONES
+(id_actividad, id_horario, fecha, dni, id_talla, nombre_visitante)
+VALUES (?, ?, ?, ?, ?, 'Visitante')
+"""
+
+TRIGGERS = (
+    "trg_inscripcion_alta_turno",
+    "trg_inscripcion_alta_talla",
+)
+
+
+def sembrar(ruta, dias, inscripciones, desde):
+    """
+    Crea la base con un turno por día, actividad y horario y reparte las
+    inscripciones entre los turnos. Devuelve (turnos, segundos de carga).
+    """
+    conn = crear_base(ruta)
+    try:
+        actividades = [
+            (id_actividad, bool(vestimenta))
+            for id_actividad, vestimenta in conn.execute(
+                "SELECT id, vestimenta FROM ACTIVIDADES")]
+        horarios = [h for h, in conn.execute("SELECT id FROM HORARIOS")]
+        fechas = [
+            (desde + datetime.timedelta(days=d)).isoformat()
+            for d in range(dias)]
+        turnos = list(itertools.product(fechas, actividades, horarios))
+        por_turno = -(-inscripciones // len(turnos))  # redondeo hacia arriba
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT INTO ACTIVIDADES_X_HORARIOS "
+            "(id_actividad, id_horario, fecha, cupos_disponibles) "
+            "VALUES (?, ?, ?, ?)",
+            ((ida, idh, fecha, por_turno)
+             for fecha, (ida, _), idh in turnos))
+        conn.execute("COMMIT")
+
+        filas = (
+            (ida, idh, fecha, dni, 1 + dni % 5 if talle else None)
+            for fecha, (ida, talle), idh in turnos
+            for dni in range(por_turno)
+        )
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            SQL_INSERTAR, itertools.islice(filas, inscripciones))
+        conn.execute(
+            "UPDATE ACTIVIDADES_X_HORARIOS SET cupos_disponibles = "
+            "cupos_disponibles - COALESCE((SELECT inscriptos FROM "
+            "RESUMEN_TURNOS AS r WHERE r.fecha = ACTIVIDADES_X_HORARIOS.fecha"
+            " AND r.id_actividad = ACTIVIDADES_X_HORARIOS.id_actividad"
+            " AND r.id_horario = ACTIVIDADES_X_HORARIOS.id_horario), 0)")
+        conn.execute("COMMIT")
+        carga = time.perf_counter() - inicio
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return len(turnos), carga
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000, len(resultado)
+
+
+def medir_insercion_grupo(ruta, desde, repeticiones, con_triggers):
+    """
+    Inserta un grupo de 4 personas en una transacción que se descarta,
+    con o sin los triggers de los resúmenes.
+    """
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    fecha = desde.isoformat()
+    grupo = [(1, 1, fecha, 10 ** 9 + i, 3) for i in range(4)]
+    tiempos = []
+    try:
+        for _ in range(repeticiones):
+            conn.execute("BEGIN IMMEDIATE")
+            if not con_triggers:
+                for trigger in TRIGGERS:
+                    conn.execute(f"DROP TRIGGER {trigger}")
+            inicio = time.perf_counter()
+            conn.executemany(SQL_INSERTAR, grupo)
+            tiempos.append(time.perf_counter() - inicio)
+            conn.execute("ROLLBACK")
+    finally:
+        conn.close()
+    return statistics.median(tiempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--inscripciones", type=int, default=1_000_000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    desde = datetime.date.today()
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, "parque.db")
+    resultados = {"inscripciones": args.inscripciones, "rangos": []}
+    try:
+        turnos, carga = sembrar(ruta, args.dias, args.inscripciones, desde)
+        resultados.update(
+            turnos=turnos, carga_con_triggers_s=round(carga, 2))
+
+        configurar_base_datos(ruta)
+        recargar_catalogo()
+        conn = sqlite3.connect(ruta)
+        try:
+            for dias in (1, 7, 31):
+                fecha_desde = fecha_a_api(desde)
+                fecha_hasta = fecha_a_api(
+                    desde + datetime.timedelta(days=dias - 1))
+                rango_db = (desde.isoformat(), (
+                    desde + datetime.timedelta(days=dias - 1)).isoformat())
+
+                ocupacion_ms, filas = medir(
+                    lambda: reporte_ocupacion(fecha_desde, fecha_hasta),
+                    args.repeticiones)
+                tallas_ms, _ = medir(
+                    lambda: reporte_demanda_tallas(fecha_desde, fecha_hasta),
+                    args.repeticiones)
+                ocupacion_sin_ms, _ = medir(
+                    lambda: conn.execute(
+                        SQL_OCUPACION_SIN_RESUMEN, rango_db).fetchall(),
+                    max(1, args.repeticiones // 4))
+                tallas_sin_ms, _ = medir(
+                    lambda: conn.execute(
+                        SQL_TALLAS_SIN_RESUMEN, rango_db).fetchall(),
+                    max(1, args.repeticiones // 4))
+
+                resultados["rangos"].append({
+                    "dias": dias,
+                    "turnos": filas,
+                    "reporte_ocupacion_ms": round(ocupacion_ms, 3),
+                    "ocupacion_sin_resumen_ms": round(ocupacion_sin_ms, 3),
+                    "reporte_tallas_ms": round(tallas_ms, 3),
+                    "tallas_sin_resumen_ms": round(tallas_sin_ms, 3),
+                })
+        finally:
+            conn.close()
+        cerrar_pool()
+
+        resultados["insertar_grupo_ms"] = {
+            "con_triggers": round(medir_insercion_grupo(
+                ruta, desde, args.repeticiones, True), 4),
+            "sin_triggers": round(medir_insercion_grupo(
+                ruta, desde, args.repeticiones, False), 4),
+        }
+    finally:
+        configurar_base_datos()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
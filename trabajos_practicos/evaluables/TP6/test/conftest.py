@@ -0,0 +1,94 @@
+import pytest
+
+from api.idempotencia import registro_idempotencia
+from data import metricas
+from data.cache_cupos import cache_cupos, versiones_cupos
+from data.catalogo import Catalogo, establecer_catalogo
+from data.conexion import cerrar_pool, configurar_base_datos
+from data.migrador import crear_base
+from data.repositorio import configurar_repositorio
+from src.eventos import canal_cupos
+from src.reservas import vencimientos
+from test.bases import (
+    CUPOS_TURNO_PRUEBA,
+    TURNO_PRUEBA,
+    agregar_turnos,
+    clonar_base,
+    fijar_ahora,
+)
+
+# Mismo contenido que las tablas de referencia de data/parque.db
+CATALOGO_PRUEBA = Catalogo.desde_filas(
+    actividades=[(1, "Palestra"), (2, "Tirolesa"), (3, "Safari"),
+                 (4, "Jardineria")],
+    horarios=[
+        (i + 1, f"{9 + i // 2:02d}:{30 * (i % 2):02d}") for i in range(19)
+    ],
+    tallas=[(1, "XS"), (2, "S"), (3, "M"), (4, "L"), (5, "XL"), (6, "XXL")],
+)
+
+
+@pytest.fixture(autouse=True)
+def estado_compartido_limpio():
+    # Cada test arranca sin conexiones ni cupos en caché de un test
+    # anterior (los tests que mockean sqlite3.connect esperan una conexión
+    # nueva) y con el catálogo ya cargado.
+    cerrar_pool()
+    configurar_repositorio(None)
+    cache_cupos.limpiar()
+    versiones_cupos.limpiar()
+    metricas.limpiar()
+    registro_idempotencia.limpiar()
+    vencimientos.limpiar()
+    establecer_catalogo(CATALOGO_PRUEBA)
+    yield
+    cerrar_pool()
+    configurar_repositorio(None)
+    cache_cupos.limpiar()
+    canal_cupos.limpiar()
+    establecer_catalogo(None)
+
+
+@pytest.fixture(scope="session")
+def base_plantilla():
+    # Base en memoria con todas las migraciones, armada una sola vez por
+    # sesión (y por proceso de pytest-xdist)
+    conn = crear_base()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def conn_prueba(base_plantilla):
+    # Copia de la plantilla en memoria, para probar SQL directamente
+    conn = clonar_base(base_plantilla, ":memory:")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def base_prueba(base_plantilla, tmp_path):
+    """
+    Copia de la plantilla en un archivo propio del test, configurada como
+    la base de la aplicación. Es un archivo y no :memory: porque el pool
+    abre varias conexiones a la misma base.
+    """
+    ruta = tmp_path / "parque.db"
+    clonar_base(base_plantilla, str(ruta)).close()
+    configurar_base_datos(str(ruta))
+    yield ruta
+    configurar_base_datos()
+
+
+@pytest.fixture
+def ahora_fijo(mocker):
+    # Las validaciones de fecha usan AHORA_PRUEBA como momento actual
+    return fijar_ahora(mocker, "src.inscripcion_actividad")
+
+
+@pytest.fixture
+def base_temporal(base_prueba, ahora_fijo):
+    # Un horario de Safari a las 16:00 con CUPOS_TURNO_PRUEBA cupos. Los
+    # tests que necesitan otro reloj o más turnos la redefinen.
+    agregar_turnos(base_prueba, [(*TURNO_PRUEBA, CUPOS_TURNO_PRUEBA)])
+    return base_prueba
@@ -0,0 +1,295 @@
+import datetime
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from data.cache_cupos import (
+    NO_ENCONTRADO,
+    CacheLRU,
+    cache_cupos,
+    versiones_cupos
+)
+from data.repositorio import RepositorioSQLite
+from src import eventos
+from src.inscripcion_actividad import (
+    inscribir_actividad,
+    mostrar_cupos_para_fecha_hora_actividad
+)
+from test.bases import FECHA_PRUEBA, FECHA_PRUEBA_DB, agregar_turnos
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_cache_vencimiento_por_ttl_pasa():
+    reloj = RelojFalso()
+    cache = CacheLRU(capacidad=10, ttl_segundos=5, reloj=reloj)
+
+    cache.guardar("clave", 1)
+    reloj.ahora = 4.9
+    assert cache.obtener("clave") == 1
+
+    reloj.ahora = 5.0
+    assert cache.obtener("clave") is NO_ENCONTRADO
+    assert cache.estadisticas()["entradas"] == 0
+
+
+def test_cache_desaloja_la_menos_usada_pasa():
+    cache = CacheLRU(capacidad=2, ttl_segundos=60)
+
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obtener("a")  # "b" pasa a ser la menos usada
+    cache.guardar("c", 3)
+
+    assert cache.obtener("b") is NO_ENCONTRADO
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas["aciertos"] == 3
+    assert estadisticas["fallos"] == 1
+    assert estadisticas["desalojos"] == 1
+
+
+def test_cache_lectura_anterior_a_una_escritura_no_se_guarda_falla():
+    cache = CacheLRU(capacidad=2, ttl_segundos=60)
+    generacion = cache.generacion()
+
+    cache.guardar("a", 5)  # escritura luego de tomar la generación
+    cache.invalidar("b")
+
+    assert not cache.guardar("a", 8, generacion)
+    assert not cache.guardar("b", 8, generacion)
+    assert cache.obtener("a") == 5
+    assert cache.obtener("b") is NO_ENCONTRADO
+    #  Una clave que no se modificó se guarda igual
+    assert cache.guardar("c", 8, generacion)
+
+    #  Al olvidar modificaciones viejas, las lecturas anteriores a ellas
+    #  se descartan aunque sean de otra clave
+    cache.guardar("d", 1)
+    assert not cache.guardar("a", 8, generacion)
+    assert cache.guardar("a", 8, cache.generacion())
+
+
+def test_cache_escritura_anterior_no_pisa_la_posterior_falla():
+    cache = CacheLRU(capacidad=2, ttl_segundos=60)
+
+    cache.guardar("a", 8, orden=2)
+    assert not cache.guardar("a", 9, orden=1)
+    assert cache.obtener("a") == 8
+
+    #  Una invalidación posterior tampoco se deshace
+    cache.invalidar("a", orden=3)
+    assert not cache.guardar("a", 7, orden=2)
+    assert cache.obtener("a") is NO_ENCONTRADO
+
+    #  Si se olvidó la última escritura de la clave, en la duda se
+    #  invalida
+    cache.guardar("a", 6, orden=4)
+    cache.guardar("b", 1, orden=5)
+    cache.guardar("c", 1, orden=6)
+    assert not cache.guardar("a", 5, orden=3)
+    assert cache.obtener("a") is NO_ENCONTRADO
+
+
+def test_mostrar_cupos_segunda_consulta_desde_cache_pasa(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_conn.return_value.execute.return_value.fetchone.return_value = (8,)
+
+    for _ in range(3):
+        cupos = mostrar_cupos_para_fecha_hora_actividad(
+            "Safari", "22-10-2025", "10:00")
+        assert cupos == (8,)
+
+    #  Solo la primera consulta llega a la base
+    consultas = [c for c in mock_conn.return_value.execute.call_args_list
+                 if "SELECT" in str(c)]
+    assert len(consultas) == 1
+    assert cache_cupos.estadisticas()["aciertos"] == 2
+
+
+def test_inscribir_actividad_actualiza_cache_pasa(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+    mock_cursor.fetchone.side_effect = [(8,)]
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    cache_cupos.guardar(("Safari", "18-10-2025", "16:00"), (8,))
+
+    inscribir_actividad(
+        "Safari", "18-10-2025", "16:00",
+        [
+            {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+            {"dni": 100001, "nombre": "Maria Perez", "edad": 20},
+        ],
+        True)
+
+    assert cache_cupos.obtener(("Safari", "18-10-2025", "16:00")) == (6,)
+
+
+def test_inscribir_actividad_fallida_no_modifica_cache_falla(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+    mock_cursor.fetchone.side_effect = [(1,)]
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    cache_cupos.guardar(("Safari", "18-10-2025", "16:00"), (1,))
+
+    try:
+        inscribir_actividad(
+            "Safari", "18-10-2025", "16:00",
+            [
+                {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+                {"dni": 100001, "nombre": "Maria Perez", "edad": 20},
+            ],
+            True)
+        assert False, "Debería lanzar un ValueError por falta de cupos"
+    except ValueError:
+        pass
+
+    assert cache_cupos.obtener(("Safari", "18-10-2025", "16:00")) == (1,)
+
+
+# --- GET /cupos CON ETAG ---
+
+
+@pytest.fixture
+def cliente(base_prueba, ahora_fijo):
+    # Safari a las 11:30 y a las 16:00, con 5 cupos cada uno
+    agregar_turnos(base_prueba, [
+        (3, 6, FECHA_PRUEBA_DB, 5), (3, 15, FECHA_PRUEBA_DB, 5)])
+    return TestClient(app)
+
+
+def test_get_cupos_devuelve_etag_y_cache_control_pasa(cliente):
+    resp = cliente.get("/cupos", params={
+        "fecha_actividad": FECHA_PRUEBA, "actividad": "Safari",
+        "horario_actividad": "16:00"})
+
+    assert resp.status_code == 200
+    assert resp.json()["grilla"] == [{
+        "actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+        "horario_actividad": "16:00", "cupos": 5}]
+    assert resp.headers["etag"] == versiones_cupos.etag(FECHA_PRUEBA)
+    assert resp.headers["cache-control"] == "public, no-cache"
+
+
+def test_get_cupos_sin_cambios_responde_304_pasa(cliente, mocker):
+    params = {"fecha_actividad": FECHA_PRUEBA}
+    etag = cliente.get("/cupos", params=params).headers["etag"]
+    grilla = mocker.patch("api.app_fastapi.mostrar_grilla_cupos")
+
+    resp = cliente.get(
+        "/cupos", params=params, headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    #  La revalidación no consulta la base
+    grilla.assert_not_called()
+
+
+def test_get_cupos_luego_de_inscribir_cambia_etag_falla(cliente):
+    params = {"fecha_actividad": FECHA_PRUEBA, "actividad": "Safari"}
+    etag = cliente.get("/cupos", params=params).headers["etag"]
+
+    inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18}], True)
+    resp = cliente.get(
+        "/cupos", params=params, headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert [item["cupos"] for item in resp.json()["grilla"]] == [5, 4]
+
+
+def test_get_cupos_fecha_invalida_falla(cliente):
+    resp = cliente.get("/cupos", params={"fecha_actividad": "2025-10-18"})
+
+    assert resp.status_code == 422
+
+
+def test_lectura_concurrente_con_inscripcion_no_deja_cupos_viejos_falla(
+        base_prueba, ahora_fijo, mocker):
+    agregar_turnos(base_prueba, [(3, 15, FECHA_PRUEBA_DB, 5)])
+    clave = ("Safari", FECHA_PRUEBA, "16:00")
+    leyo = threading.Event()
+    continuar = threading.Event()
+    consultar_cupos = RepositorioSQLite.consultar_cupos
+
+    def consultar_y_esperar(repositorio, clave_db):
+        cupos = consultar_cupos(repositorio, clave_db)
+        leyo.set()
+        continuar.wait(5)
+        return cupos
+
+    mocker.patch.object(
+        RepositorioSQLite, "consultar_cupos", consultar_y_esperar)
+    resultado = []
+    lectura = threading.Thread(target=lambda: resultado.append(
+        mostrar_cupos_para_fecha_hora_actividad(*clave)))
+
+    # La lectura ve 5 cupos, la inscripción termina y recién después la
+    # lectura intenta guardar lo que leyó
+    lectura.start()
+    assert leyo.wait(5)
+    inscribir_actividad(*clave, [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18}], True)
+    continuar.set()
+    lectura.join()
+
+    assert resultado == [(5,)]
+    assert cache_cupos.obtener(clave) == (4,)
+
+
+def test_inscripciones_que_avisan_en_otro_orden_no_dejan_cupos_viejos_falla(
+        base_prueba, ahora_fijo, mocker):
+    agregar_turnos(base_prueba, [(3, 15, FECHA_PRUEBA_DB, 5)])
+    clave = ("Safari", FECHA_PRUEBA, "16:00")
+    avisando = threading.Event()
+    continuar = threading.Event()
+    turno_modificado = eventos.turno_modificado
+
+    def avisar(clave_turno, cupos=None):
+        # El primer aviso se demora hasta que termina la otra inscripción
+        if not avisando.is_set():
+            avisando.set()
+            continuar.wait(5)
+        turno_modificado(clave_turno, cupos)
+
+    mocker.patch("src.inscripcion_actividad.turno_modificado", avisar)
+    primera = threading.Thread(target=inscribir_actividad, args=(
+        *clave, [{"dni": 1, "nombre": "Ana", "edad": 30}], True))
+
+    primera.start()
+    assert avisando.wait(5)
+    inscribir_actividad(
+        *clave, [{"dni": 2, "nombre": "Beto", "edad": 30}], True)
+    continuar.set()
+    primera.join()
+
+    #  5 - 2: el aviso tardío de la primera (4) se descarta
+    assert cache_cupos.obtener(clave) == (3,)
@@ -0,0 +1,134 @@
+import datetime
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from src.cancelaciones import cancelar_inscripciones, cancelar_turno
+from src.inscripcion_actividad import inscribir_actividad
+from src.lista_espera import anotar_en_lista_espera, consultar_lista_espera
+from test.bases import (
+    CUPOS_TURNO_PRUEBA as CUPOS_HORARIO,
+    FECHA_PRUEBA as FECHA_ACTIVIDAD,
+    cupos_disponibles,
+    dnis_inscriptos,
+    fijar_ahora,
+)
+
+
+@pytest.fixture
+def base_temporal(base_temporal, mocker):
+    fijar_ahora(mocker, "src.cancelaciones")
+    return base_temporal
+
+
+def _estado(ruta):
+    return cupos_disponibles(ruta), dnis_inscriptos(ruta)
+
+
+def _inscribir(*dnis):
+    inscribir_actividad(
+        "Safari", FECHA_ACTIVIDAD, "16:00",
+        [{"dni": dni, "nombre": f"Visitante {dni}", "edad": 30}
+         for dni in dnis],
+        True)
+
+
+def _cancelar(*dnis):
+    return cancelar_inscripciones(
+        "Safari", FECHA_ACTIVIDAD, "16:00", list(dnis))
+
+
+def test_cancelar_una_persona_devuelve_su_cupo_pasa(base_temporal):
+    _inscribir(1, 2, 3)
+
+    assert _cancelar(2) == 1
+    assert _estado(base_temporal) == (8, [1, 3])
+
+
+def test_cancelar_grupo_completo_pasa(base_temporal):
+    _inscribir(1, 2, 3)
+    _inscribir(4)
+
+    assert _cancelar(1, 2, 3) == 3
+    assert _estado(base_temporal) == (9, [4])
+
+
+def test_cancelar_grupo_con_dni_no_inscripto_falla(base_temporal):
+    _inscribir(1, 2)
+
+    with pytest.raises(ValueError):
+        _cancelar(1, 99)
+
+    #  No se cancela nadie del grupo
+    assert _estado(base_temporal) == (8, [1, 2])
+
+
+def test_cancelacion_promueve_la_lista_de_espera_pasa(base_temporal):
+    _inscribir(*range(1, CUPOS_HORARIO + 1))
+    anotado = anotar_en_lista_espera(
+        "Safari", FECHA_ACTIVIDAD, "16:00",
+        [{"dni": 50, "nombre": "Visitante 50", "edad": 30}], True)
+
+    _cancelar(1)
+
+    assert consultar_lista_espera(anotado["id"])["estado"] == "inscripto"
+    assert _estado(base_temporal)[0] == 0
+
+
+def test_cancelar_turno_completo_pasa(base_temporal):
+    _inscribir(1, 2, 3)
+    _inscribir(4, 5)
+    _inscribir(*range(6, CUPOS_HORARIO + 1))
+    anotado = anotar_en_lista_espera(
+        "Safari", FECHA_ACTIVIDAD, "16:00",
+        [{"dni": 50, "nombre": "Visitante 50", "edad": 30}], True)
+
+    assert cancelar_turno("Safari", FECHA_ACTIVIDAD, "16:00") == 10
+    assert _estado(base_temporal) == (CUPOS_HORARIO, [])
+    #  Al suspenderse el turno no se promueve a la lista de espera
+    assert consultar_lista_espera(anotado["id"])["estado"] == "cancelado"
+
+
+def test_cancelar_actividad_ya_realizada_falla(base_temporal, mocker):
+    _inscribir(1)
+    fijar_ahora(
+        mocker, "src.cancelaciones", datetime.datetime(2025, 10, 18, 17))
+
+    with pytest.raises(ValueError):
+        _cancelar(1)
+
+
+def test_endpoints_de_cancelacion_pasa(base_temporal):
+    _inscribir(1, 2, 3)
+    client = TestClient(app)
+    turno = {
+        "actividad": "Safari",
+        "fecha_actividad": FECHA_ACTIVIDAD,
+        "horario_actividad": "16:00",
+    }
+
+    resp = client.delete(
+        "/inscripciones", params={**turno, "dni": [1, 2]})
+    assert resp.status_code == 200
+    assert resp.json() == {"canceladas": 2}
+
+    resp = client.delete("/inscripciones", params={**turno, "dni": [1]})
+    assert resp.status_code == 400
+
+    resp = client.delete("/turnos/inscripciones", params=turno)
+    assert resp.json() == {"canceladas": 1}
+
+
+def test_delete_inscripciones_turno_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.cancelar_turno",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).delete("/turnos/inscripciones", params={
+        "actividad": "Safari", "fecha_actividad": FECHA_ACTIVIDAD,
+        "horario_actividad": "16:00"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
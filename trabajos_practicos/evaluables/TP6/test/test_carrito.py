@@ -0,0 +1,126 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from src.inscripcion_actividad import ErrorCarrito, inscribir_carrito
+from test.bases import (
+    FECHA_PRUEBA as FECHA_ACTIVIDAD,
+    FECHA_PRUEBA_DB as FECHA_ACTIVIDAD_DB,
+    agregar_turnos,
+    contar_filas,
+    cupos_disponibles,
+)
+
+TIROLESA = (2, 3, FECHA_ACTIVIDAD_DB)  # Tirolesa 10:00
+SAFARI = (3, 6, FECHA_ACTIVIDAD_DB)  # Safari 11:30
+
+
+@pytest.fixture
+def base_temporal(base_prueba, ahora_fijo):
+    # Tirolesa a las 10:00 con 10 cupos y Safari a las 11:30 con 2
+    agregar_turnos(base_prueba, [(*TIROLESA, 10), (*SAFARI, 2)])
+    return base_prueba
+
+
+def _cupos(ruta):
+    cupos = {
+        turno[0]: cupos_disponibles(ruta, turno)
+        for turno in (TIROLESA, SAFARI)
+    }
+    return cupos, contar_filas(ruta, "INSCRIPCIONES")
+
+
+def _familia(cantidad):
+    return [
+        {"dni": 100 + i, "nombre": f"Visitante {i}", "edad": 30,
+         "talle": "M"}
+        for i in range(cantidad)
+    ]
+
+
+def _carrito(personas_safari):
+    return [
+        {"actividad": "Tirolesa", "fecha_actividad": FECHA_ACTIVIDAD,
+         "horario_actividad": "10:00", "personas": _familia(3)},
+        {"actividad": "Safari", "fecha_actividad": FECHA_ACTIVIDAD,
+         "horario_actividad": "11:30", "personas": _familia(personas_safari)},
+    ]
+
+
+def test_inscribir_carrito_reserva_todos_los_turnos_pasa(base_temporal):
+    resultados = inscribir_carrito(_carrito(2), True)
+
+    assert [r["estado"] for r in resultados] == ["inscripto", "inscripto"]
+    assert [r["cupos_restantes"] for r in resultados] == [7, 0]
+    assert _cupos(base_temporal) == ({2: 7, 3: 0}, 5)
+
+
+def test_inscribir_carrito_sin_cupos_en_un_turno_revierte_todo_falla(
+        base_temporal):
+    with pytest.raises(ErrorCarrito) as error:
+        inscribir_carrito(_carrito(3), True)
+
+    #  La Tirolesa se había reservado y se deshace con el rollback
+    assert [r["estado"] for r in error.value.resultados] == [
+        "revertido", "rechazado"]
+    assert error.value.resultados[1]["detalle"] == (
+        "No hay cupos suficientes para inscribir a todas las personas.")
+    assert _cupos(base_temporal) == ({2: 10, 3: 2}, 0)
+
+
+def test_inscribir_carrito_informa_cada_item_invalido_falla(base_temporal):
+    carrito = _carrito(2)
+    carrito[0]["personas"][0]["edad"] = 5  # menor a la edad de Tirolesa
+    carrito[1]["horario_actividad"] = "20:00"
+
+    with pytest.raises(ErrorCarrito) as error:
+        inscribir_carrito(carrito, True)
+
+    assert [r["detalle"] for r in error.value.resultados] == [
+        "no cumple con la edad mínima",
+        "No hay horario para esa actividad: los turnos son de 09:00 a 18:00."]
+    assert _cupos(base_temporal) == ({2: 10, 3: 2}, 0)
+
+
+def test_endpoint_carrito_pasa(base_temporal):
+    client = TestClient(app)
+
+    resp = client.post("/inscribir/carrito", json={
+        "items": _carrito(2),
+        "acepta_terminos_condiciones": True,
+    })
+
+    assert resp.status_code == 201
+    assert [i["cupos_restantes"] for i in resp.json()["items"]] == [7, 0]
+    # La fecha y el horario se parsean en el modelo pero se informan en el
+    # formato de la API
+    assert resp.json()["items"][0]["fecha_actividad"] == FECHA_ACTIVIDAD
+    assert resp.json()["items"][0]["horario_actividad"] == "10:00"
+
+    resp = client.post("/inscribir/carrito", json={
+        "items": _carrito(1),
+        "acepta_terminos_condiciones": True,
+    })
+
+    assert resp.status_code == 400
+    assert [i["estado"] for i in resp.json()["detail"]["items"]] == [
+        "rechazado", "sin_procesar"]
+
+
+@pytest.mark.parametrize("campo, valor", [
+    ("fecha_actividad", "18/10/2025"),
+    ("fecha_actividad", "31-02-2025"),
+    ("horario_actividad", "10hs"),
+])
+def test_endpoint_carrito_fecha_u_horario_malformado_falla(
+        base_temporal, campo, valor):
+    carrito = _carrito(1)
+    carrito[0][campo] = valor
+
+    resp = TestClient(app).post("/inscribir/carrito", json={
+        "items": carrito,
+        "acepta_terminos_condiciones": True,
+    })
+
+    assert resp.status_code == 422
+    assert _cupos(base_temporal) == ({2: 10, 3: 2}, 0)
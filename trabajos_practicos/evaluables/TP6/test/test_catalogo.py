@@ -0,0 +1,22 @@
+import pytest
+
+from data.catalogo import obtener_catalogo, recargar_catalogo
+
+
+def test_recargar_catalogo_desde_la_base_pasa(base_prueba):
+    catalogo = recargar_catalogo()
+
+    assert catalogo.actividades["Tirolesa"] == 2
+    assert catalogo.horarios["16:00"] == 15
+    assert catalogo.tallas["XL"] == 5
+    assert catalogo.nombres_actividades[3] == "Safari"
+    assert catalogo.horas[1] == "09:00"
+    assert catalogo.nombres_tallas[5] == "XL"
+    assert obtener_catalogo() is catalogo
+
+
+def test_catalogo_inmutable_falla(base_prueba):
+    catalogo = recargar_catalogo()
+
+    with pytest.raises(TypeError):
+        catalogo.actividades["Kayak"] = 5
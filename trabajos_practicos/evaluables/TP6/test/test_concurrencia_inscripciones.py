@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import ejecutor_db
+from api.app_fastapi import app
+from test.bases import (
+    CUPOS_TURNO_PRUEBA as CUPOS_HORARIO,
+    FECHA_PRUEBA as FECHA_ACTIVIDAD,
+    contar_filas,
+    cupos_disponibles,
+)
+
+CANTIDAD_SOLICITUDES = 300
+
+
+@pytest.fixture
+def base_temporal(base_temporal):
+    # La cola de escrituras admite todas las solicitudes: este test mide
+    # sobreventa, no el rechazo por saturación.
+    ejecutor_db.configurar_ejecutores(
+        ejecutor_db.MODO_DEDICADO, cola_escritura=CANTIDAD_SOLICITUDES)
+    yield base_temporal
+    ejecutor_db.configurar_ejecutores()
+
+
+def test_inscripciones_concurrentes_mismo_horario_sin_sobreventa_pasa(
+        base_temporal):
+    client = TestClient(app)
+
+    def inscribir(dni):
+        return client.post("/inscribir", json={
+            "actividad": "Safari",
+            "fecha_actividad": FECHA_ACTIVIDAD,
+            "horario_actividad": "16:00",
+            "personas": [
+                {"dni": dni, "nombre": f"Visitante {dni}", "edad": 30}
+            ],
+            "acepta_terminos_condiciones": True,
+        }).status_code
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        estados = list(executor.map(
+            inscribir, range(1, CANTIDAD_SOLICITUDES + 1)))
+
+    # Exactamente tantas inscripciones como cupos, el resto rechazadas
+    # por falta de cupos y ningún error interno o de base bloqueada.
+    assert estados.count(201) == CUPOS_HORARIO
+    assert estados.count(400) == CANTIDAD_SOLICITUDES - CUPOS_HORARIO
+
+    assert cupos_disponibles(base_temporal) == 0
+    assert contar_filas(base_temporal, "INSCRIPCIONES") == CUPOS_HORARIO
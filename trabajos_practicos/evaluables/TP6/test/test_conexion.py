@@ -0,0 +1,119 @@
+import threading
+from sqlite3 import OperationalError
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from data.conexion import PoolConexiones, configurar_base_datos, conexion
+from test.bases import FECHA_PRUEBA, fijar_ahora
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = PoolConexiones(str(tmp_path / "pool.db"), tamanio_maximo=1)
+    yield pool
+    pool.cerrar()
+
+
+def _en_otro_hilo(funcion):
+    resultado = {}
+
+    def correr():
+        try:
+            resultado["valor"] = funcion()
+        except Exception as e:
+            resultado["error"] = e
+
+    hilo = threading.Thread(target=correr)
+    hilo.start()
+    hilo.join()
+    return resultado
+
+
+def _obtener_y_devolver(pool):
+    def funcion():
+        conn = pool.obtener()
+        pool.devolver(conn)
+        return conn
+    return funcion
+
+
+def test_pool_conexion_configurada_pasa(pool):
+    conn = pool.obtener()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA synchronous").fetchone() == (1,)  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone() == (5000,)
+    pool.devolver(conn)
+
+
+def test_pool_mismo_hilo_recibe_la_misma_conexion_pasa(pool, monkeypatch):
+    monkeypatch.setattr("data.conexion.ESPERA_POOL", 0.05)
+    externa = pool.obtener()
+    interna = pool.obtener()
+    pool.devolver(interna)
+
+    assert interna is externa
+    #  Sigue tomada: devolver la interna no la pasa a otro hilo
+    assert "error" in _en_otro_hilo(pool.obtener)
+    pool.devolver(externa)
+    assert _en_otro_hilo(_obtener_y_devolver(pool))["valor"] is externa
+
+
+def test_pool_devuelve_conexion_sin_transaccion_pasa(pool):
+    conn = pool.obtener()
+    conn.execute("CREATE TABLE prueba (valor INTEGER)")
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO prueba VALUES (1)")
+    pool.devolver(conn)
+
+    otra = _en_otro_hilo(_obtener_y_devolver(pool))["valor"]
+
+    #  Se reutiliza la misma conexión, con la transacción descartada
+    assert otra is conn
+    assert not otra.in_transaction
+    assert otra.execute("SELECT COUNT(*) FROM prueba").fetchone() == (0,)
+
+
+def test_pool_agotado_falla(pool, monkeypatch):
+    monkeypatch.setattr("data.conexion.ESPERA_POOL", 0.05)
+    conn = pool.obtener()
+
+    resultado = _en_otro_hilo(pool.obtener)
+
+    assert isinstance(resultado["error"], OperationalError)
+    assert "pool agotado" in str(resultado["error"])
+    pool.devolver(conn)
+
+
+def test_api_pool_agotado_responde_503_falla(base_prueba, mocker, monkeypatch):
+    monkeypatch.setattr("data.conexion.ESPERA_POOL", 0.05)
+    configurar_base_datos(str(base_prueba), tamanio_pool=1)
+    fijar_ahora(mocker, "src.cancelaciones")
+
+    # El test retiene la única conexión mientras la API la pide
+    with conexion():
+        resp = TestClient(app).delete("/inscripciones", params={
+            "actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+            "horario_actividad": "16:00", "dni": [1]})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+@pytest.mark.parametrize("ruta, cuerpo", [
+    ("/cupos", {"actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+                "horario_actividad": "16:00"}),
+    ("/cupos/grilla", {"fecha_desde": FECHA_PRUEBA}),
+])
+def test_lectura_con_pool_agotado_responde_503_falla(
+        base_prueba, monkeypatch, ruta, cuerpo):
+    monkeypatch.setattr("data.conexion.ESPERA_POOL", 0.05)
+    configurar_base_datos(str(base_prueba), tamanio_pool=1)
+
+    with conexion():
+        resp = TestClient(app).post(ruta, json=cuerpo)
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
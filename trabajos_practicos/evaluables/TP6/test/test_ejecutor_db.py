@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import ejecutor_db
+from api.app_fastapi import app
+from api.ejecutor_db import EjecutorAcotado, EjecutorSaturado
+
+
+@pytest.fixture
+def ejecutores_chicos():
+    # Un hilo y sin cola para cada tipo de operación
+    ejecutor_db.configurar_ejecutores(
+        ejecutor_db.MODO_DEDICADO, hilos_lectura=1, cola_lectura=0,
+        hilos_escritura=1, cola_escritura=0)
+    yield
+    ejecutor_db.configurar_ejecutores()
+
+
+def test_ejecutor_acotado_ejecuta_fuera_del_loop_pasa():
+    ejecutor = EjecutorAcotado("prueba", hilos=2, cola_maxima=0)
+
+    async def principal():
+        return await ejecutor.ejecutar(threading.current_thread)
+
+    hilo = asyncio.run(principal())
+    ejecutor.cerrar()
+
+    assert hilo.name.startswith("db-prueba")
+
+
+def test_ejecutor_acotado_saturado_falla():
+    ejecutor = EjecutorAcotado("prueba", hilos=1, cola_maxima=1)
+    liberar = threading.Event()
+
+    async def principal():
+        tareas = [
+            asyncio.ensure_future(ejecutor.ejecutar(liberar.wait))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(EjecutorSaturado):
+            await ejecutor.ejecutar(liberar.wait)
+
+        liberar.set()
+        await asyncio.gather(*tareas)
+
+        #  Al terminar las tareas se liberan los lugares
+        return await ejecutor.ejecutar(lambda: "ok")
+
+    assert asyncio.run(principal()) == "ok"
+    assert ejecutor.rechazadas == 1
+    ejecutor.cerrar()
+
+
+def test_escrituras_saturadas_no_bloquean_lecturas_pasa(
+        mocker, ejecutores_chicos):
+    liberar = threading.Event()
+    empezo = threading.Event()
+
+    def inscripcion_lenta(*args):
+        empezo.set()
+        liberar.wait()
+
+    mocker.patch("api.app_fastapi.inscribir_actividad", inscripcion_lenta)
+    mocker.patch(
+        "api.app_fastapi.mostrar_cupos_para_fecha_hora_actividad",
+        return_value=(8,))
+
+    client = TestClient(app)
+    payload = {
+        "actividad": "Safari",
+        "fecha_actividad": "18-10-2025",
+        "horario_actividad": "16:00",
+        "personas": [{"dni": 1, "nombre": "Juan Perez", "edad": 30}],
+        "acepta_terminos_condiciones": True,
+    }
+
+    #  Una inscripción lenta ocupa el único hilo de escritura
+    hilo = threading.Thread(
+        target=lambda: client.post("/inscribir", json=payload))
+    hilo.start()
+    assert empezo.wait(timeout=5)
+
+    #  La siguiente escritura se rechaza con 429
+    resp = client.post("/inscribir", json=payload)
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+
+    #  Las consultas de cupos siguen respondiendo
+    resp = client.post("/cupos", json={
+        "actividad": "Safari",
+        "fecha_actividad": "18-10-2025",
+        "horario_actividad": "16:00",
+    })
+    assert resp.status_code == 200
+    assert resp.json() == {"cupos": [8]}
+
+    liberar.set()
+    hilo.join()
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import _flujo_cupos, app
+from src.eventos import CambioCupos, CanalCupos, Suscripcion, canal_cupos
+from src.inscripcion_actividad import inscribir_actividad
+from test.bases import FECHA_PRUEBA, FECHA_PRUEBA_DB, agregar_turnos
+
+
+class RequestFalso:
+    # Solo lo que usa _flujo_cupos
+    async def is_disconnected(self):
+        return False
+
+
+def _datos(evento):
+    # "event: ...\ndata: {...}\n\n" -> (evento, datos)
+    nombre, datos = evento.strip().split("\n")
+    return nombre.removeprefix("event: "), json.loads(
+        datos.removeprefix("data: "))
+
+
+def test_canal_entrega_solo_a_suscripciones_interesadas_pasa():
+    canal = CanalCupos()
+
+    async def principal():
+        safari = canal.suscribir([FECHA_PRUEBA], ["Safari"])
+        todas = canal.suscribir([FECHA_PRUEBA])
+        otra_fecha = canal.suscribir(["19-10-2025"])
+
+        # Se publica desde otro hilo, como lo hacen las escrituras
+        for cambio in (
+                CambioCupos("Safari", FECHA_PRUEBA, "16:00", 4),
+                CambioCupos("Palestra", FECHA_PRUEBA, "10:00", 2)):
+            hilo = threading.Thread(target=canal.publicar, args=(cambio,))
+            hilo.start()
+            hilo.join()
+
+        return [
+            await suscripcion.siguientes(0.5)
+            for suscripcion in (safari, todas, otra_fecha)
+        ]
+
+    safari, todas, otra_fecha = asyncio.run(principal())
+
+    assert [c.actividad for c in safari] == ["Safari"]
+    assert [c.actividad for c in todas] == ["Safari", "Palestra"]
+    assert otra_fecha == []
+
+
+def test_canal_desuscribir_no_entrega_mas_pasa():
+    canal = CanalCupos()
+
+    async def principal():
+        suscripcion = canal.suscribir([FECHA_PRUEBA])
+        canal.desuscribir(suscripcion)
+        canal.publicar(CambioCupos("Safari", FECHA_PRUEBA, "16:00", 4))
+        return await suscripcion.siguientes(0.05)
+
+    assert asyncio.run(principal()) == []
+    assert canal.cantidad_suscripciones() == 0
+
+
+def test_suscripcion_desbordada_pide_resincronizar_falla():
+    async def principal():
+        suscripcion = Suscripcion([FECHA_PRUEBA], capacidad=2)
+        for cupos in range(3):
+            suscripcion.entregar(
+                CambioCupos("Safari", FECHA_PRUEBA, "16:00", cupos))
+        flujo = _flujo_cupos(RequestFalso(), suscripcion)
+        await flujo.__anext__()  # retry
+        evento = await flujo.__anext__()
+        await flujo.aclose()
+        return evento
+
+    assert _datos(asyncio.run(principal())) == ("resincronizar", {})
+
+
+def test_inscribir_actividad_publica_cupos_restantes_pasa(
+        base_prueba, ahora_fijo):
+    agregar_turnos(base_prueba, [(3, 15, FECHA_PRUEBA_DB, 5)])
+
+    async def principal():
+        suscripcion = canal_cupos.suscribir([FECHA_PRUEBA], ["Safari"])
+        flujo = _flujo_cupos(RequestFalso(), suscripcion)
+        await flujo.__anext__()  # retry
+
+        await asyncio.to_thread(
+            inscribir_actividad, "Safari", FECHA_PRUEBA, "16:00",
+            [{"dni": 100000, "nombre": "Juan Perez", "edad": 18}], True)
+        evento = await asyncio.wait_for(flujo.__anext__(), 1)
+        await flujo.aclose()
+        return evento
+
+    nombre, datos = _datos(asyncio.run(principal()))
+    assert nombre == "cupos"
+    #  orden: número de la transacción que hizo el cambio
+    assert isinstance(datos.pop("orden"), int)
+    assert datos == {
+        "actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+        "horario_actividad": "16:00", "cupos": 4}
+    #  Al cerrar el flujo se quita la suscripción
+    assert canal_cupos.cantidad_suscripciones() == 0
+
+
+def test_flujo_consulta_cupos_desconocidos_una_vez_pasa(
+        base_prueba, monkeypatch):
+    monkeypatch.setattr("api.app_fastapi.DURACION_FLUJO", 0.5)
+    agregar_turnos(base_prueba, [(3, 15, FECHA_PRUEBA_DB, 5)])
+
+    async def principal():
+        suscripcion = canal_cupos.suscribir([FECHA_PRUEBA])
+        flujo = _flujo_cupos(RequestFalso(), suscripcion)
+        await flujo.__anext__()  # retry
+
+        # Dos cambios del mismo turno sin el valor nuevo (por ejemplo
+        # cancelaciones) se envían como un solo evento
+        for _ in range(2):
+            canal_cupos.publicar(
+                CambioCupos("Safari", FECHA_PRUEBA, "16:00"))
+        evento = await asyncio.wait_for(flujo.__anext__(), 1)
+        #  Al cumplirse DURACION_FLUJO el flujo termina solo
+        restantes = [e async for e in flujo]
+        return evento, restantes
+
+    evento, restantes = asyncio.run(principal())
+
+    assert _datos(evento)[1]["cupos"] == 5
+    #  Solo quedan latidos
+    assert all(e.startswith(":") for e in restantes)
+
+
+def test_flujo_descarta_cambios_de_escrituras_anteriores_falla(
+        monkeypatch):
+    monkeypatch.setattr("api.app_fastapi.DURACION_FLUJO", 0.3)
+
+    async def principal():
+        suscripcion = canal_cupos.suscribir([FECHA_PRUEBA])
+        flujo = _flujo_cupos(RequestFalso(), suscripcion)
+        await flujo.__anext__()  # retry
+
+        # La escritura 2 avisa antes que la 1; la 1 llega en el mismo
+        # lote y también en uno posterior
+        for orden, cupos in ((2, 8), (1, 9)):
+            canal_cupos.publicar(
+                CambioCupos("Safari", FECHA_PRUEBA, "16:00", cupos, orden))
+        primero = await asyncio.wait_for(flujo.__anext__(), 1)
+        canal_cupos.publicar(
+            CambioCupos("Safari", FECHA_PRUEBA, "16:00", 9, 1))
+        return primero, [e async for e in flujo]
+
+    primero, restantes = asyncio.run(principal())
+
+    assert _datos(primero)[1]["cupos"] == 8
+    assert all(e.startswith(":") for e in restantes)
+
+
+def test_eventos_cupos_demasiadas_fechas_falla():
+    fechas = [f"{dia:02d}-10-2025" for dia in range(1, 9)]
+
+    resp = TestClient(app).get(
+        "/cupos/eventos", params={"fecha_actividad": fechas})
+
+    assert resp.status_code == 400
+    assert canal_cupos.cantidad_suscripciones() == 0
@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+
+from data.fechas import (
+    _parsear_fecha, fecha_a_api, fecha_a_db, fecha_desde_db, horario_a_api,
+    parsear_fecha, parsear_horario,
+)
+
+
+def test_conversion_fechas_api_y_base_pasa():
+    assert fecha_a_db("22-10-2025") == "2025-10-22"
+    assert fecha_desde_db("2025-10-22") == "22-10-2025"
+
+
+def test_fecha_api_con_formato_invalido_falla():
+    with pytest.raises(ValueError):
+        fecha_a_db("2025-10-22")
+
+
+def test_parsear_fecha_y_horario_pasa():
+    _parsear_fecha.cache_clear()
+
+    assert parsear_fecha("22-10-2025") == datetime.date(2025, 10, 22)
+    assert parsear_fecha("22-10-2025") is parsear_fecha("22-10-2025")
+    assert _parsear_fecha.cache_info().hits == 2
+    assert parsear_horario("09:30") == datetime.time(9, 30)
+    assert fecha_a_api(datetime.date(2025, 10, 2)) == "02-10-2025"
+    assert horario_a_api(datetime.time(9, 0)) == "09:00"
+
+
+@pytest.mark.parametrize("parser, valor", [
+    (parsear_fecha, "31-02-2025"),
+    (parsear_fecha, "2025-10-22"),
+    (parsear_fecha, "1-1-2025"),
+    (parsear_fecha, 20251022),
+    (parsear_horario, "9:30"),
+    (parsear_horario, "24:00"),
+    (parsear_horario, "ab:cd"),
+])
+def test_parsear_valor_invalido_falla(parser, valor):
+    with pytest.raises(ValueError, match="inválid"):
+        parser(valor)
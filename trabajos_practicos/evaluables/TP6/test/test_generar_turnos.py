@@ -0,0 +1,94 @@
+import datetime
+import time
+
+import pytest
+
+from data.generar_turnos import generar_turnos
+from data.migrador import crear_base
+from src.calendario import HORARIOS_TURNOS, motivo_cierre
+
+
+@pytest.fixture
+def conn_vacia():
+    conn = crear_base()
+    yield conn
+    conn.close()
+
+
+def _fechas(conn):
+    return {
+        fecha for fecha, in conn.execute(
+            "SELECT DISTINCT fecha FROM ACTIVIDADES_X_HORARIOS")
+    }
+
+
+def test_calendario_cierra_lunes_y_feriados_pasa():
+    assert motivo_cierre(datetime.date(2025, 12, 25)) == "en Navidad"
+    assert motivo_cierre(datetime.date(2026, 1, 1)) == "en Año Nuevo"
+    assert motivo_cierre(datetime.date(2025, 11, 3)) == "los lunes"
+    assert motivo_cierre(datetime.date(2025, 11, 4)) is None
+    assert HORARIOS_TURNOS[0] == "09:00" and HORARIOS_TURNOS[-1] == "18:00"
+    assert len(HORARIOS_TURNOS) == 19
+
+
+def test_generar_turnos_de_una_semana_pasa(conn_vacia):
+    # Del lunes 22/12/2025 al domingo 28/12/2025: cierra lunes y Navidad
+    nuevos = generar_turnos(
+        conn_vacia, datetime.date(2025, 12, 22), datetime.date(2025, 12, 28))
+
+    assert nuevos == 5 * 4 * 19
+    assert _fechas(conn_vacia) == {
+        "2025-12-23", "2025-12-24", "2025-12-26", "2025-12-27", "2025-12-28"}
+    assert conn_vacia.execute(
+        "SELECT DISTINCT a.nombre, x.cupos_disponibles "
+        "FROM ACTIVIDADES_X_HORARIOS x JOIN ACTIVIDADES a "
+        "ON a.id = x.id_actividad ORDER BY a.nombre").fetchall() == [
+        ("Jardineria", 12), ("Palestra", 12), ("Safari", 8),
+        ("Tirolesa", 10)]
+
+
+def test_generar_turnos_dos_veces_no_pisa_cupos_pasa(conn_vacia):
+    desde, hasta = datetime.date(2025, 11, 4), datetime.date(2025, 11, 9)
+    generar_turnos(conn_vacia, desde, hasta)
+    conn_vacia.execute(
+        "UPDATE ACTIVIDADES_X_HORARIOS SET cupos_disponibles = 1 "
+        "WHERE fecha = '2025-11-04'")
+
+    assert generar_turnos(conn_vacia, desde, hasta) == 0
+    assert conn_vacia.execute(
+        "SELECT COUNT(*) FROM ACTIVIDADES_X_HORARIOS "
+        "WHERE fecha = '2025-11-04' AND cupos_disponibles = 1"
+    ).fetchone() == (4 * 19,)
+
+
+def test_generar_turnos_de_algunas_actividades_pasa(conn_vacia):
+    nuevos = generar_turnos(
+        conn_vacia, datetime.date(2025, 11, 4), datetime.date(2025, 11, 4),
+        actividades=["Safari"])
+
+    assert nuevos == 19
+
+
+def test_generar_turnos_actividad_inexistente_falla(conn_vacia):
+    with pytest.raises(ValueError, match="No existen las actividades"):
+        generar_turnos(
+            conn_vacia, datetime.date(2025, 11, 4),
+            datetime.date(2025, 11, 4), actividades=["Buceo"])
+
+    assert _fechas(conn_vacia) == set()
+
+
+def test_generar_turnos_rango_invertido_falla(conn_vacia):
+    with pytest.raises(ValueError, match="anterior a la fecha de inicio"):
+        generar_turnos(
+            conn_vacia, datetime.date(2025, 11, 9), datetime.date(2025, 11, 4))
+
+
+def test_generar_temporada_completa_es_rapido_pasa(conn_vacia):
+    inicio = time.perf_counter()
+    nuevos = generar_turnos(
+        conn_vacia, datetime.date(2025, 10, 1), datetime.date(2026, 3, 31))
+    duracion = time.perf_counter() - inicio
+
+    assert nuevos == len(_fechas(conn_vacia)) * 4 * 19
+    assert duracion < 5
@@ -0,0 +1,106 @@
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from api.idempotencia import RegistroIdempotencia
+
+PAYLOAD = {
+    "actividad": "Safari",
+    "fecha_actividad": "18-10-2025",
+    "horario_actividad": "16:00",
+    "personas": [{"dni": 1, "nombre": "Juan Perez", "edad": 30}],
+    "acepta_terminos_condiciones": True,
+}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_reintento_con_la_misma_clave_no_vuelve_a_inscribir_pasa(
+        client, mocker):
+    inscribir = mocker.patch("api.app_fastapi.inscribir_actividad")
+    encabezados = {"Idempotency-Key": "clave-1"}
+
+    primera = client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+    segunda = client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+
+    assert inscribir.call_count == 1
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.json() == primera.json()
+    assert segunda.headers["Idempotent-Replayed"] == "true"
+
+
+def test_reintento_de_un_rechazo_devuelve_el_mismo_error_falla(
+        client, mocker):
+    inscribir = mocker.patch(
+        "api.app_fastapi.inscribir_actividad",
+        side_effect=ValueError("No hay cupos suficientes"))
+    encabezados = {"Idempotency-Key": "clave-1"}
+
+    client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+    resp = client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+
+    assert inscribir.call_count == 1
+    assert resp.status_code == 400
+    assert resp.json() == {"detail": "No hay cupos suficientes"}
+
+
+def test_misma_clave_con_otra_solicitud_falla(client, mocker):
+    mocker.patch("api.app_fastapi.inscribir_actividad")
+    encabezados = {"Idempotency-Key": "clave-1"}
+
+    client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+    resp = client.post(
+        "/inscribir", json=dict(PAYLOAD, horario_actividad="16:30"),
+        headers=encabezados)
+
+    assert resp.status_code == 422
+
+
+def test_base_ocupada_no_se_guarda_y_se_puede_reintentar_pasa(
+        client, mocker):
+    inscribir = mocker.patch(
+        "api.app_fastapi.inscribir_actividad",
+        side_effect=[sqlite3.OperationalError("database is locked"), None])
+    encabezados = {"Idempotency-Key": "clave-1"}
+
+    primera = client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+    segunda = client.post("/inscribir", json=PAYLOAD, headers=encabezados)
+
+    assert inscribir.call_count == 2
+    assert (primera.status_code, segunda.status_code) == (503, 201)
+
+
+def test_sin_clave_cada_solicitud_se_ejecuta_pasa(client, mocker):
+    inscribir = mocker.patch("api.app_fastapi.inscribir_actividad")
+
+    client.post("/inscribir", json=PAYLOAD)
+    client.post("/inscribir", json=PAYLOAD)
+
+    assert inscribir.call_count == 2
+
+
+def test_reintento_durante_la_primera_solicitud_espera_su_resultado_pasa():
+    registro = RegistroIdempotencia()
+    ejecuciones = []
+
+    async def operacion():
+        ejecuciones.append(1)
+        await asyncio.sleep(0.01)
+        return {"mensaje": "ok"}
+
+    async def principal():
+        return await asyncio.gather(*(
+            registro.ejecutar("/inscribir", "clave-1", PAYLOAD, operacion)
+            for _ in range(3)))
+
+    primera, *repetidas = asyncio.run(principal())
+
+    assert len(ejecuciones) == 1
+    assert primera == {"mensaje": "ok"}
+    assert all(r.status_code == 201 for r in repetidas)
@@ -1,5 +1,11 @@
 import datetime
-from src.inscripcion_actividad import inscribir_actividad
+from concurrent.futures import ThreadPoolExecutor
+from src.inscripcion_actividad import (
+    SQL_DESCONTAR_CUPOS,
+    inscribir_actividad,
+    mostrar_grilla_cupos
+)
+from test.bases import FECHA_PRUEBA, FECHA_PRUEBA_DB, agregar_turnos
 import pytest
 import sqlite3
 
@@ -36,10 +42,9 @@ def test_inscribir_actividad_con_talle_pasa(mocker):
         lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
     )
 
-    #  Simular fetchone() secuencial:
+    #  Los talles se resuelven con el catálogo, sin consultas a TALLAS
     mock_cursor.fetchone.side_effect = [
-        (1, 2, 5),  # id_actividad, id_horario, cupos_disponibles
-        (1,), (2,), (3,),  # ids de talles
+        (5,),  # cupos_disponibles
     ]
 
     #  Ejecutar funci贸n
@@ -51,22 +56,26 @@ def test_inscribir_actividad_con_talle_pasa(mocker):
         acepta_terminos_condiciones
     )
 
-    #  Verificar que se hizo el SELECT correcto
+    #  Verificar que se hizo el SELECT por clave primaria
     mock_cursor.execute.assert_any_call(
-        mocker.ANY, (actividad, fecha_actividad, horario_actividad)
+        mocker.ANY, (1, 15, "2025-10-18")
     )
 
-    # 🔹 Verificar que se insertaron inscripciones
-    insert_calls = [c for c in mock_cursor.execute.call_args_list
-                    if "INSERT INTO INSCRIPCIONES" in str(c)]
+    # 🔹 Verificar que se insertó todo el grupo en una sola sentencia
+    mock_cursor.executemany.assert_called_once()
+    sql, filas = mock_cursor.executemany.call_args.args
+    assert "INSERT INTO INSCRIPCIONES" in sql
+    assert [fila[3] for fila in filas] == [p["dni"] for p in personas]
+    assert [fila[4] for fila in filas] == [3, 2, 4]  # ids de M, S y L
 
-    assert len(insert_calls) == len(personas)
-
-    #  Verificar que se actualizan los cupos
+    #  Verificar que se descuentan los cupos de forma condicional
     mock_cursor.execute.assert_any_call(
-        mocker.ANY, (2, 1, 2, fecha_actividad)
+        mocker.ANY, (3, 1, 15, "2025-10-18", 3)
     )
 
+    #  Verificar que la transacción toma el bloqueo de escritura
+    mock_conn.return_value.execute.assert_any_call("BEGIN IMMEDIATE")
+
     #  Verificar que se hizo commit
     mock_conn.return_value.commit.assert_called_once()
 
@@ -101,7 +110,7 @@ def test_inscribir_actividad_sin_talle_requerido_pasa(mocker):
     )
 
     mock_cursor.fetchone.side_effect = [
-        (1, 2, 5),  # id_actividad, id_horario, cupos_disponibles
+        (5,),  # cupos_disponibles
     ]
 
     #  Ejecutar funci贸n
@@ -113,21 +122,24 @@ def test_inscribir_actividad_sin_talle_requerido_pasa(mocker):
         acepta_terminos_condiciones
     )
 
-    #  Verificar que se hizo el SELECT correcto
+    #  Verificar que se hizo el SELECT por clave primaria
     mock_cursor.execute.assert_any_call(
-        mocker.ANY, (actividad, fecha_actividad, horario_actividad)
+        mocker.ANY, (3, 15, "2025-10-17")
     )
 
-    #  Verificar que se actualizan los cupos
+    #  Verificar que se descuentan los cupos de forma condicional
     mock_cursor.execute.assert_any_call(
-        mocker.ANY, (2, 1, 2, fecha_actividad)
+        mocker.ANY, (3, 3, 15, "2025-10-17", 3)
     )
 
-    # 🔹 Verificar que se insertaron inscripciones
-    insert_calls = [c for c in mock_cursor.execute.call_args_list
-                    if "INSERT INTO INSCRIPCIONES" in str(c)]
+    #  Verificar que la transacción toma el bloqueo de escritura
+    mock_conn.return_value.execute.assert_any_call("BEGIN IMMEDIATE")
 
-    assert len(insert_calls) == len(personas)
+    # 🔹 Verificar que se insertó todo el grupo en una sola sentencia
+    mock_cursor.executemany.assert_called_once()
+    sql, filas = mock_cursor.executemany.call_args.args
+    assert "INSERT INTO INSCRIPCIONES" in sql
+    assert [fila[3] for fila in filas] == [p["dni"] for p in personas]
 
     #  Verificar que se hizo commit
     mock_conn.return_value.commit.assert_called_once()
@@ -164,8 +176,7 @@ def test_inscribir_actividad_sin_cupos_disponibles_falla(mocker):
 
     #  Simulamos que la actividad "Palestra" tiene solo 2 cupos disponibles
     mock_cursor.fetchone.side_effect = [
-        (1, 2, 2),  # id_actividad, id_horario, cupos_disponibles
-        (1,), (2,), (3,),  # ids de talles
+        (2,),  # cupos_disponibles
     ]
 
     try:
@@ -184,7 +195,7 @@ def test_inscribir_actividad_sin_cupos_disponibles_falla(mocker):
 
     #  Verificamos que se consult贸 correctamente la actividad
     mock_cursor.execute.assert_any_call(
-        mocker.ANY, (actividad, fecha_actividad, horario_actividad)
+        mocker.ANY, (1, 15, "2025-10-18")
     )
 
     # 🔹 No deberían haberse hecho inserciones en la tabla INSCRIPCION
@@ -227,8 +238,7 @@ def test_inscribir_actividad_con_talle_requerido_con_talle_invalido_falla(
     )
 
     mock_cursor.fetchone.side_effect = [
-        (1, 2, 5),  # id_actividad, id_horario, cupos_disponibles
-        (1,), (2,), None
+        (5,),  # cupos_disponibles
     ]
 
     try:
@@ -384,8 +394,7 @@ def test_inscribir_actividad_inferior_edad_minima_falla(
 
     #  Simular que hay cupos suficientes
     mock_cursor.fetchone.side_effect = [
-        (1, 2, 5),  # id_actividad, id_horario, cupos_disponibles
-        (1,), (2,), (3,)  # id de los talles cuando se haga el fetch
+        (5,),  # cupos_disponibles
     ]
 
     #  Ejecutar la funci贸n y verificar que lanza un ValueError
@@ -549,20 +558,11 @@ def test_inscribir_actividad_dos_veces_falla(mocker):
         lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
     )
 
-    # Funci贸n que simula comportamiento del cursor.fetchone()
-    llamadas = {"n": 0}
-
-    def fake_fetchone():
-        llamadas["n"] += 1
-        if llamadas["n"] == 1:
-            return (1, 2, 5)  # SELECT principal
-        elif llamadas["n"] in (2, 3):
-            return (1,)  # SELECT de talla
-        elif llamadas["n"] == 4:
-            # Simula un error SQL en el tercer intento
-            raise sqlite3.IntegrityError("Registro duplicado en INSCRIPCIONES")
+    mock_cursor.fetchone.side_effect = [(5,)]  # cupos_disponibles
 
-    mock_cursor.fetchone.side_effect = fake_fetchone
+    # Simula que una de las personas ya estaba inscripta en ese horario
+    mock_cursor.executemany.side_effect = sqlite3.IntegrityError(
+        "Registro duplicado en INSCRIPCIONES")
 
     match_msg = ("No se puede inscribir con el mismo DNI en un mismo horario "
                  "de actividad")
@@ -570,3 +570,263 @@ def test_inscribir_actividad_dos_veces_falla(mocker):
         inscribir_actividad(actividad, fecha_actividad,
                             horario_actividad, personas,
                             acepta_terminos_condiciones)
+
+
+def test_mostrar_grilla_cupos_rango_de_fechas_pasa(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+
+    #  La base devuelve ids y las filas sin un orden cronológico
+    mock_cursor.fetchall.return_value = [
+        (3, "2025-10-23", 1, 8),
+        (1, "2025-10-22", 2, 10),
+        (1, "2025-10-22", 1, 12),
+    ]
+
+    grilla = mostrar_grilla_cupos("22-10-2025", "23-10-2025")
+
+    #  Una única consulta por rango de fechas (guardadas en formato ISO)
+    assert mock_cursor.execute.call_count == 1
+    mock_cursor.execute.assert_called_once_with(
+        mocker.ANY, ["2025-10-22", "2025-10-23"]
+    )
+
+    assert grilla == [
+        {"actividad": "Palestra", "fecha_actividad": "22-10-2025",
+         "horario_actividad": "09:00", "cupos": 12},
+        {"actividad": "Palestra", "fecha_actividad": "22-10-2025",
+         "horario_actividad": "09:30", "cupos": 10},
+        {"actividad": "Safari", "fecha_actividad": "23-10-2025",
+         "horario_actividad": "09:00", "cupos": 8},
+    ]
+
+    #  Se usa una sola conexión del pool
+    mock_conn.assert_called_once()
+
+
+def test_mostrar_grilla_cupos_filtrada_por_actividad_pasa(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+    mock_cursor.fetchall.return_value = [
+        (2, "2025-10-22", 1, 10),
+    ]
+
+    grilla = mostrar_grilla_cupos("22-10-2025", actividad="Tirolesa")
+
+    mock_cursor.execute.assert_called_once_with(
+        mocker.ANY, ["2025-10-22", "2025-10-22", 2]
+    )
+    assert grilla == [
+        {"actividad": "Tirolesa", "fecha_actividad": "22-10-2025",
+         "horario_actividad": "09:00", "cupos": 10},
+    ]
+
+
+@pytest.mark.parametrize("fecha_desde, fecha_hasta, mensaje", [
+    ("23-10-2025", "22-10-2025",
+     "La fecha de fin no puede ser anterior a la fecha de inicio"),
+    ("01-10-2025", "01-12-2025",
+     "No se puede consultar la grilla de cupos para más de 31 dias"),
+])
+def test_mostrar_grilla_cupos_rango_invalido_falla(
+        mocker, fecha_desde, fecha_hasta, mensaje):
+    mock_conn = mocker.patch("sqlite3.connect")
+
+    with pytest.raises(ValueError, match=mensaje):
+        mostrar_grilla_cupos(fecha_desde, fecha_hasta)
+
+    #  No se llega a abrir la conexión
+    mock_conn.assert_not_called()
+
+
+def test_inscribir_actividad_cupos_tomados_por_otra_transaccion_falla(
+        mocker):
+    fecha_actividad = "18-10-2025"
+    horario_actividad = "16:00"
+    actividad = "Safari"
+    personas = [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+    ]
+
+    mock_conn = mocker.patch("sqlite3.connect")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    #  El SELECT ve cupos, pero el UPDATE condicional no modifica filas
+    mock_cursor.fetchone.side_effect = [(1,)]
+    mock_cursor.rowcount = 0
+
+    with pytest.raises(ValueError, match="No hay cupos suficientes"):
+        inscribir_actividad(actividad, fecha_actividad, horario_actividad,
+                            personas, True)
+
+    mock_conn.return_value.rollback.assert_called()
+    mock_conn.return_value.commit.assert_not_called()
+
+
+def test_inscribir_actividad_base_ocupada_reintenta_pasa(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+    mocker.patch("data.conexion.time.sleep")
+    mock_cursor = mock_conn.return_value.cursor.return_value
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    #  Los dos primeros BEGIN IMMEDIATE encuentran la base bloqueada
+    intentos = {"n": 0}
+
+    def fake_execute(sql, *args):
+        if sql == "BEGIN IMMEDIATE":
+            intentos["n"] += 1
+            if intentos["n"] <= 2:
+                raise sqlite3.OperationalError("database is locked")
+
+    mock_conn.return_value.execute.side_effect = fake_execute
+    mock_cursor.fetchone.side_effect = [(5,)]
+
+    inscribir_actividad(
+        "Safari", "18-10-2025", "16:00",
+        [{"dni": 100000, "nombre": "Juan Perez", "edad": 18}], True)
+
+    assert intentos["n"] == 3
+    mock_conn.return_value.commit.assert_called_once()
+
+
+def test_inscribir_actividad_dni_repetido_en_el_grupo_falla(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    personas = [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+    ]
+
+    match_msg = ("No se puede inscribir con el mismo DNI en un mismo horario "
+                 "de actividad")
+    with pytest.raises(ValueError, match=match_msg):
+        inscribir_actividad("Safari", "18-10-2025", "16:00", personas, True)
+
+    #  El grupo inválido se rechaza sin abrir la conexión
+    mock_conn.assert_not_called()
+
+
+def test_inscribir_actividad_sin_personas_falla(mocker):
+    mock_conn = mocker.patch("sqlite3.connect")
+
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+
+    with pytest.raises(ValueError, match="Debe inscribir al menos una"):
+        inscribir_actividad("Safari", "18-10-2025", "16:00", [], True)
+
+    mock_conn.assert_not_called()
+
+
+# --- CON BASE REAL (copia de la plantilla, ver test/bases.py) ---
+
+
+@pytest.fixture
+def turno_safari(base_prueba, ahora_fijo):
+    # Safari a las 16:00 con 3 cupos
+    agregar_turnos(base_prueba, [(3, 15, FECHA_PRUEBA_DB, 3)])
+    return base_prueba
+
+
+def _leer(ruta, consulta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return conn.execute(consulta).fetchall()
+    finally:
+        conn.close()
+
+
+def test_inscribir_actividad_base_real_guarda_filas_pasa(turno_safari):
+    personas = [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+        {"dni": 100001, "nombre": "Maria Perez", "edad": 20},
+    ]
+
+    inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", personas, True)
+
+    assert _leer(turno_safari, (
+        "SELECT id_actividad, id_horario, fecha, dni, nombre_visitante "
+        "FROM INSCRIPCIONES ORDER BY dni")) == [
+        (3, 15, FECHA_PRUEBA_DB, 100000, "Juan Perez"),
+        (3, 15, FECHA_PRUEBA_DB, 100001, "Maria Perez"),
+    ]
+    assert _leer(turno_safari, (
+        "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS")) == [(1,)]
+
+
+def test_inscribir_actividad_base_real_sin_cupos_no_cambia_nada_falla(
+        turno_safari):
+    personas = [
+        {"dni": 100000 + i, "nombre": f"Persona {i}", "edad": 30}
+        for i in range(4)
+    ]
+
+    with pytest.raises(ValueError, match="No hay cupos suficientes"):
+        inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", personas, True)
+
+    assert _leer(turno_safari, "SELECT * FROM INSCRIPCIONES") == []
+    assert _leer(turno_safari, (
+        "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS")) == [(3,)]
+
+
+def test_inscribir_actividad_base_real_concurrente_no_sobrevende_pasa(
+        turno_safari):
+    def inscribir(dni):
+        try:
+            inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", [
+                {"dni": dni, "nombre": "Visitante", "edad": 30}], True)
+            return True
+        except ValueError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        resultados = list(executor.map(inscribir, range(1, 21)))
+
+    assert sum(resultados) == 3
+    assert _leer(turno_safari, "SELECT COUNT(*) FROM INSCRIPCIONES") == [
+        (3,)]
+    assert _leer(turno_safari, (
+        "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS")) == [(0,)]
+
+
+def test_descontar_cupos_insuficientes_no_actualiza_falla(conn_prueba):
+    conn_prueba.execute(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS "
+        "(id_actividad, id_horario, fecha, cupos_disponibles) "
+        "VALUES (3, 15, ?, 2)", (FECHA_PRUEBA_DB,))
+
+    cursor = conn_prueba.execute(
+        SQL_DESCONTAR_CUPOS, (3, 3, 15, FECHA_PRUEBA_DB, 3))
+
+    assert cursor.rowcount == 0
+    assert conn_prueba.execute(
+        "SELECT cupos_disponibles FROM ACTIVIDADES_X_HORARIOS"
+    ).fetchone() == (2,)
@@ -0,0 +1,150 @@
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from src.inscripcion_actividad import inscribir_actividad
+from src.lista_espera import (
+    anotar_en_lista_espera,
+    cancelar_lista_espera,
+    consultar_lista_espera
+)
+from src.reservas import (
+    barrer_reservas_vencidas,
+    liberar_reserva,
+    reservar_cupos,
+    vencimientos
+)
+from test.bases import (
+    CUPOS_TURNO_PRUEBA as CUPOS_HORARIO,
+    FECHA_PRUEBA as FECHA_ACTIVIDAD,
+    cupos_disponibles,
+)
+
+
+def _grupo(primer_dni, cantidad):
+    return [
+        {"dni": primer_dni + i, "nombre": f"Visitante {i}", "edad": 30}
+        for i in range(cantidad)
+    ]
+
+
+def _anotar(primer_dni, cantidad):
+    return anotar_en_lista_espera(
+        "Safari", FECHA_ACTIVIDAD, "16:00", _grupo(primer_dni, cantidad),
+        True)
+
+
+def _reservar(cantidad, duracion=60):
+    token, _ = reservar_cupos(
+        "Safari", FECHA_ACTIVIDAD, "16:00", cantidad, duracion)
+    return token
+
+
+def test_anotar_con_cupos_libres_inscribe_en_el_momento_pasa(
+        base_temporal):
+    resultado = _anotar(100, 3)
+
+    assert resultado["estado"] == "inscripto"
+    assert resultado["posicion"] == 0
+    assert cupos_disponibles(base_temporal) == 7
+
+
+def test_cupos_liberados_promueven_en_orden_de_llegada_pasa(base_temporal):
+    reserva_chica = _reservar(2)
+    reserva_grande = _reservar(8)
+    primero = _anotar(100, 3)
+    segundo = _anotar(200, 1)
+    assert (primero["posicion"], segundo["posicion"]) == (1, 2)
+
+    #  Se liberan 2 cupos: el primer grupo (3) no entra y el segundo,
+    #  aunque entraría, sigue esperando su turno
+    liberar_reserva(reserva_chica)
+    assert consultar_lista_espera(segundo["id"])["estado"] == "esperando"
+    assert cupos_disponibles(base_temporal) == 2
+
+    liberar_reserva(reserva_grande)
+    assert consultar_lista_espera(primero["id"])["estado"] == "inscripto"
+    assert consultar_lista_espera(segundo["id"])["estado"] == "inscripto"
+    assert cupos_disponibles(base_temporal) == 6
+
+
+def test_reserva_vencida_promueve_la_lista_pasa(base_temporal, monkeypatch):
+    monkeypatch.setattr(vencimientos, "reloj", lambda: 1000.0)
+    _reservar(CUPOS_HORARIO, duracion=30)
+    anotado = _anotar(100, 4)
+
+    monkeypatch.setattr(vencimientos, "reloj", lambda: 1031.0)
+    barrer_reservas_vencidas()
+
+    assert consultar_lista_espera(anotado["id"])["estado"] == "inscripto"
+    assert cupos_disponibles(base_temporal) == CUPOS_HORARIO - 4
+
+
+def test_grupo_con_dni_ya_inscripto_se_descarta_pasa(base_temporal):
+    reserva = _reservar(9)
+    repetido = _anotar(100, 2)
+    siguiente = _anotar(200, 2)
+    #  Una persona del primer grupo se inscribe por su cuenta
+    inscribir_actividad(
+        "Safari", FECHA_ACTIVIDAD, "16:00", _grupo(100, 1), True)
+
+    liberar_reserva(reserva)
+
+    assert consultar_lista_espera(repetido["id"])["estado"] == "descartado"
+    assert consultar_lista_espera(siguiente["id"])["estado"] == "inscripto"
+    assert cupos_disponibles(base_temporal) == CUPOS_HORARIO - 1 - 2
+
+
+def test_cancelar_lugar_en_la_lista_pasa(base_temporal):
+    reserva = _reservar(CUPOS_HORARIO)
+    anotado = _anotar(100, 2)
+
+    assert cancelar_lista_espera(anotado["id"])
+    assert not cancelar_lista_espera(anotado["id"])
+
+    liberar_reserva(reserva)
+    assert cupos_disponibles(base_temporal) == CUPOS_HORARIO
+
+
+def test_endpoints_de_lista_de_espera_pasa(base_temporal):
+    _reservar(CUPOS_HORARIO)
+    client = TestClient(app)
+
+    resp = client.post("/lista-espera", json={
+        "actividad": "Safari",
+        "fecha_actividad": FECHA_ACTIVIDAD,
+        "horario_actividad": "16:00",
+        "personas": _grupo(100, 2),
+        "acepta_terminos_condiciones": True,
+    })
+    assert resp.status_code == 201
+    assert resp.json()["posicion"] == 1
+
+    id_espera = resp.json()["id"]
+    assert client.get(f"/lista-espera/{id_espera}").json()["estado"] == (
+        "esperando")
+    assert client.delete(f"/lista-espera/{id_espera}").status_code == 200
+    assert client.get("/lista-espera/999").status_code == 404
+
+
+def test_get_lista_espera_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.consultar_lista_espera",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).get("/lista-espera/1")
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_delete_lista_espera_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.cancelar_lista_espera",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).delete("/lista-espera/1")
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
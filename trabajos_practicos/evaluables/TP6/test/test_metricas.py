@@ -0,0 +1,86 @@
+import sqlite3
+from unittest import mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from data import metricas
+from data.conexion import iniciar_transaccion_inmediata
+
+
+@pytest.fixture
+def metricas_desactivadas():
+    metricas.habilitar(False)
+    yield
+    metricas.habilitar(True)
+
+
+def test_histograma_exporta_buckets_acumulados_pasa():
+    histograma = metricas.Histograma(
+        "prueba_segundos", "Prueba", etiquetas=("fase",),
+        limites=(0.1, 1.0))
+
+    histograma.observar(0.05, "select")
+    histograma.observar(0.5, "select")
+    histograma.observar(3.0, "select")
+
+    assert histograma.exportar() == [
+        "# HELP prueba_segundos Prueba",
+        "# TYPE prueba_segundos histogram",
+        'prueba_segundos_bucket{fase="select",le="0.1"} 1',
+        'prueba_segundos_bucket{fase="select",le="1.0"} 2',
+        'prueba_segundos_bucket{fase="select",le="+Inf"} 3',
+        'prueba_segundos_sum{fase="select"} 3.55',
+        'prueba_segundos_count{fase="select"} 3',
+    ]
+
+
+def test_medir_registra_la_fase_pasa():
+    with metricas.medir("commit"):
+        pass
+
+    assert metricas.duracion_fases.total("commit") == 1
+
+
+def test_metricas_desactivadas_no_registran_pasa(metricas_desactivadas):
+    with metricas.medir("commit"):
+        pass
+    metricas.contar(metricas.reintentos_bloqueo)
+
+    assert metricas.duracion_fases.total("commit") == 0
+    assert metricas.reintentos_bloqueo.valor() == 0
+
+
+def test_reintento_por_base_ocupada_se_cuenta_pasa():
+    conn = mock.Mock()
+    conn.execute.side_effect = [
+        sqlite3.OperationalError("database is locked"), None]
+
+    with mock.patch("data.conexion.time.sleep"):
+        iniciar_transaccion_inmediata(conn)
+
+    assert metricas.reintentos_bloqueo.valor() == 1
+
+
+def test_endpoint_metrics_cuenta_rechazos_por_motivo_pasa():
+    client = TestClient(app)
+    payload = {
+        "actividad": "Safari",
+        "fecha_actividad": "18-10-2025",
+        "horario_actividad": "16:00",
+        "personas": [{"dni": 1, "nombre": "Juan Perez", "edad": 30}],
+        "acepta_terminos_condiciones": False,
+    }
+
+    resp = client.post("/inscribir", json=payload)
+    assert resp.status_code == 400
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert ('parque_rechazos_total{ruta="/inscribir",motivo="Se deben '
+            'aceptar los terminos y condiciones"} 1') in resp.text
+    assert ('parque_http_solicitudes_total{metodo="POST",'
+            'ruta="/inscribir",estado="400"} 1') in resp.text
@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+
+from data.migrador import (
+    bajar, crear_base, listar_migraciones, subir, versiones_aplicadas,
+)
+from data.verificar_planes import (
+    buscar_recorridos_completos, consultas_del_sistema,
+)
+
+
+def _tablas_e_indices(conn):
+    return {
+        nombre for nombre, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'index') "
+            "AND name NOT LIKE 'sqlite_%'")
+    }
+
+
+@pytest.fixture
+def conn_migrada():
+    conn = crear_base()
+    yield conn
+    conn.close()
+
+
+def test_crear_base_aplica_todas_las_migraciones_pasa(conn_migrada):
+    ultimas = [m.version for m in listar_migraciones()]
+
+    assert versiones_aplicadas(conn_migrada) == ultimas
+    assert conn_migrada.execute(
+        "SELECT COUNT(*) FROM ACTIVIDADES").fetchone() == (4,)
+    assert {"idx_axh_fecha", "idx_actividades_nombre"} <= _tablas_e_indices(
+        conn_migrada)
+
+
+def test_subir_dos_veces_no_repite_migraciones_pasa(conn_migrada):
+    assert subir(conn_migrada) == []
+
+
+def test_bajar_y_subir_deja_el_mismo_esquema_pasa(conn_migrada):
+    esquema_original = _tablas_e_indices(conn_migrada)
+
+    revertidas = bajar(conn_migrada, hasta=1)
+    assert revertidas == [m.version for m in reversed(listar_migraciones())
+                          if m.version > 1]
+    assert "idx_axh_fecha" not in _tablas_e_indices(conn_migrada)
+
+    subir(conn_migrada)
+    assert _tablas_e_indices(conn_migrada) == esquema_original
+
+
+def test_migracion_fechas_iso_convierte_formato_viejo_pasa():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    subir(conn, hasta=1)
+    conn.executescript("""
+    INSERT INTO ACTIVIDADES_X_HORARIOS VALUES
+        (1, 1, '22-10-2025', 12), (1, 1, '01-11-2025', 12);
+    INSERT INTO INSCRIPCIONES VALUES (1, 1, '22-10-2025', 1, NULL, 'Juan');
+    """)
+
+    assert subir(conn, hasta=2) == [2]
+
+    fechas = [f for f, in conn.execute(
+        "SELECT fecha FROM ACTIVIDADES_X_HORARIOS ORDER BY fecha")]
+    assert fechas == ["2025-10-22", "2025-11-01"]
+    assert conn.execute(
+        "SELECT fecha FROM INSCRIPCIONES").fetchone() == ("2025-10-22",)
+    assert "idx_axh_fecha" in _tablas_e_indices(conn)
+    conn.close()
+
+
+def test_base_existente_se_registra_como_version_inicial_pasa():
+    #  Base creada a mano antes de existir las migraciones
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    subir(conn, hasta=1)
+    conn.execute("DROP TABLE SCHEMA_VERSION")
+
+    aplicadas = subir(conn)
+
+    assert 1 not in aplicadas
+    assert versiones_aplicadas(conn)[0] == 1
+    conn.close()
+
+
+def test_migracion_con_error_se_revierte_falla(conn_migrada, tmp_path):
+    (tmp_path / "0001_base.up.sql").write_text("CREATE TABLE A (x);")
+    (tmp_path / "0001_base.down.sql").write_text("DROP TABLE A;")
+    (tmp_path / "0002_rota.up.sql").write_text(
+        "CREATE TABLE B (x);\nINSERT INTO NO_EXISTE VALUES (1);")
+    (tmp_path / "0002_rota.down.sql").write_text("DROP TABLE B;")
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    migraciones = listar_migraciones(str(tmp_path))
+
+    with pytest.raises(sqlite3.OperationalError):
+        subir(conn, migraciones=migraciones)
+
+    #  La 0002 no deja la tabla B ni queda registrada
+    assert versiones_aplicadas(conn) == [1]
+    assert "B" not in _tablas_e_indices(conn)
+    conn.close()
+
+
+def test_migracion_sin_script_de_bajada_falla(tmp_path):
+    (tmp_path / "0001_base.up.sql").write_text("CREATE TABLE A (x);")
+
+    with pytest.raises(ValueError):
+        listar_migraciones(str(tmp_path))
+
+
+def test_consultas_sin_recorridos_completos_pasa(conn_migrada):
+    assert buscar_recorridos_completos(
+        conn_migrada, consultas_del_sistema()) == []
+
+
+def test_consulta_sin_indice_se_detecta_falla(conn_migrada):
+    consultas = {"por_cupos": "SELECT * FROM ACTIVIDADES_X_HORARIOS "
+                              "WHERE cupos_disponibles = ?"}
+
+    problemas = buscar_recorridos_completos(conn_migrada, consultas)
+
+    assert [nombre for nombre, _ in problemas] == ["por_cupos"]
@@ -0,0 +1,69 @@
+import datetime
+
+import pytest
+
+from src.reglas import (
+    ACTIVIDADES_CON_TALLE, EDADES_MINIMAS, validar_inscripcion,
+)
+
+AHORA = datetime.datetime(2025, 12, 23, 12, 0)  # martes
+
+PERSONAS = [
+    {"dni": 100000, "nombre": "Juan Perez", "edad": 18, "talle": "M"},
+]
+
+
+def test_tablas_de_reglas_pasa():
+    assert EDADES_MINIMAS == {"Palestra": 12, "Tirolesa": 8}
+    assert ACTIVIDADES_CON_TALLE == {"Palestra", "Tirolesa"}
+
+
+def test_validar_inscripcion_valida_pasa():
+    validar_inscripcion(
+        "Palestra", "24-12-2025", "18:00", PERSONAS, True, ahora=AHORA)
+
+
+@pytest.mark.parametrize("fecha, horario, mensaje", [
+    ("25-12-2025", "10:00", "el parque no abre en Navidad"),
+    ("01-01-2026", "10:00", "el parque no abre en Año Nuevo"),
+    ("29-12-2025", "10:00", "el parque no abre los lunes"),
+    ("24-12-2025", "18:30", "los turnos son de 09:00 a 18:00"),
+    ("24-12-2025", "08:30", "los turnos son de 09:00 a 18:00"),
+    ("24-12-2025", "10:25", "No hay horario para esa actividad"),
+    ("24-12-2025", "10", "Horario inválido"),
+    ("24-13-2025", "10:00", "Fecha inválida"),
+    ("23-12-2025", "11:30", "ya realizadas"),
+    ("26-12-2025", "10:00", "más de dos dias de anticipacion"),
+])
+def test_validar_inscripcion_fecha_u_horario_invalido_falla(
+        fecha, horario, mensaje):
+    ahora = AHORA
+    if fecha == "01-01-2026":
+        ahora = datetime.datetime(2025, 12, 31, 12, 0)
+    if fecha == "29-12-2025":
+        ahora = datetime.datetime(2025, 12, 28, 12, 0)
+
+    with pytest.raises(ValueError, match=mensaje):
+        validar_inscripcion(
+            "Safari", fecha, horario, PERSONAS, True, ahora=ahora)
+
+
+@pytest.mark.parametrize("actividad, persona, mensaje", [
+    ("Tirolesa", {"edad": 7, "talle": "S"}, "no cumple con la edad mínima"),
+    ("Palestra", {"edad": 20, "talle": None}, "Talle de persona invalido"),
+    ("Safari", {"nombre": ""}, "Los datos de la persona están incompletos"),
+])
+def test_validar_inscripcion_persona_invalida_falla(
+        actividad, persona, mensaje):
+    personas = [{**PERSONAS[0], **persona}]
+
+    with pytest.raises(ValueError, match=mensaje):
+        validar_inscripcion(
+            actividad, "24-12-2025", "10:00", personas, True, ahora=AHORA)
+
+
+def test_validar_inscripcion_safari_no_pide_talle_ni_edad_pasa():
+    personas = [{"dni": 1, "nombre": "Ana", "edad": 3}]
+
+    validar_inscripcion(
+        "Safari", "24-12-2025", "10:00", personas, True, ahora=AHORA)
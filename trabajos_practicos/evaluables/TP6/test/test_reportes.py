@@ -0,0 +1,161 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from data.migrador import subir
+from src.cancelaciones import cancelar_inscripciones
+from src.inscripcion_actividad import inscribir_actividad
+from src.reportes import reporte_demanda_tallas, reporte_ocupacion
+from test.bases import (
+    FECHA_PRUEBA,
+    FECHA_PRUEBA_DB,
+    agregar_turnos,
+    fijar_ahora
+)
+
+SQL_RESUMEN_DESDE_INSCRIPCIONES = """
+SELECT fecha, id_actividad, id_horario, COUNT(*) FROM INSCRIPCIONES
+GROUP BY fecha, id_actividad, id_horario
+"""
+
+SQL_TALLAS_DESDE_INSCRIPCIONES = """
+SELECT fecha, id_actividad, id_talla, COUNT(*) FROM INSCRIPCIONES
+WHERE id_talla IS NOT NULL
+GROUP BY fecha, id_actividad, id_talla
+"""
+
+
+@pytest.fixture
+def base_temporal(base_prueba, ahora_fijo, mocker):
+    # Tirolesa a las 10:00 con 10 cupos y Safari a las 16:00 con 4
+    agregar_turnos(base_prueba, [
+        (2, 3, FECHA_PRUEBA_DB, 10), (3, 15, FECHA_PRUEBA_DB, 4)])
+    fijar_ahora(mocker, "src.cancelaciones")
+    return base_prueba
+
+
+def _resumenes(conn):
+    return (
+        sorted(conn.execute(
+            "SELECT * FROM RESUMEN_TURNOS WHERE inscriptos > 0")),
+        sorted(conn.execute(
+            "SELECT * FROM DEMANDA_TALLAS WHERE cantidad > 0")),
+    )
+
+
+def test_triggers_mantienen_resumenes_pasa(conn_prueba):
+    conn_prueba.executemany(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS VALUES (?, ?, ?, 10)",
+        [(2, 3, FECHA_PRUEBA_DB), (3, 15, FECHA_PRUEBA_DB)])
+    conn_prueba.executemany(
+        "INSERT INTO INSCRIPCIONES VALUES (?, ?, ?, ?, ?, 'Visitante')", [
+            (2, 3, FECHA_PRUEBA_DB, 1, 3),
+            (2, 3, FECHA_PRUEBA_DB, 2, 3),
+            (2, 3, FECHA_PRUEBA_DB, 3, 5),
+            (3, 15, FECHA_PRUEBA_DB, 1, None),
+        ])
+    conn_prueba.execute("DELETE FROM INSCRIPCIONES WHERE dni = 2")
+    conn_prueba.execute(
+        "UPDATE INSCRIPCIONES SET id_talla = 4 WHERE dni = 3")
+
+    assert _resumenes(conn_prueba) == (
+        sorted(conn_prueba.execute(SQL_RESUMEN_DESDE_INSCRIPCIONES)),
+        sorted(conn_prueba.execute(SQL_TALLAS_DESDE_INSCRIPCIONES)),
+    )
+
+
+def test_migracion_completa_resumenes_existentes_pasa():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    subir(conn, hasta=5)
+    conn.execute(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS VALUES (2, 3, ?, 10)",
+        (FECHA_PRUEBA_DB,))
+    conn.executemany(
+        "INSERT INTO INSCRIPCIONES VALUES (2, 3, ?, ?, 3, 'Visitante')",
+        [(FECHA_PRUEBA_DB, dni) for dni in range(3)])
+
+    subir(conn)
+
+    assert _resumenes(conn) == (
+        [(FECHA_PRUEBA_DB, 2, 3, 3)], [(FECHA_PRUEBA_DB, 2, 3, 3)])
+    conn.close()
+
+
+def test_reporte_ocupacion_luego_de_inscribir_y_cancelar_pasa(
+        base_temporal):
+    inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", [
+        {"dni": dni, "nombre": "Visitante", "edad": 30}
+        for dni in (1, 2, 3)], True)
+    cancelar_inscripciones("Safari", FECHA_PRUEBA, "16:00", [2])
+
+    assert reporte_ocupacion(FECHA_PRUEBA) == [
+        {"actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+         "horario_actividad": "16:00", "inscriptos": 2,
+         "cupos_disponibles": 2, "ocupacion": 0.5},
+        {"actividad": "Tirolesa", "fecha_actividad": FECHA_PRUEBA,
+         "horario_actividad": "10:00", "inscriptos": 0,
+         "cupos_disponibles": 10, "ocupacion": 0.0},
+    ]
+
+
+def test_reporte_demanda_tallas_pasa(base_temporal):
+    inscribir_actividad("Tirolesa", FECHA_PRUEBA, "10:00", [
+        {"dni": 1, "nombre": "Ana", "edad": 30, "talle": "M"},
+        {"dni": 2, "nombre": "Beto", "edad": 30, "talle": "M"},
+        {"dni": 3, "nombre": "Caro", "edad": 10, "talle": "XS"},
+    ], True)
+    cancelar_inscripciones("Tirolesa", FECHA_PRUEBA, "10:00", [3])
+
+    assert reporte_demanda_tallas(FECHA_PRUEBA, actividad="Tirolesa") == [
+        {"actividad": "Tirolesa", "fecha_actividad": FECHA_PRUEBA,
+         "talla": "M", "cantidad": 2},
+    ]
+    assert reporte_demanda_tallas(FECHA_PRUEBA, actividad="Safari") == []
+
+
+def test_get_reporte_ocupacion_pasa(base_temporal):
+    resp = TestClient(app).get("/reportes/ocupacion", params={
+        "fecha_desde": FECHA_PRUEBA, "actividad": "Tirolesa"})
+
+    assert resp.status_code == 200
+    assert [t["horario_actividad"] for t in resp.json()["turnos"]] == [
+        "10:00"]
+
+
+@pytest.mark.parametrize("fecha_hasta, mensaje", [
+    ("17-10-2025", "anterior a la fecha de inicio"),
+    ("19-10-2026", "más de 366 dias"),
+])
+def test_get_reporte_tallas_rango_invalido_falla(
+        base_temporal, fecha_hasta, mensaje):
+    resp = TestClient(app).get("/reportes/tallas", params={
+        "fecha_desde": FECHA_PRUEBA, "fecha_hasta": fecha_hasta})
+
+    assert resp.status_code == 400
+    assert mensaje in resp.json()["detail"]
+
+
+def test_get_reporte_ocupacion_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.reporte_ocupacion",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).get(
+        "/reportes/ocupacion", params={"fecha_desde": FECHA_PRUEBA})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_get_reporte_tallas_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.reporte_demanda_tallas",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).get(
+        "/reportes/tallas", params={"fecha_desde": FECHA_PRUEBA})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
@@ -0,0 +1,207 @@
+import datetime
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from data.conexion import configurar_base_datos
+from data.migrador import crear_base
+from data.repositorio import (
+    AlmacenamientoNoSoportado, RepositorioMemoria, RepositorioSQLite,
+    configurar_repositorio, obtener_repositorio,
+)
+from src.cancelaciones import cancelar_inscripciones
+from src.inscripcion_actividad import (
+    inscribir_actividad, mostrar_grilla_cupos,
+)
+from src.reservas import reservar_cupos
+from test.bases import (
+    FECHA_PRUEBA, agregar_turnos, cupos_disponibles, fijar_ahora,
+)
+
+SAFARI = (3, 15, "2025-10-18")  # Safari 16:00
+TIROLESA = (2, 3, "2025-10-19")  # Tirolesa 10:00
+
+TURNOS = [(*SAFARI, 8), (*TIROLESA, 10), (3, 15, "2025-10-25", 8)]
+
+
+def _fila(clave, dni):
+    return (*clave, dni, None, f"Visitante {dni}")
+
+
+@pytest.fixture(params=["sqlite", "memoria"])
+def repositorio(request, tmp_path, mocker):
+    if request.param == "sqlite":
+        ruta = str(tmp_path / "parque.db")
+        conn = crear_base(ruta)
+        conn.executemany(
+            "INSERT INTO ACTIVIDADES_X_HORARIOS VALUES (?, ?, ?, ?)", TURNOS)
+        conn.close()
+        configurar_base_datos(ruta)
+        repositorio = RepositorioSQLite()
+    else:
+        repositorio = RepositorioMemoria()
+        repositorio.cargar_turnos(TURNOS)
+
+    configurar_repositorio(repositorio)
+    mock_datetime = mocker.patch("src.inscripcion_actividad.datetime")
+    mock_datetime.datetime.now.return_value = datetime.datetime(
+        2025, 10, 17, 12, 0, 0
+    )
+    mock_datetime.datetime.side_effect = (
+        lambda *args, **kwargs: datetime.datetime(*args, **kwargs)
+    )
+    yield repositorio
+    configurar_base_datos(None)
+
+
+def test_descontar_e_inscribir_pasa(repositorio):
+    with repositorio.transaccion() as transaccion:
+        assert transaccion.cupos(SAFARI) == 8
+        assert transaccion.descontar_cupos(SAFARI, 2)
+        transaccion.insertar_inscripciones(
+            [_fila(SAFARI, 1), _fila(SAFARI, 2)])
+
+    assert repositorio.consultar_cupos(SAFARI) == 6
+    assert repositorio.consultar_cupos((3, 15, "2025-10-20")) is None
+
+
+def test_descuento_sin_cupos_suficientes_falla(repositorio):
+    with repositorio.transaccion() as transaccion:
+        assert not transaccion.descontar_cupos(SAFARI, 9)
+
+    assert repositorio.consultar_cupos(SAFARI) == 8
+
+
+def test_dni_repetido_revierte_la_transaccion_falla(repositorio):
+    with repositorio.transaccion() as transaccion:
+        transaccion.descontar_cupos(SAFARI, 1)
+        transaccion.insertar_inscripciones([_fila(SAFARI, 1)])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with repositorio.transaccion() as transaccion:
+            transaccion.descontar_cupos(SAFARI, 2)
+            transaccion.devolver_cupos(TIROLESA, 1)
+            transaccion.insertar_inscripciones(
+                [_fila(SAFARI, 2), _fila(SAFARI, 1)])
+
+    assert repositorio.consultar_cupos(SAFARI) == 7
+    assert repositorio.consultar_cupos(TIROLESA) == 10
+
+    # El DNI 2 no quedó inscripto: se puede inscribir
+    with repositorio.transaccion() as transaccion:
+        transaccion.insertar_inscripciones([_fila(SAFARI, 2)])
+
+
+def test_grilla_por_rango_y_actividad_pasa(repositorio):
+    assert sorted(repositorio.grilla("2025-10-18", "2025-10-19")) == [
+        (2, "2025-10-19", 3, 10), (3, "2025-10-18", 15, 8)]
+    assert repositorio.grilla("2025-10-18", "2025-10-25", 2) == [
+        (2, "2025-10-19", 3, 10)]
+    assert repositorio.grilla("2025-10-20", "2025-10-24") == []
+
+
+def test_inscribir_actividad_con_cada_repositorio_pasa(repositorio):
+    personas = [
+        {"dni": 100000, "nombre": "Juan Perez", "edad": 18},
+        {"dni": 100001, "nombre": "Maria Perez", "edad": 20},
+    ]
+
+    assert inscribir_actividad(
+        "Safari", "18-10-2025", "16:00", personas, True) == (3, 15, 8)
+
+    with pytest.raises(ValueError, match="mismo DNI"):
+        inscribir_actividad(
+            "Safari", "18-10-2025", "16:00", personas[:1], True)
+
+    assert [g["cupos"] for g in mostrar_grilla_cupos("18-10-2025")] == [6]
+
+
+def test_inscripciones_concurrentes_no_superan_los_cupos_pasa(repositorio):
+    errores = []
+
+    def inscribir(dni):
+        try:
+            inscribir_actividad(
+                "Safari", "18-10-2025", "16:00",
+                [{"dni": dni, "nombre": "Visitante", "edad": 30}], True)
+        except ValueError as e:
+            errores.append(str(e))
+
+    hilos = [threading.Thread(target=inscribir, args=(dni,))
+             for dni in range(1, 21)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert repositorio.consultar_cupos(SAFARI) == 0
+    assert len(errores) == 12
+    assert all("No hay cupos suficientes" in e for e in errores)
+
+
+def test_repositorio_memoria_desde_base_pasa(tmp_path):
+    conn = crear_base()
+    conn.executemany(
+        "INSERT INTO ACTIVIDADES_X_HORARIOS VALUES (?, ?, ?, ?)", TURNOS)
+    conn.execute(
+        "INSERT INTO INSCRIPCIONES VALUES (?, ?, ?, ?, ?, ?)",
+        _fila(SAFARI, 7))
+
+    repositorio = RepositorioMemoria.desde_base(conn)
+
+    assert repositorio.consultar_cupos(TIROLESA) == 10
+    assert repositorio.inscriptos(SAFARI) == {7}
+
+
+def _personas(*dnis):
+    return [
+        {"dni": dni, "nombre": f"Visitante {dni}", "edad": 30}
+        for dni in dnis
+    ]
+
+
+def test_inscripcion_reserva_y_cancelacion_ven_los_mismos_cupos_pasa(
+        base_prueba, ahora_fijo, mocker):
+    fijar_ahora(mocker, "src.cancelaciones")
+    agregar_turnos(base_prueba, [TURNOS[0]])
+
+    inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", _personas(1, 2),
+                        True)
+    reservar_cupos("Safari", FECHA_PRUEBA, "16:00", 3)
+    cancelar_inscripciones("Safari", FECHA_PRUEBA, "16:00", [1])
+
+    #  8 - 2 inscriptos - 3 reservados + 1 cancelado
+    assert obtener_repositorio().consultar_cupos(SAFARI) == 4
+    assert cupos_disponibles(base_prueba, SAFARI) == 4
+    assert [t["cupos"] for t in mostrar_grilla_cupos(FECHA_PRUEBA)] == [4]
+
+
+def test_repositorio_memoria_rechaza_operaciones_sobre_la_base_falla(
+        base_prueba, ahora_fijo, mocker):
+    fijar_ahora(mocker, "src.cancelaciones")
+    agregar_turnos(base_prueba, [TURNOS[0]])
+    repositorio = RepositorioMemoria()
+    repositorio.cargar_turnos([TURNOS[0]])
+    configurar_repositorio(repositorio)
+    inscribir_actividad("Safari", FECHA_PRUEBA, "16:00", _personas(1), True)
+    turno = {"actividad": "Safari", "fecha_actividad": FECHA_PRUEBA,
+             "horario_actividad": "16:00"}
+
+    with pytest.raises(AlmacenamientoNoSoportado):
+        cancelar_inscripciones("Safari", FECHA_PRUEBA, "16:00", [1])
+    client = TestClient(app)
+    respuestas = [
+        client.post("/reservas", json={**turno, "cantidad": 2}),
+        client.post("/lista-espera", json={
+            **turno, "personas": _personas(2),
+            "acepta_terminos_condiciones": True}),
+        client.delete("/inscripciones", params={**turno, "dni": [1]}),
+    ]
+
+    assert [r.status_code for r in respuestas] == [501, 501, 501]
+    #  Ninguna operación tocó los cupos de la base
+    assert repositorio.consultar_cupos(SAFARI) == 7
+    assert cupos_disponibles(base_prueba, SAFARI) == 8
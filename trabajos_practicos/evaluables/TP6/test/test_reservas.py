@@ -0,0 +1,225 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app_fastapi import app
+from src import reservas
+from src.reservas import (
+    BarrenderoReservas,
+    barrer_reservas_vencidas,
+    cargar_vencimientos,
+    confirmar_reserva,
+    liberar_reserva,
+    reservar_cupos,
+    vencimientos
+)
+from test.bases import (
+    CUPOS_TURNO_PRUEBA as CUPOS_HORARIO,
+    FECHA_PRUEBA as FECHA_ACTIVIDAD,
+    contar_filas,
+    cupos_disponibles,
+)
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = RelojFalso()
+    monkeypatch.setattr(vencimientos, "reloj", reloj)
+    return reloj
+
+
+@pytest.fixture
+def base_temporal(base_temporal, reloj):
+    # Las reservas vencen según el reloj falso
+    return base_temporal
+
+
+def _estado(ruta):
+    return (
+        cupos_disponibles(ruta),
+        contar_filas(ruta, "RESERVAS_TEMPORALES"),
+        contar_filas(ruta, "INSCRIPCIONES"),
+    )
+
+
+def _personas(cantidad):
+    return [
+        {"dni": 100 + i, "nombre": f"Visitante {i}", "edad": 30}
+        for i in range(cantidad)
+    ]
+
+
+def _reservar(cantidad, duracion=60):
+    return reservar_cupos(
+        "Safari", FECHA_ACTIVIDAD, "16:00", cantidad, duracion)
+
+
+def test_reservar_y_liberar_cupos_pasa(base_temporal):
+    token, vence_en = _reservar(4)
+
+    assert vence_en == 1060.0
+    assert _estado(base_temporal) == (6, 1, 0)
+
+    assert liberar_reserva(token) == 4
+    assert _estado(base_temporal) == (10, 0, 0)
+    assert liberar_reserva(token) == 0
+
+
+def test_reservar_mas_cupos_que_los_disponibles_falla(base_temporal):
+    with pytest.raises(ValueError):
+        _reservar(CUPOS_HORARIO + 1)
+
+    assert _estado(base_temporal) == (10, 0, 0)
+
+
+def test_confirmar_reserva_devuelve_cupos_sobrantes_pasa(base_temporal):
+    token, _ = _reservar(4)
+
+    assert confirmar_reserva(token, _personas(3), True) == 3
+    assert _estado(base_temporal) == (7, 0, 3)
+
+
+def test_confirmar_reserva_con_mas_personas_que_cupos_falla(base_temporal):
+    token, _ = _reservar(2)
+
+    with pytest.raises(ValueError):
+        confirmar_reserva(token, _personas(3), True)
+
+    #  La reserva sigue vigente para reintentar
+    assert _estado(base_temporal) == (8, 1, 0)
+
+
+def test_reserva_vencida_se_libera_y_no_se_confirma_falla(
+        base_temporal, reloj):
+    token, _ = _reservar(4, duracion=30)
+    _reservar(2, duracion=120)
+
+    reloj.ahora += 31
+    assert barrer_reservas_vencidas() == 4
+    assert _estado(base_temporal) == (8, 1, 0)
+
+    with pytest.raises(ValueError):
+        confirmar_reserva(token, _personas(1), True)
+
+
+def test_barrido_solo_consulta_las_reservas_vencidas_pasa(
+        base_temporal, reloj, mocker):
+    for _ in range(5):
+        _reservar(1, duracion=600)
+    quitar = mocker.spy(reservas, "_devolver_reservas")
+
+    #  Nada vencido: no se abre una conexión
+    assert barrer_reservas_vencidas() == 0
+    quitar.assert_not_called()
+
+
+def test_barrido_fallido_se_reintenta_falla(base_temporal, reloj, mocker):
+    _reservar(4, duracion=30)
+    reloj.ahora += 31
+    iniciar = reservas.iniciar_transaccion_inmediata
+    fallas = [sqlite3.OperationalError("database is locked")]
+
+    def iniciar_una_falla(conn):
+        if fallas:
+            raise fallas.pop()
+        iniciar(conn)
+
+    mocker.patch(
+        "src.reservas.iniciar_transaccion_inmediata",
+        side_effect=iniciar_una_falla)
+
+    with pytest.raises(sqlite3.OperationalError):
+        barrer_reservas_vencidas()
+    assert _estado(base_temporal) == (6, 1, 0)
+
+    #  La reserva vuelve al heap y el próximo barrido la libera
+    assert barrer_reservas_vencidas() == 4
+    assert _estado(base_temporal) == (10, 0, 0)
+
+
+def test_reservas_concurrentes_no_sobrevenden_pasa(base_temporal):
+    def reservar(_):
+        try:
+            return _reservar(1)
+        except ValueError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        resultados = list(executor.map(reservar, range(40)))
+
+    assert sum(r is not None for r in resultados) == CUPOS_HORARIO
+    assert _estado(base_temporal) == (0, CUPOS_HORARIO, 0)
+
+
+def test_cargar_vencimientos_al_reiniciar_pasa(base_temporal, reloj):
+    _reservar(3, duracion=30)
+    _reservar(2, duracion=120)
+    vencimientos.limpiar()  # como si el proceso se hubiera reiniciado
+
+    reloj.ahora += 60
+    assert cargar_vencimientos() == 3
+    assert len(vencimientos) == 1
+
+    reloj.ahora += 60
+    assert barrer_reservas_vencidas() == 2
+    assert _estado(base_temporal) == (10, 0, 0)
+
+
+def test_barrendero_libera_reservas_vencidas_pasa(base_temporal, reloj):
+    _reservar(4, duracion=30)
+    reloj.ahora += 31
+
+    barrendero = BarrenderoReservas()
+    barrendero.iniciar()
+    try:
+        limite = time.monotonic() + 5
+        while _estado(base_temporal)[0] != CUPOS_HORARIO:
+            assert time.monotonic() < limite
+            time.sleep(0.01)
+    finally:
+        barrendero.detener()
+
+
+def test_endpoints_de_reservas_pasa(base_temporal):
+    client = TestClient(app)
+
+    resp = client.post("/reservas", json={
+        "actividad": "Safari",
+        "fecha_actividad": FECHA_ACTIVIDAD,
+        "horario_actividad": "16:00",
+        "cantidad": 2,
+    })
+    assert resp.status_code == 201
+    token = resp.json()["token"]
+
+    resp = client.post(f"/reservas/{token}/confirmar", json={
+        "personas": _personas(2),
+        "acepta_terminos_condiciones": True,
+    })
+    assert resp.status_code == 201
+    assert resp.json()["inscriptas"] == 2
+
+    resp = client.delete(f"/reservas/{token}")
+    assert resp.status_code == 404
+
+
+def test_delete_reserva_con_base_bloqueada_falla(mocker):
+    mocker.patch(
+        "api.app_fastapi.liberar_reserva",
+        side_effect=sqlite3.OperationalError("database is locked"))
+
+    resp = TestClient(app).delete("/reservas/abc")
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"